@@ -0,0 +1,85 @@
+"""Shared fixtures for workload benchmarks.
+
+Benchmarks use the same in-memory platform and ``_generate_agent`` stubbing
+as tests/test_workload.py, so neither amplihack nor an LLM is needed.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from agent_haymaker.workloads.models import DeploymentState
+
+from haymaker_my_workload import MyWorkload
+
+
+@pytest.fixture(autouse=True)
+def _isolated_state_files(tmp_path, monkeypatch):
+    """Keep the catalog, locks, blobs, archives and goal index out of the working tree.
+
+    Default-goal temp files go to tmp_path too, so deploys never cleaned up
+    do not pile up in the system temp directory.
+    """
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr("haymaker_my_workload.workload._CATALOG_PATH", tmp_path / "catalog.db")
+    monkeypatch.setattr("haymaker_my_workload.workload._LOCKS_DIR", tmp_path / "locks")
+    monkeypatch.setattr("haymaker_my_workload.workload._BLOBS_DIR", tmp_path / "blobs")
+    monkeypatch.setattr("haymaker_my_workload.workload._ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr("haymaker_my_workload.workload._GOAL_INDEX_PATH", tmp_path / "goals.json")
+
+
+def _mock_platform():
+    """Create a mock platform with in-memory state storage."""
+    platform = MagicMock()
+    storage: dict[str, DeploymentState] = {}
+
+    async def save(state: DeploymentState):
+        storage[state.deployment_id] = state
+
+    async def load(deployment_id: str):
+        return storage.get(deployment_id)
+
+    async def list_deps(workload_name: str):
+        return [s for s in storage.values() if s.workload_name == workload_name]
+
+    platform.save_deployment_state = AsyncMock(side_effect=save)
+    platform.load_deployment_state = AsyncMock(side_effect=load)
+    platform.list_deployments = AsyncMock(side_effect=list_deps)
+    platform.get_credential = AsyncMock(return_value=None)
+    platform.log = MagicMock()
+    platform._storage = storage
+    return platform
+
+
+@pytest.fixture()
+def run():
+    """Run a coroutine to completion on a dedicated event loop."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture()
+def workload():
+    wl = MyWorkload(platform=_mock_platform())
+    yield wl
+    for deployment_id in list(wl._processes):
+        wl._terminate_process(deployment_id)
+
+
+@pytest.fixture()
+def make_agent_dir(tmp_path):
+    """Create an agent dir whose main.py runs the given Python source."""
+    counter = 0
+
+    def make(source: str) -> Path:
+        nonlocal counter
+        counter += 1
+        agent_dir = tmp_path / f"agent-{counter}"
+        agent_dir.mkdir()
+        (agent_dir / "main.py").write_text(source)
+        return agent_dir
+
+    return make
@@ -0,0 +1,224 @@
+"""Long-running soak test for resource leaks in the workload process.
+
+Repeatedly deploys sdk=mock agents, polls them, tails their logs, stops
+some early and cleans all of them up, while sampling the process's RSS,
+open file descriptors, thread count, zombie children and the sizes of
+MyWorkload's in-memory dicts. At the end it reports each metric's growth
+rate (least-squares slope per hour, after a warm-up) and exits non-zero
+if any exceeds its limit.
+
+    python benchmarks/soak.py --duration 4h --concurrency 20
+    python benchmarks/soak.py --duration 10m --report soak.json
+
+Linux only (reads /proc). Needs agent-haymaker but not amplihack.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from agent_haymaker.workloads.models import DeploymentConfig, DeploymentStatus
+
+from haymaker_my_workload import MyWorkload
+
+# Allowed growth per hour before the run is reported as leaking
+_DEFAULT_LIMITS = {
+    "rss_mb": 10.0,
+    "open_fds": 1.0,
+    "threads": 1.0,
+    "zombies": 1.0,
+    "workload_dict_entries": 1.0,
+}
+
+
+def _memory_platform():
+    """In-memory platform that forgets states once the harness cleans them up."""
+    platform = MagicMock()
+    storage = {}
+
+    async def save(state):
+        storage[state.deployment_id] = state
+
+    async def load(deployment_id):
+        return storage.get(deployment_id)
+
+    async def list_deps(workload_name):
+        return [s for s in storage.values() if s.workload_name == workload_name]
+
+    platform.save_deployment_state = AsyncMock(side_effect=save)
+    platform.load_deployment_state = AsyncMock(side_effect=load)
+    platform.list_deployments = AsyncMock(side_effect=list_deps)
+    platform.get_credential = AsyncMock(return_value=None)
+    platform.log = MagicMock()
+    platform._storage = storage
+    return platform
+
+
+def _parse_duration(text: str) -> float:
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smh]?)", text.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration: {text!r} (e.g. 30s, 10m, 4h)")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def _zombie_children() -> int:
+    me = os.getpid()
+    zombies = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            stat = Path(f"/proc/{entry}/stat").read_text()
+        except OSError:
+            continue
+        # Fields after the parenthesised command name: state, ppid, ...
+        fields = stat.rsplit(")", 1)[1].split()
+        if fields[0] == "Z" and int(fields[1]) == me:
+            zombies += 1
+    return zombies
+
+
+def sample(workload: MyWorkload) -> dict[str, float]:
+    """Snapshot the resource metrics tracked by the soak run."""
+    status = Path("/proc/self/status").read_text()
+    rss_kb = int(re.search(r"VmRSS:\s+(\d+)", status).group(1))
+    dict_sizes = {
+        name: len(value) for name, value in vars(workload).items() if isinstance(value, dict)
+    }
+    return {
+        "t": time.monotonic(),
+        "rss_mb": rss_kb / 1024,
+        "open_fds": len(os.listdir("/proc/self/fd")),
+        "threads": threading.active_count(),
+        "zombies": _zombie_children(),
+        "workload_dict_entries": sum(dict_sizes.values()),
+        "workload_dicts": dict_sizes,
+    }
+
+
+def growth_per_hour(samples: list[dict], metric: str) -> float:
+    """Least-squares slope of a metric, in units per hour."""
+    if len(samples) < 2:
+        return 0.0
+    xs = [s["t"] for s in samples]
+    ys = [s[metric] for s in samples]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if not var_x:
+        return 0.0
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys, strict=True)) / var_x
+    return slope * 3600
+
+
+async def _cycle(workload: MyWorkload, concurrency: int, rng: random.Random) -> None:
+    config = DeploymentConfig(
+        workload_name="my-workload",
+        workload_config={
+            "sdk": "mock",
+            "mock_turns": 3,
+            "mock_turn_seconds": 0.2,
+            "mock_log_lines_per_turn": 20,
+        },
+    )
+    ids = [await workload.deploy(config) for _ in range(concurrency)]
+
+    # Stop roughly a quarter of the agents mid-run
+    for deployment_id in rng.sample(ids, k=concurrency // 4):
+        await workload.stop(deployment_id)
+
+    pending = set(ids)
+    while pending:
+        for deployment_id in list(pending):
+            state = await workload.get_status(deployment_id)
+            async for _ in workload.get_logs(deployment_id, lines=20):
+                pass
+            if state.status != DeploymentStatus.RUNNING:
+                pending.discard(deployment_id)
+        await asyncio.sleep(0.2)
+
+    for deployment_id in ids:
+        await workload.cleanup(deployment_id)
+        workload._platform._storage.pop(deployment_id, None)
+
+
+async def soak(duration: float, concurrency: int, interval: float, warmup: float) -> dict:
+    workload = MyWorkload(platform=_memory_platform())
+    rng = random.Random(0)
+    samples = []
+    started = time.monotonic()
+    next_sample = started
+    cycles = 0
+
+    while time.monotonic() - started < duration:
+        await _cycle(workload, concurrency, rng)
+        cycles += 1
+        if time.monotonic() >= next_sample:
+            samples.append(sample(workload))
+            next_sample += interval
+
+    samples.append(sample(workload))
+    steady = [s for s in samples if s["t"] - started >= warmup] or samples
+    growth = {metric: growth_per_hour(steady, metric) for metric in _DEFAULT_LIMITS}
+    return {
+        "duration_seconds": time.monotonic() - started,
+        "cycles": cycles,
+        "deployments": cycles * concurrency,
+        "first": samples[0],
+        "last": samples[-1],
+        "growth_per_hour": growth,
+        "samples": samples,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=_parse_duration, default=_parse_duration("1h"))
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--sample-interval", type=_parse_duration, default=10.0)
+    parser.add_argument(
+        "--warmup",
+        type=_parse_duration,
+        default=None,
+        help="ignore samples before this (default: 10%% of the duration)",
+    )
+    parser.add_argument("--report", type=Path, help="write the full report as JSON")
+    args = parser.parse_args()
+    warmup = args.warmup if args.warmup is not None else args.duration * 0.1
+
+    # Keep bundles and goal files out of the caller's working tree
+    if args.report:
+        args.report = args.report.resolve()
+    workdir = tempfile.mkdtemp(prefix="haymaker-soak-")
+    os.chdir(workdir)
+
+    report = asyncio.run(soak(args.duration, args.concurrency, args.sample_interval, warmup))
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2))
+
+    print(f"{report['cycles']} cycles, {report['deployments']} deployments in {workdir}")
+    leaking = False
+    for metric, limit in _DEFAULT_LIMITS.items():
+        rate = report["growth_per_hour"][metric]
+        flag = "LEAK?" if rate > limit else "ok"
+        leaking |= rate > limit
+        print(
+            f"  {metric:<24} {report['first'][metric]:>10.1f} -> {report['last'][metric]:>10.1f}"
+            f"  ({rate:+.2f}/h, limit {limit})  {flag}"
+        )
+    print(f"  workload dicts: {report['last']['workload_dicts']}")
+    return 1 if leaking else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
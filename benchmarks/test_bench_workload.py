@@ -0,0 +1,160 @@
+"""Benchmarks for the workload's hot paths.
+
+Run and save a baseline, then compare later runs against it:
+
+    make bench            # saves results as JSON under .benchmarks/
+    make bench-compare    # fails if any mean regresses past BENCH_THRESHOLD
+
+The 1 GB get_logs case is opt-in: set HAYMAKER_BENCH_LARGE=1.
+"""
+
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from agent_haymaker.workloads.models import (
+    DeploymentConfig,
+    DeploymentState,
+    DeploymentStatus,
+)
+
+_MB = 1024 * 1024
+_LOG_SIZES = [1 * _MB, 64 * _MB]
+if os.environ.get("HAYMAKER_BENCH_LARGE"):
+    _LOG_SIZES.append(1024 * _MB)
+
+_EXITS_NOW = "import sys; sys.exit(0)\n"
+_RUNS_FOREVER = "import time; time.sleep(600)\n"
+
+
+def _write_log(path, size):
+    line = b"[2026-01-01 00:00:00] [AUTO CLAUDE] agent is working on a benchmark step\n"
+    block = line * (_MB // len(line))
+    with open(path, "wb") as f:
+        written = 0
+        while written < size:
+            f.write(block)
+            written += len(block)
+
+
+async def _deploy(workload, agent_dir):
+    with patch.object(workload, "_generate_agent", AsyncMock(return_value=agent_dir)):
+        return await workload.deploy(DeploymentConfig(workload_name="my-workload"))
+
+
+def test_deploy_latency(benchmark, run, workload, make_agent_dir):
+    agent_dir = make_agent_dir(_EXITS_NOW)
+    benchmark.pedantic(lambda: run(_deploy(workload, agent_dir)), rounds=30, warmup_rounds=2)
+
+
+@pytest.mark.parametrize("count", [10, 100, 1_000, 10_000])
+def test_get_status_throughput(benchmark, run, workload, tmp_path, count):
+    """Poll every stored deployment once; each looks like a live, idle agent."""
+    agent_dir = tmp_path / "agent"
+    agent_dir.mkdir()
+    (agent_dir / "agent.log").write_text("working\n")
+    ids = [f"bench-{i}" for i in range(count)]
+    for dep_id in ids:
+        run(
+            workload.save_state(
+                DeploymentState(
+                    deployment_id=dep_id,
+                    workload_name="my-workload",
+                    status=DeploymentStatus.RUNNING,
+                    phase="executing",
+                    metadata={"agent_dir": str(agent_dir), "agent_pid": os.getpid()},
+                )
+            )
+        )
+
+    async def poll_all():
+        for dep_id in ids:
+            await workload.get_status(dep_id)
+
+    benchmark.pedantic(lambda: run(poll_all()), rounds=3 if count >= 1_000 else 10)
+    benchmark.extra_info["deployments"] = count
+
+
+@pytest.mark.parametrize("size", _LOG_SIZES, ids=lambda s: f"{s // _MB}MB")
+def test_get_logs_tail_latency(benchmark, run, workload, tmp_path, size):
+    agent_dir = tmp_path / "agent"
+    agent_dir.mkdir()
+    _write_log(agent_dir / "agent.log", size)
+    run(
+        workload.save_state(
+            DeploymentState(
+                deployment_id="bench-logs",
+                workload_name="my-workload",
+                status=DeploymentStatus.COMPLETED,
+                phase="completed",
+                metadata={"agent_dir": str(agent_dir)},
+            )
+        )
+    )
+
+    async def tail():
+        return [line async for line in workload.get_logs("bench-logs", lines=100)]
+
+    lines = benchmark.pedantic(lambda: run(tail()), rounds=5)
+    assert len(lines) == 100
+
+
+def test_append_log_throughput(benchmark, workload):
+    def append_many():
+        for i in range(10_000):
+            workload._append_log("bench-append", f"message {i}")
+
+    benchmark(append_many)
+
+
+def test_stop_latency(benchmark, run, workload, make_agent_dir):
+    agent_dir = make_agent_dir(_RUNS_FOREVER)
+
+    def setup():
+        return (run(_deploy(workload, agent_dir)),), {}
+
+    benchmark.pedantic(lambda dep_id: run(workload.stop(dep_id)), setup=setup, rounds=20)
+
+
+def test_cleanup_latency(benchmark, run, workload, make_agent_dir):
+    agent_dir = make_agent_dir(_RUNS_FOREVER)
+
+    def setup():
+        return (run(_deploy(workload, agent_dir)),), {}
+
+    benchmark.pedantic(lambda dep_id: run(workload.cleanup(dep_id)), setup=setup, rounds=20)
+
+
+def test_catalog_query_latency(benchmark, tmp_path):
+    """Dashboard-style queries over 100k historical deployments."""
+    from datetime import UTC, datetime, timedelta
+
+    from haymaker_my_workload.catalog import DeploymentCatalog
+
+    catalog = DeploymentCatalog(tmp_path / "catalog.db")
+    base = datetime(2026, 1, 1, tzinfo=UTC)
+    statuses = [DeploymentStatus.COMPLETED, DeploymentStatus.FAILED, DeploymentStatus.STOPPED]
+    catalog.upsert_many(
+        [
+            DeploymentState(
+                deployment_id=f"bench-{i}",
+                workload_name="my-workload",
+                status=statuses[i % 3],
+                phase="done",
+                started_at=base + timedelta(seconds=i),
+                config={"goal_file": f"goals/g{i % 50}.md", "sdk": ("claude", "mini")[i % 2]},
+                metadata={"sdk": ("claude", "mini")[i % 2], "goal_hash": f"{i % 50:064x}"},
+            )
+            for i in range(100_000)
+        ]
+    )
+
+    def query():
+        recent = catalog.list_deployments({"status": "failed", "sdk": "mini"}, limit=50)
+        by_goal = catalog.aggregate("goal_hash", {"status": ["completed", "failed"]})
+        return recent, by_goal
+
+    recent, by_goal = benchmark(query)
+    assert len(recent) == 50
+    assert len(by_goal) == 50
+    catalog.close()
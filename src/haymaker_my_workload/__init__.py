@@ -10,8 +10,8 @@ Quick start:
 
 from importlib.metadata import version
 
-from .workload import MyWorkload
+from .workload import MyWorkload, StateConflictError
 
 __version__ = version("haymaker-my-workload")
 
-__all__ = ["MyWorkload"]
+__all__ = ["MyWorkload", "StateConflictError"]
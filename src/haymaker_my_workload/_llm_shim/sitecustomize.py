@@ -0,0 +1,203 @@
+"""LLM record/replay shim, imported automatically by the agent's interpreter.
+
+The workload prepends this directory to PYTHONPATH when a deployment sets
+``llm_cache``. At startup Python imports this ``sitecustomize`` module,
+which wraps the non-streaming request methods of the LLM clients
+(anthropic, openai, litellm) so they go through the cache in
+``llm_cache.py``, and reports each call as an ``llm_call`` event.
+
+Nothing but the standard library is imported at startup: a meta path
+finder patches each client module right after the agent first imports it,
+so agents do not pay for clients they never use. Streaming requests
+bypass the cache. Being first on PYTHONPATH hides any other
+``sitecustomize`` (a virtualenv's, say), so that one is run afterwards.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def _load_sibling(name):
+    path = Path(__file__).resolve().parent.parent / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(f"_haymaker_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _dump(response):
+    cls = type(response)
+    return {"cls": f"{cls.__module__}:{cls.__qualname__}", "data": response.model_dump(mode="json")}
+
+
+def _load(entry):
+    module_name, _, qualname = entry["cls"].partition(":")
+    cls = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        cls = getattr(cls, part)
+    return cls.model_validate(entry["data"])
+
+
+def _usage(response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    fields = {
+        "input_tokens": getattr(usage, "input_tokens", None)
+        or getattr(usage, "prompt_tokens", None),
+        "output_tokens": getattr(usage, "output_tokens", None)
+        or getattr(usage, "completion_tokens", None),
+        "cache_read_tokens": getattr(usage, "cache_read_input_tokens", None),
+    }
+    return {k: v for k, v in fields.items() if isinstance(v, int)}
+
+
+class _PatchingLoader(importlib.abc.Loader):
+    """Runs a module's own loader, then applies the patches waiting for it."""
+
+    def __init__(self, loader, patches):
+        self._loader = loader
+        self._patches = patches
+
+    def __getattr__(self, name):
+        # get_resource_reader, get_source and the like come from the real loader
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._loader.exec_module(module)
+        for patch in self._patches:
+            patch(module)
+
+
+class _PatchOnImport(importlib.abc.MetaPathFinder):
+    """Meta path finder that patches client modules as they are first imported."""
+
+    def __init__(self, patches):
+        self._patches = patches  # module name -> [patch(module)]
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in self._patches:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _PatchingLoader(spec.loader, self._patches.pop(fullname))
+        return spec
+
+
+def _install():
+    mode = os.environ.get("HAYMAKER_LLM_CACHE_MODE")
+    cache_dir = os.environ.get("HAYMAKER_LLM_CACHE_DIR")
+    if not mode or not cache_dir:
+        return
+
+    llm_cache = _load_sibling("llm_cache")
+    events = _load_sibling("events")
+    max_bytes = int(os.environ.get("HAYMAKER_LLM_CACHE_MAX_BYTES", llm_cache.DEFAULT_MAX_BYTES))
+    cache = llm_cache.LLMCache(Path(cache_dir), max_bytes=max_bytes)
+
+    def report(kwargs, response, hit, started):
+        events.emit(
+            "llm_call",
+            model=kwargs.get("model"),
+            cache_hit=hit,
+            latency_ms=round((time.monotonic() - started) * 1000, 1),
+            **_usage(response),
+        )
+
+    def wrap_sync(provider, original):
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            if kwargs.get("stream"):
+                return original(*args, **kwargs)
+            started = time.monotonic()
+            response, hit = llm_cache.cached_call(
+                cache,
+                mode,
+                provider,
+                kwargs,
+                lambda: original(*args, **kwargs),
+                _dump,
+                _load,
+            )
+            report(kwargs, response, hit, started)
+            return response
+
+        return wrapper
+
+    def wrap_async(provider, original):
+        @functools.wraps(original)
+        async def wrapper(*args, **kwargs):
+            if kwargs.get("stream"):
+                return await original(*args, **kwargs)
+            started = time.monotonic()
+            response, hit = await llm_cache.cached_call_async(
+                cache,
+                mode,
+                provider,
+                kwargs,
+                lambda: original(*args, **kwargs),
+                _dump,
+                _load,
+            )
+            report(kwargs, response, hit, started)
+            return response
+
+        return wrapper
+
+    targets = [
+        ("anthropic", "anthropic.resources.messages", "Messages", "create", wrap_sync),
+        ("anthropic", "anthropic.resources.messages", "AsyncMessages", "create", wrap_async),
+        ("openai", "openai.resources.chat.completions", "Completions", "create", wrap_sync),
+        ("openai", "openai.resources.chat.completions", "AsyncCompletions", "create", wrap_async),
+        ("litellm", "litellm", None, "completion", wrap_sync),
+        ("litellm", "litellm", None, "acompletion", wrap_async),
+    ]
+    patches = {}
+    for provider, module_name, owner_name, attr, wrap in targets:
+
+        def patch(module, provider=provider, owner_name=owner_name, attr=attr, wrap=wrap):
+            owner = getattr(module, owner_name, None) if owner_name else module
+            if owner is not None and hasattr(owner, attr):
+                setattr(owner, attr, wrap(provider, getattr(owner, attr)))
+
+        if module_name in sys.modules:
+            patch(sys.modules[module_name])
+        else:
+            patches.setdefault(module_name, []).append(patch)
+    sys.meta_path.insert(0, _PatchOnImport(patches))
+
+
+def _run_shadowed():
+    """Run the sitecustomize this one hides on sys.path, if there is one."""
+    here = os.path.dirname(os.path.realpath(__file__))
+    path = [entry for entry in sys.path if os.path.realpath(entry or os.curdir) != here]
+    spec = importlib.machinery.PathFinder.find_spec("sitecustomize", path)
+    if spec is None or spec.loader is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_install()
+_shadowed = _run_shadowed()
@@ -0,0 +1,117 @@
+"""Synthetic stand-in agent for load testing (sdk=mock).
+
+Copied into the agent directory by the workload together with
+mock_config.json. Simulates an agent's observable behaviour -- turns,
+latency, log volume, heartbeats, structured events, phase checkpoints,
+memory footprint and exit code -- without calling any LLM. Standard
+library only.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+config = json.loads(Path("mock_config.json").read_text())
+turns = config["turns"]
+mean = config["turn_seconds"]
+jitter = config["turn_jitter"]
+log_lines = config["log_lines_per_turn"]
+exit_code = config["exit_code"]
+phases = config["phases"]
+rng = random.Random(config.get("seed"))
+
+# Hold the requested memory for the agent's lifetime; touch every page so
+# it counts towards RSS.
+ballast = bytearray(config["memory_mb"] * 1024 * 1024)
+for i in range(0, len(ballast), 4096):
+    ballast[i] = 1
+
+events_fd = os.environ.get("HAYMAKER_EVENTS_FD")
+heartbeat = os.environ.get("HAYMAKER_HEARTBEAT_FILE")
+checkpoint_file = os.environ.get("HAYMAKER_CHECKPOINT_FILE")
+
+
+def emit(event_type, **fields):
+    if events_fd is not None:
+        line = json.dumps({"type": event_type, "ts": time.time(), **fields}) + "\n"
+        os.write(int(events_fd), line.encode())
+
+
+def turn_delay():
+    # Log-normal keeps delays positive with a long tail, like real LLM turns
+    if mean <= 0:
+        return 0.0
+    if jitter <= 0:
+        return mean
+    # mu = -sigma^2 / 2 makes the distribution's mean exactly `mean`
+    return rng.lognormvariate(-jitter * jitter / 2, jitter) * mean
+
+
+def save_checkpoint(turns_used, phases_completed):
+    # Write-then-rename so a kill mid-write leaves the previous checkpoint
+    tmp = f"{checkpoint_file}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(
+            {
+                "turns_used": turns_used,
+                "phases_completed": phases_completed,
+                "saved_at": time.time(),
+            },
+            f,
+        )
+    os.replace(tmp, checkpoint_file)
+
+
+first_turn = 1
+phases_completed = []
+if checkpoint_file and os.environ.get("HAYMAKER_RESUME"):
+    try:
+        checkpoint = json.loads(Path(checkpoint_file).read_text())
+        first_turn = checkpoint["turns_used"] + 1
+        phases_completed = checkpoint["phases_completed"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+if first_turn > 1:
+    print(f"[MOCK] Resuming at turn {first_turn} after {phases_completed}", flush=True)
+else:
+    print(f"[MOCK] Starting synthetic agent: {turns} turns, ~{mean}s per turn", flush=True)
+turns_per_phase = max(1, -(-turns // len(phases)))
+for turn in range(first_turn, turns + 1):
+    phase = phases[min((turn - 1) // turns_per_phase, len(phases) - 1)]
+    if (turn - 1) % turns_per_phase == 0:
+        emit("phase_start", phase=phase)
+
+    delay = turn_delay()
+    time.sleep(delay)
+    emit("turn", turn=turn)
+    emit(
+        "llm_call",
+        model="mock",
+        input_tokens=rng.randint(500, 2000),
+        output_tokens=rng.randint(50, 500),
+        cache_hit=False,
+        latency_ms=round(delay * 1000, 1),
+    )
+    for n in range(log_lines):
+        print(f"[MOCK] turn {turn}/{turns} {phase}: line {n + 1}/{log_lines}")
+    sys.stdout.flush()
+    if heartbeat:
+        Path(heartbeat).touch()
+
+    if turn % turns_per_phase == 0 or turn == turns:
+        emit("phase_end", phase=phase)
+        phases_completed.append(phase)
+        if checkpoint_file:
+            save_checkpoint(turn, phases_completed)
+
+if exit_code == 0:
+    emit("outcome", status="completed")
+    print("[MOCK] Goal achieved", flush=True)
+else:
+    emit("outcome", status="failed", error=f"mock exit code {exit_code}")
+    print(f"[MOCK] Finished with exit code {exit_code}", flush=True)
+sys.exit(exit_code)
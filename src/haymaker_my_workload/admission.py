@@ -0,0 +1,67 @@
+"""Admission control for batch runs.
+
+Batch features (matrix runs, retries, templated fan-out, pipelines) launch
+many agents from one call. An AdmissionController bounds how many of them
+are in flight at once and spaces out admissions, so a batch cannot swamp
+the host or the LLM provider with a burst of simultaneous starts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class AdmissionController:
+    """Async context manager that admits at most max_in_flight holders at once.
+
+    min_interval enforces a minimum gap in seconds between consecutive
+    admissions, smoothing out bursts when many waiters are released together.
+    """
+
+    def __init__(self, max_in_flight: int, min_interval: float = 0.0) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self.min_interval = min_interval
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._pace_lock = asyncio.Lock()
+        self._last_admitted = 0.0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def acquire(self) -> None:
+        """Wait for a slot; pair with release(). Prefer ``async with`` where it fits."""
+        await self._semaphore.acquire()
+        if self.min_interval:
+            async with self._pace_lock:
+                wait = self._last_admitted + self.min_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_admitted = time.monotonic()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    async def try_acquire(self) -> bool:
+        """Take a slot only if that needs no wait; pair a True result with release()."""
+        if self._semaphore.locked() or self._pace_lock.locked():
+            return False
+        if self.min_interval and time.monotonic() < self._last_admitted + self.min_interval:
+            return False
+        # A free slot is taken without suspending
+        await self._semaphore.acquire()
+        self._last_admitted = time.monotonic()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def __aenter__(self) -> AdmissionController:
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.release()
@@ -0,0 +1,243 @@
+"""Durable storage for the outputs and logs of finished deployments.
+
+Agent directories live under the artifact root (``artifact_root``, default
+``.haymaker``), which can sit on fast local disk or tmpfs and is cleaned up
+by retention (see retention.py). With ``artifact_store`` set, a finished
+deployment's logs, events, checkpoint and ``output/`` are also shipped to
+a store, under ``<deployment_id>/<path in the agent directory>``:
+
+    /srv/artifacts, file:///srv/artifacts   LocalArtifactStore
+    s3://bucket/prefix                      S3ArtifactStore (needs boto3)
+
+``artifact_store_endpoint`` points the S3 store at any S3-compatible
+service (MinIO, Ceph, R2, ...); credentials come from the usual boto3
+sources. Files are streamed: the local store copies in chunks, and the S3
+store sends anything over one part as a multipart upload, so at most one
+part is held in memory.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
+from typing import IO, Any
+from urllib.parse import urlparse
+
+from .log_relay import COMPRESSIONS
+from .retention import archive_members
+
+# S3 requires every part but the last to be at least 5 MiB
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+_COPY_CHUNK = 1024 * 1024
+
+
+class ArtifactStore(ABC):
+    """Somewhere to keep deployment artifacts, addressed by '/'-separated keys."""
+
+    url: str
+
+    @abstractmethod
+    def put(self, key: str, stream: IO[bytes]) -> int:
+        """Store everything read from stream under key; returns the bytes written."""
+
+    @abstractmethod
+    def open(self, key: str) -> IO[bytes]:
+        """Open a stored artifact for streaming reads; FileNotFoundError if absent."""
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> Iterator[str]:
+        """Keys starting with prefix, in lexicographic order."""
+
+
+def _check_key(key: str) -> str:
+    parts = PurePosixPath(key).parts
+    if not parts or key.startswith("/") or ".." in parts:
+        raise ValueError(f"Invalid artifact key: {key!r}")
+    return key
+
+
+class LocalArtifactStore(ArtifactStore):
+    """Artifacts as files under a directory, e.g. a mounted network volume."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.url = self.root.resolve().as_uri()
+
+    def put(self, key: str, stream: IO[bytes]) -> int:
+        path = self.root / _check_key(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(stream, f, _COPY_CHUNK)
+                size = f.tell()
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return size
+
+    def open(self, key: str) -> IO[bytes]:
+        return open(self.root / _check_key(key), "rb")
+
+    def list(self, prefix: str = "") -> Iterator[str]:
+        if not self.root.is_dir():
+            return iter(())
+        keys = (
+            path.relative_to(self.root).as_posix()
+            for path in self.root.rglob("*")
+            if path.is_file() and not path.name.endswith(".tmp")
+        )
+        return iter(sorted(key for key in keys if key.startswith(prefix)))
+
+
+class S3ArtifactStore(ArtifactStore):
+    """Artifacts as objects in an S3 or S3-compatible bucket.
+
+    ``client`` is a boto3 S3 client; by default one is created for
+    ``endpoint_url`` (None for AWS itself).
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: str | None = None,
+        client: Any = None,
+        part_size: int = DEFAULT_PART_SIZE,
+    ) -> None:
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.url = f"s3://{bucket}/{self.prefix}"
+        self.part_size = part_size
+        if client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError("artifact_store s3:// requires boto3 (pip install boto3)") from e
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+
+    def put(self, key: str, stream: IO[bytes]) -> int:
+        name = self.prefix + _check_key(key)
+        chunk = stream.read(self.part_size)
+        if len(chunk) < self.part_size:
+            self.client.put_object(Bucket=self.bucket, Key=name, Body=chunk)
+            return len(chunk)
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=name)["UploadId"]
+        parts = []
+        size = 0
+        try:
+            while chunk:
+                response = self.client.upload_part(
+                    Bucket=self.bucket,
+                    Key=name,
+                    UploadId=upload_id,
+                    PartNumber=len(parts) + 1,
+                    Body=chunk,
+                )
+                parts.append({"PartNumber": len(parts) + 1, "ETag": response["ETag"]})
+                size += len(chunk)
+                chunk = stream.read(self.part_size)
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=name,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            # Don't leave billed, invisible parts behind
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=name, UploadId=upload_id)
+            raise
+        return size
+
+    def open(self, key: str) -> IO[bytes]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.prefix + _check_key(key))
+        except self.client.exceptions.NoSuchKey as e:
+            raise FileNotFoundError(f"{self.url}{key}") from e
+        return response["Body"]
+
+    def list(self, prefix: str = "") -> Iterator[str]:
+        request = {"Bucket": self.bucket, "Prefix": self.prefix + prefix}
+        while True:
+            response = self.client.list_objects_v2(**request)
+            for item in response.get("Contents", []):
+                yield item["Key"][len(self.prefix) :]
+            if not response.get("IsTruncated"):
+                return
+            request["ContinuationToken"] = response["NextContinuationToken"]
+
+
+def artifact_store(config: dict) -> ArtifactStore | None:
+    """The store a deployment config ships to, or None if it has none."""
+    location = config.get("artifact_store")
+    if not location:
+        return None
+    url = urlparse(location)
+    if url.scheme == "s3":
+        return S3ArtifactStore(
+            url.netloc, url.path, endpoint_url=config.get("artifact_store_endpoint")
+        )
+    if url.scheme == "file":
+        return LocalArtifactStore(Path(url.path))
+    return LocalArtifactStore(Path(location).expanduser())
+
+
+def upload_agent_dir(agent_dir: Path, store: ArtifactStore, prefix: str) -> dict[str, int]:
+    """Ship the logs and outputs of an agent directory to store under prefix/.
+
+    Uploads the same files an archive would keep (see retention.py), one
+    stream at a time. Returns the number of files and bytes shipped.
+    """
+    files = 0
+    size = 0
+    for member in archive_members(agent_dir):
+        paths = sorted(p for p in member.rglob("*") if p.is_file()) if member.is_dir() else [member]
+        for path in paths:
+            # A log segment may have been compressed (and renamed) since it was listed
+            for candidate in [path, *(Path(f"{path}{ext}") for ext in COMPRESSIONS.values())]:
+                try:
+                    with open(candidate, "rb") as f:
+                        key = f"{prefix}/{candidate.relative_to(agent_dir).as_posix()}"
+                        size += store.put(key, f)
+                except FileNotFoundError:
+                    continue
+                files += 1
+                break
+    return {"files": files, "bytes": size}
+
+
+def validate_artifact_options(config: dict) -> list[str]:
+    errors = []
+    root = config.get("artifact_root")
+    if root is not None and (not isinstance(root, str) or not root):
+        errors.append("artifact_root must be a directory path")
+
+    location = config.get("artifact_store")
+    endpoint = config.get("artifact_store_endpoint")
+    if location is not None and (not isinstance(location, str) or not location):
+        errors.append("artifact_store must be a directory path, file:// or s3:// URL")
+    elif location:
+        url = urlparse(location)
+        if url.scheme == "s3" and not url.netloc:
+            errors.append(
+                f"artifact_store must name a bucket: s3://<bucket>/<prefix> (got '{location}')"
+            )
+        elif url.scheme == "s3" and importlib.util.find_spec("boto3") is None:
+            errors.append("artifact_store s3:// requires boto3 (pip install boto3)")
+        elif url.scheme not in ("", "s3", "file"):
+            errors.append(
+                f"artifact_store must be a directory path, file:// or s3:// URL (got '{location}')"
+            )
+    if endpoint is not None and not (
+        isinstance(location, str) and urlparse(location).scheme == "s3"
+    ):
+        errors.append("artifact_store_endpoint requires an s3:// artifact_store")
+    return errors
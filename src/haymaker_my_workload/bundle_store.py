@@ -0,0 +1,126 @@
+"""Content-addressed store for agent bundle files.
+
+Deployments of the same goal produce bundles whose files (main.py, skills,
+config templates) are mostly byte-identical. Instead of keeping a copy per
+deployment, :meth:`BundleStore.dedupe` runs over each freshly packaged
+bundle: every file is stored under its SHA-256
+(``.haymaker/blobs/ab/abcdef...``) and replaced by a hardlink to that
+blob, so identical files across any number of deployments share one
+inode and one set of disk blocks.
+
+Blobs are read-only, so an agent not running as root cannot modify a
+file other deployments share; root ignores the permission bits, which is
+why the workload only dedupes when ``bundle_dedup`` is turned on. Files
+the agent or workload create at run time (agent.log, events.jsonl,
+checkpoints, output/) are ordinary per-deployment files.
+Agents that rewrite a bundle file must replace it (write a new file and
+rename), which breaks the link instead of writing through it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+from pathlib import Path
+
+_CHUNK = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BundleStore:
+    """Hardlink-deduplicating blob store rooted at one directory."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def blob_path(self, digest: str, executable: bool = False) -> Path:
+        # Permission bits live on the shared inode, so executables get their own blob
+        suffix = ".x" if executable else ""
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def add(self, path: Path) -> tuple[Path, bool]:
+        """Store a file's content; returns the blob and whether it was new.
+
+        A new file is linked (not copied) into the store and made
+        read-only, so adding costs one read for hashing and no data writes.
+        """
+        executable = bool(path.stat().st_mode & stat.S_IXUSR)
+        blob = self.blob_path(file_digest(path), executable)
+        if blob.exists():
+            return blob, False
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=blob.parent, suffix=".tmp")
+        os.close(fd)
+        os.unlink(tmp)
+        try:
+            try:
+                os.link(path, tmp)
+            except OSError:
+                shutil.copyfile(path, tmp)
+            os.chmod(tmp, 0o555 if executable else 0o444)
+            # Another process may have stored the same content meanwhile;
+            # either copy is fine.
+            os.replace(tmp, blob)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return blob, True
+
+    def dedupe(self, agent_dir: Path) -> dict[str, int]:
+        """Replace each bundle file under ``agent_dir`` with a link to its blob.
+
+        Files already stored by an earlier bundle are swapped for a link to
+        that blob, freeing their copy. Files that cannot be linked (e.g. the
+        store is on another filesystem) are left as they are. Empty files
+        and symlinks are skipped. Returns file and byte counts.
+        """
+        stats = {"files": 0, "shared": 0, "bytes": 0, "bytes_shared": 0}
+        for path in sorted(Path(agent_dir).rglob("*")):
+            if path.is_symlink() or not path.is_file():
+                continue
+            st = path.stat()
+            if not st.st_size:
+                continue
+            blob, new = self.add(path)
+            stats["files"] += 1
+            stats["bytes"] += st.st_size
+            if new:
+                continue
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.link")
+            try:
+                os.link(blob, tmp)
+                os.replace(tmp, path)
+            except OSError:
+                tmp.unlink(missing_ok=True)
+                continue
+            stats["shared"] += 1
+            stats["bytes_shared"] += st.st_size
+        return stats
+
+    def prune(self) -> tuple[int, int]:
+        """Delete blobs no longer linked from any agent directory.
+
+        Returns the number of blobs removed and the bytes freed.
+        """
+        removed = freed = 0
+        for blob in self.root.glob("*/*"):
+            try:
+                st = blob.stat()
+            except OSError:
+                continue
+            if st.st_nlink == 1 and not blob.name.endswith(".tmp"):
+                blob.unlink(missing_ok=True)
+                removed += 1
+                freed += st.st_size
+        return removed, freed
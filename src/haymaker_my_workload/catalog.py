@@ -0,0 +1,246 @@
+"""Indexed deployment catalog.
+
+The platform stores each deployment's state as its own record, which is
+fine for lookups by id but means any listing or dashboard query has to
+load every state. The workload therefore mirrors a summary row of each
+state into a local SQLite database on every save. The database runs in
+WAL mode so CLI processes can read it while another one writes.
+
+The catalog is derived data: if it is lost or falls behind, rebuild it
+from the platform with MyWorkload.rebuild_catalog().
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+# Filterable and sortable columns, in table order
+COLUMNS = (
+    "deployment_id",
+    "workload_name",
+    "status",
+    "phase",
+    "sdk",
+    "goal_file",
+    "goal_hash",
+    "started_at",
+    "completed_at",
+    "stopped_at",
+    "duration_seconds",
+    "input_tokens",
+    "output_tokens",
+    "error",
+    "updated_at",
+)
+_GROUPABLE = ("workload_name", "status", "phase", "sdk", "goal_file", "goal_hash")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deployments (
+    deployment_id TEXT PRIMARY KEY,
+    workload_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    phase TEXT,
+    sdk TEXT,
+    goal_file TEXT,
+    goal_hash TEXT,
+    started_at TEXT,
+    completed_at TEXT,
+    stopped_at TEXT,
+    duration_seconds REAL,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_deployments_status ON deployments (status, started_at);
+CREATE INDEX IF NOT EXISTS idx_deployments_workload ON deployments (workload_name, started_at);
+CREATE INDEX IF NOT EXISTS idx_deployments_sdk ON deployments (sdk, started_at);
+CREATE INDEX IF NOT EXISTS idx_deployments_goal_hash ON deployments (goal_hash, started_at);
+CREATE INDEX IF NOT EXISTS idx_deployments_started_at ON deployments (started_at);
+CREATE INDEX IF NOT EXISTS idx_deployments_updated_at ON deployments (updated_at);
+"""
+
+
+def _iso(value: Any) -> str | None:
+    # Timestamps are stored as UTC ISO strings so they sort lexically
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _duration(started: Any, finished: Any) -> float | None:
+    if started is None or finished is None:
+        return None
+    try:
+        if not isinstance(started, datetime):
+            started = datetime.fromisoformat(started)
+        if not isinstance(finished, datetime):
+            finished = datetime.fromisoformat(finished)
+    except (TypeError, ValueError):
+        return None
+    return (finished - started).total_seconds()
+
+
+def catalog_row(state: Any) -> dict[str, Any]:
+    """Flatten a DeploymentState into a catalog row."""
+    metadata = state.metadata or {}
+    config = state.config or {}
+    usage = metadata.get("llm_usage") or {}
+    finished = state.completed_at or state.stopped_at
+    status = getattr(state.status, "value", state.status)
+    return {
+        "deployment_id": state.deployment_id,
+        "workload_name": state.workload_name,
+        "status": status,
+        "phase": state.phase,
+        "sdk": metadata.get("sdk") or config.get("sdk"),
+        "goal_file": config.get("goal_file"),
+        "goal_hash": metadata.get("goal_hash"),
+        "started_at": _iso(state.started_at),
+        "completed_at": _iso(state.completed_at),
+        "stopped_at": _iso(state.stopped_at),
+        "duration_seconds": _duration(state.started_at, finished),
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+        "error": state.error,
+        "updated_at": time.time(),
+        "metadata": json.dumps(metadata, default=str),
+    }
+
+
+class DeploymentCatalog:
+    """SQLite index of deployment summaries."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def change_token(self) -> tuple:
+        """Cheap stat-based token that changes whenever any process commits.
+
+        Lets watchers skip querying the database while nothing was written.
+        """
+        token = []
+        for suffix in ("", "-wal"):
+            try:
+                st = self.path.with_name(self.path.name + suffix).stat()
+            except OSError:
+                token.append(None)
+            else:
+                token.append((st.st_mtime_ns, st.st_size))
+        return tuple(token)
+
+    def close(self) -> None:
+        self._conn.execute("PRAGMA optimize")
+        self._conn.close()
+
+    def upsert(self, state: Any) -> None:
+        """Insert or replace the row for one deployment state."""
+        self.upsert_many([state])
+
+    def upsert_many(self, states: list[Any]) -> None:
+        rows = [catalog_row(state) for state in states]
+        if not rows:
+            return
+        names = list(rows[0])
+        sql = (
+            f"INSERT OR REPLACE INTO deployments ({', '.join(names)}) "
+            f"VALUES ({', '.join(':' + n for n in names)})"
+        )
+        with self._conn:
+            self._conn.executemany(sql, rows)
+
+    def delete(self, deployment_id: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM deployments WHERE deployment_id = ?", (deployment_id,))
+
+    def list_deployments(
+        self,
+        filter: dict[str, Any] | None = None,
+        order: str = "-started_at",
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Catalog rows matching ``filter``, sorted by ``order``.
+
+        ``filter`` maps column names to a value, or to a list of values to
+        match any of; ``started_after`` and ``started_before`` bound
+        started_at, and ``updated_after`` (epoch seconds) selects rows
+        written since then. ``order`` is a column name, prefixed with ``-`` for
+        descending. Rows are dicts with metadata decoded.
+        """
+        where, params = _where(filter)
+        column = order.lstrip("-")
+        if column not in COLUMNS:
+            raise ValueError(f"Cannot order by {column!r}; must be one of {', '.join(COLUMNS)}")
+        direction = "DESC" if order.startswith("-") else "ASC"
+        # No tie-breaker: it would stop SQLite from reading rows in index order
+        sql = f"SELECT * FROM deployments{where} ORDER BY {column} {direction}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        rows = []
+        for row in self._conn.execute(sql, params):
+            item = dict(row)
+            item["metadata"] = json.loads(item["metadata"]) if item["metadata"] else {}
+            rows.append(item)
+        return rows
+
+    def count(self, filter: dict[str, Any] | None = None) -> int:
+        where, params = _where(filter)
+        return self._conn.execute(f"SELECT COUNT(*) FROM deployments{where}", params).fetchone()[0]
+
+    def aggregate(
+        self, group_by: str, filter: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        """Per-group deployment counts, token totals and mean duration."""
+        if group_by not in _GROUPABLE:
+            raise ValueError(
+                f"Cannot group by {group_by!r}; must be one of {', '.join(_GROUPABLE)}"
+            )
+        where, params = _where(filter)
+        sql = (
+            f"SELECT {group_by} AS key, COUNT(*) AS deployments,"
+            " SUM(input_tokens) AS input_tokens, SUM(output_tokens) AS output_tokens,"
+            " AVG(duration_seconds) AS avg_duration_seconds"
+            f" FROM deployments{where} GROUP BY {group_by} ORDER BY deployments DESC, key"
+        )
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+
+def _where(filter: dict[str, Any] | None) -> tuple[str, list[Any]]:
+    clauses: list[str] = []
+    params: list[Any] = []
+    for key, value in (filter or {}).items():
+        if key == "started_after":
+            clauses.append("started_at >= ?")
+            params.append(_iso(value))
+        elif key == "started_before":
+            clauses.append("started_at < ?")
+            params.append(_iso(value))
+        elif key == "updated_after":
+            clauses.append("updated_at > ?")
+            params.append(value)
+        elif key not in COLUMNS:
+            raise ValueError(f"Cannot filter on {key!r}; must be one of {', '.join(COLUMNS)}")
+        elif isinstance(value, list | tuple | set | frozenset):
+            values = [getattr(v, "value", v) for v in value]
+            clauses.append(f"{key} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        elif value is None:
+            clauses.append(f"{key} IS NULL")
+        else:
+            clauses.append(f"{key} = ?")
+            params.append(getattr(value, "value", value))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
@@ -0,0 +1,81 @@
+"""Agent checkpoints for resuming interrupted deployments.
+
+A launched agent finds the path of its checkpoint file in
+``HAYMAKER_CHECKPOINT_FILE`` (``<agent_dir>/checkpoint.json``). After each
+completed plan phase it should save whatever it needs to carry on --
+completed phases, conversation history, intermediate results -- with
+:func:`save_checkpoint`. The content is opaque to the workload apart from
+the optional ``phases_completed`` and ``turns_used`` keys, which are shown
+in deployment metadata.
+
+When MyWorkload.start() relaunches a stopped or failed deployment it
+reuses the existing bundle and sets ``HAYMAKER_RESUME=1`` if a checkpoint
+exists; the agent then calls :func:`load_checkpoint` and skips the work
+already done. Agents that ignore checkpoints simply start over, still
+without repeating generation.
+
+Like events.py, this module only uses the standard library so agents can
+copy or import it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+CHECKPOINT_FILE = "checkpoint.json"
+CHECKPOINT_FILE_ENV = "HAYMAKER_CHECKPOINT_FILE"
+RESUME_ENV = "HAYMAKER_RESUME"
+
+
+def read_checkpoint(path: Path) -> dict[str, Any] | None:
+    """Parse a checkpoint file, or None if it is missing or unreadable."""
+    try:
+        data = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def write_checkpoint(path: Path, data: dict[str, Any]) -> None:
+    """Atomically replace the checkpoint file so a crash never leaves half of one."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".checkpoint-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({**data, "saved_at": time.time()}, f)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def save_checkpoint(data: dict[str, Any]) -> None:
+    """Save a checkpoint from inside an agent process.
+
+    A no-op when the agent was launched without a checkpoint file.
+    """
+    path = os.environ.get(CHECKPOINT_FILE_ENV)
+    if path:
+        write_checkpoint(Path(path), data)
+
+
+def load_checkpoint() -> dict[str, Any] | None:
+    """The checkpoint to resume from inside an agent process, if resuming."""
+    path = os.environ.get(CHECKPOINT_FILE_ENV)
+    if not path or not os.environ.get(RESUME_ENV):
+        return None
+    return read_checkpoint(Path(path))
+
+
+def resume_summary(checkpoint: dict[str, Any]) -> dict[str, Any]:
+    """The parts of a checkpoint worth recording in deployment metadata."""
+    return {
+        key: checkpoint[key]
+        for key in ("phases_completed", "turns_used", "saved_at")
+        if key in checkpoint
+    }
@@ -0,0 +1,168 @@
+"""Structured agent event stream.
+
+Alongside the human-readable agent.log, a launched agent can report
+machine-readable progress as JSON Lines in ``<agent_dir>/events.jsonl``.
+The workload passes an already-open, append-only descriptor for that file
+in ``HAYMAKER_EVENTS_FD`` (and its path in ``HAYMAKER_EVENTS_FILE`` for
+agents that prefer to open it themselves).
+
+Each line is one JSON object with a ``type`` field:
+
+    {"type": "phase_start", "phase": "analyze"}
+    {"type": "phase_end", "phase": "analyze"}
+    {"type": "turn", "turn": 3}
+    {"type": "tool_call", "tool": "read_file"}
+    {"type": "llm_call", "input_tokens": 1200, "output_tokens": 300}
+    {"type": "outcome", "status": "completed"}
+    {"type": "outcome", "status": "failed", "error": "rate limited"}
+
+Unknown types and malformed lines are ignored so agents and workload can
+evolve independently.
+
+Only agents that call emit() write events: the mock SDK's agent, or a
+bundle instrumented by hand. For the others, log_events() derives phase
+and turn events from agent.log lines as they are appended -- a line
+naming a plan phase next to the word "phase", or "turn N" -- so progress
+is approximate and tool calls, LLM usage and outcomes are not reported.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any
+
+EVENTS_FILE = "events.jsonl"
+EVENTS_FD_ENV = "HAYMAKER_EVENTS_FD"
+EVENTS_FILE_ENV = "HAYMAKER_EVENTS_FILE"
+
+OUTCOME_STATUSES = ("completed", "failed")
+
+_LOG_CHUNK_BYTES = 1 << 20
+_TURN_LINE = re.compile(r"\bturn\s+(\d+)\b", re.IGNORECASE)
+_PHASE_LINE = re.compile(r"\bphase\b", re.IGNORECASE)
+
+
+def read_events(path: Path, offset: int = 0) -> tuple[list[dict[str, Any]], int]:
+    """Read events appended to ``path`` since ``offset``.
+
+    Returns the parsed events and the offset to resume from. A trailing
+    line without a newline is still being written, so it is left for the
+    next read rather than parsed half-finished.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+
+    end = data.rfind(b"\n")
+    if end == -1:
+        return [], offset
+
+    events = []
+    for raw in data[: end + 1].splitlines():
+        if not raw.strip():
+            continue
+        try:
+            event = json.loads(raw)
+        except ValueError:
+            continue
+        if isinstance(event, dict) and isinstance(event.get("type"), str):
+            events.append(event)
+    return events, offset + end + 1
+
+
+def log_events(
+    path: Path, offset: int = 0, phases: list[str] | tuple[str, ...] = ()
+) -> tuple[list[dict[str, Any]], int]:
+    """Derive phase and turn events from log lines appended since ``offset``.
+
+    A line containing the word "phase" and one of the plan's phases starts
+    that phase and ends the ones planned before it; "turn N" reports turn
+    N. Like read_events, returns the events and the offset to resume from,
+    leaving a trailing partial line for the next read. Reads at most 1 MiB
+    per call, so a long backlog is caught up over several polls.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(_LOG_CHUNK_BYTES)
+    except OSError:
+        return [], offset
+
+    end = data.rfind(b"\n")
+    if end == -1:
+        # A single line longer than a chunk is skipped rather than waited on
+        return [], offset + len(data) if len(data) == _LOG_CHUNK_BYTES else offset
+
+    patterns = [
+        (index, re.compile(rf"\b{re.escape(phase)}\b", re.IGNORECASE))
+        for index, phase in enumerate(phases)
+    ]
+    events: list[dict[str, Any]] = []
+    for line in data[: end + 1].decode(errors="replace").splitlines():
+        turn = _TURN_LINE.search(line)
+        if turn:
+            events.append({"type": "turn", "turn": int(turn.group(1))})
+        if not _PHASE_LINE.search(line):
+            continue
+        named = [(m.start(), index) for index, p in patterns if (m := p.search(line))]
+        if named:
+            index = min(named)[1]
+            events.extend({"type": "phase_end", "phase": p} for p in phases[:index])
+            events.append({"type": "phase_start", "phase": phases[index]})
+    return events, offset + end + 1
+
+
+def apply_events(progress: dict[str, Any], events: list[dict[str, Any]]) -> None:
+    """Fold events into a progress summary dict in-place.
+
+    The summary holds ``current_phase``, ``phases_completed``,
+    ``turns_used``, ``tool_calls`` and, once the agent reports it,
+    ``outcome``. LLM usage is metered separately (see metering.py).
+    """
+    for event in events:
+        kind = event["type"]
+        if kind == "phase_start":
+            progress["current_phase"] = event.get("phase")
+        elif kind == "phase_end":
+            completed = progress.setdefault("phases_completed", [])
+            phase = event.get("phase")
+            if phase and phase not in completed:
+                completed.append(phase)
+        elif kind == "turn":
+            turn = event.get("turn")
+            if isinstance(turn, int):
+                progress["turns_used"] = max(turn, progress.get("turns_used", 0))
+            else:
+                progress["turns_used"] = progress.get("turns_used", 0) + 1
+        elif kind == "tool_call":
+            progress["tool_calls"] = progress.get("tool_calls", 0) + 1
+        elif kind == "outcome" and event.get("status") in OUTCOME_STATUSES:
+            progress["outcome"] = {
+                "status": event["status"],
+                "error": event.get("error"),
+            }
+
+
+def emit(event_type: str, **fields: Any) -> None:
+    """Write one event from inside an agent process.
+
+    Uses the descriptor from ``HAYMAKER_EVENTS_FD`` when present, falling
+    back to ``HAYMAKER_EVENTS_FILE``. A no-op when the agent was launched
+    without an event stream.
+    """
+    line = json.dumps({"type": event_type, "ts": time.time(), **fields}) + "\n"
+    fd = os.environ.get(EVENTS_FD_ENV)
+    if fd is not None:
+        os.write(int(fd), line.encode())
+        return
+    path = os.environ.get(EVENTS_FILE_ENV)
+    if path:
+        with open(path, "a") as f:
+            f.write(line)
@@ -0,0 +1,165 @@
+"""Index of goal files with their parsed metadata.
+
+Goal prompts are markdown files: a ``# Title`` line, then ``## Goal``,
+``## Constraints`` and ``## Success Criteria`` sections. The index keeps,
+per goal file, its content hash (the deployments' ``goal_hash``), title,
+sections and the stat fields it was read at, in a JSON file under
+the state root (``~/.haymaker``). A refresh stats every goal file and re-reads only the ones
+whose size, mtime or inode changed, so listing or validating thousands of
+goals costs little more than a directory walk.
+
+The index is a cache: deleting it only makes the next refresh read every
+file again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+GOAL_SUFFIXES = (".md", ".markdown", ".txt")
+GOAL_SECTIONS = ("Goal", "Constraints", "Success Criteria")
+GOAL_DIRS_ENV = "HAYMAKER_GOAL_DIRS"
+
+_SECTION_HEADING = re.compile(r"^##\s+(.+?)\s*#*\s*$")
+# Bump when entries change shape, so stale caches are rebuilt
+_INDEX_VERSION = 1
+
+
+def goal_dirs(directories: list[Path] | None = None) -> list[Path]:
+    """Directories to index: the given ones, else goals/ plus HAYMAKER_GOAL_DIRS."""
+    if directories is not None:
+        return [Path(d) for d in directories]
+    extra = [Path(d) for d in os.environ.get(GOAL_DIRS_ENV, "").split(os.pathsep) if d]
+    return [Path("goals"), *extra]
+
+
+def parse_goal(text: str) -> dict[str, Any]:
+    """Title and ``##`` sections of a goal prompt, and which expected sections are missing."""
+    title = text.split("\n")[0].strip("# ").strip()
+    sections: dict[str, str] = {}
+    current = None
+    lines: list[str] = []
+    for line in text.splitlines():
+        match = _SECTION_HEADING.match(line)
+        if match:
+            if current is not None:
+                sections[current] = "\n".join(lines).strip()
+            current, lines = match.group(1), []
+        elif current is not None:
+            lines.append(line)
+    if current is not None:
+        sections[current] = "\n".join(lines).strip()
+    present = {name.lower() for name, body in sections.items() if body}
+    return {
+        "title": title,
+        "sections": sections,
+        "missing_sections": [name for name in GOAL_SECTIONS if name.lower() not in present],
+    }
+
+
+def _stat_key(st: os.stat_result) -> list[int]:
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+class GoalIndex:
+    """Goal metadata keyed by absolute path, refreshed by stat and cached on disk."""
+
+    def __init__(self, cache_path: Path | None = None) -> None:
+        self.cache_path = cache_path
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        # list_goals() refreshes on a worker thread while deploys look goals up
+        self._lock = threading.RLock()
+        if cache_path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == _INDEX_VERSION:
+            self._entries = data.get("goals", {})
+
+    def save(self) -> None:
+        """Write the index back to its cache file if it changed (atomic replace)."""
+        with self._lock:
+            if self.cache_path is None or not self._dirty:
+                return
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump({"version": _INDEX_VERSION, "goals": self._entries}, f)
+                os.replace(tmp, self.cache_path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            self._dirty = False
+
+    def get(self, path: Path) -> dict[str, Any]:
+        """The entry for one goal file, re-reading it only if it changed.
+
+        Raises OSError (e.g. FileNotFoundError) if it cannot be read.
+        """
+        path = Path(path).absolute()
+        with self._lock:
+            return self._entry(path, os.stat(path))
+
+    def _entry(self, path: Path, st: os.stat_result) -> dict[str, Any]:
+        key = str(path)
+        entry = self._entries.get(key)
+        if entry is not None and entry["stat"] == _stat_key(st):
+            return entry
+        data = path.read_bytes()
+        entry = {
+            "path": key,
+            "name": path.stem,
+            "hash": hashlib.sha256(data).hexdigest(),
+            **parse_goal(data.decode(errors="replace")),
+            "size": st.st_size,
+            "mtime": st.st_mtime,
+            # Read just before the content: a write in between only costs a re-read
+            "stat": _stat_key(st),
+        }
+        self._entries[key] = entry
+        self._dirty = True
+        return entry
+
+    def refresh(self, directories: list[Path]) -> list[dict[str, Any]]:
+        """Entries for every goal file under the directories, sorted by path.
+
+        Unchanged files are not read; entries of files that no longer exist
+        under the directories are dropped.
+        """
+        with self._lock:
+            return self._refresh([Path(d).absolute() for d in directories])
+
+    def _refresh(self, roots: list[Path]) -> list[dict[str, Any]]:
+        found: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        for root in roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+                for filename in filenames:
+                    path = Path(dirpath) / filename
+                    if path.suffix not in GOAL_SUFFIXES or str(path) in seen:
+                        continue
+                    try:
+                        entry = self._entry(path, path.stat())
+                    except OSError:
+                        continue  # Removed while walking
+                    seen.add(str(path))
+                    found.append(entry)
+        for key in list(self._entries):
+            if key not in seen and any(Path(key).is_relative_to(root) for root in roots):
+                del self._entries[key]
+                self._dirty = True
+        return sorted(found, key=lambda entry: entry["path"])
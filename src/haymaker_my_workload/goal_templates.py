@@ -0,0 +1,264 @@
+"""Parameterized goal templates for fanning one goal out over many inputs.
+
+A goal template is an ordinary goal file with ``{name}`` placeholders,
+e.g. ``Organize the files in {target_dir}``. Only ``{`` + identifier +
+``}`` counts as a placeholder, so other braces in the prompt (JSON
+examples, code) are left alone. MyWorkload.deploy_template() pairs a
+template with a CSV or JSONL file of parameter rows and launches one agent
+per row.
+
+The generator runs once, on the template with each placeholder replaced by
+a ``@@name@@`` marker that survives into the bundle. BundleTemplate reads
+that bundle once and remembers which files contain markers; rendering a row
+writes those files with the row's values substituted and copies the rest.
+Copies rather than hardlinks: an agent that rewrites a file of its own
+bundle must not change every other row's. If the generator
+rewrote the goal text and a placeholder's marker did not survive anywhere,
+the template is rejected rather than fanned out as identical agents.
+
+Values are escaped for where their marker sits: inside JSON strings in
+``.json`` files, and in ``.py`` files for the string literal around the
+marker (its quotes, and braces in f-strings), or kept on one line in a
+comment. A value that a raw string literal cannot hold (its quote
+character, a trailing backslash) fails that row.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import tokenize
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+ROW_SUFFIXES = (".csv", ".jsonl", ".ndjson")
+TEMPLATES_DIR = "templates"
+
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+_MARKER = re.compile(r"@@([A-Za-z_][A-Za-z0-9_]*)@@")
+_STRING_PREFIX = re.compile(r"([A-Za-z]*)('\'\'|\"\"\"|'|\")")
+# Used when a .py file does not tokenize: valid inside any non-raw literal
+_ANY_STRING = ("string", "", '"')
+
+
+def template_fields(text: str) -> list[str]:
+    """Placeholder names in a goal template, in order of first use."""
+    return list(dict.fromkeys(_PLACEHOLDER.findall(text)))
+
+
+def render_goal(text: str, params: dict[str, str]) -> str:
+    """Fill a template's placeholders. Raises ValueError naming any missing ones."""
+    missing = [name for name in template_fields(text) if name not in params]
+    if missing:
+        raise ValueError(f"missing template parameters: {', '.join(missing)}")
+    return _PLACEHOLDER.sub(lambda m: params[m.group(1)], text)
+
+
+def marker_goal(text: str) -> str:
+    """The template with placeholders swapped for markers, for the generator."""
+    return _PLACEHOLDER.sub(lambda m: f"@@{m.group(1)}@@", text)
+
+
+def _python_spans(text: str) -> list[tuple[int, int, tuple]] | None:
+    """(start, end, context) of the string literals and comments in Python source.
+
+    Context is ("comment",) or ("string", prefix, quote). None if the
+    source does not tokenize.
+    """
+    line_starts = [0]
+    for line in text.split("\n")[:-1]:
+        line_starts.append(line_starts[-1] + len(line) + 1)
+
+    def offset(position: tuple[int, int]) -> int:
+        return line_starts[position[0] - 1] + position[1]
+
+    fstring_start = getattr(tokenize, "FSTRING_START", None)  # Python 3.12+
+    fstring_end = getattr(tokenize, "FSTRING_END", None)
+    spans, open_fstrings = [], []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(text).readline):
+            if token.type == tokenize.COMMENT:
+                spans.append((offset(token.start), offset(token.end), ("comment",)))
+            elif token.type == tokenize.STRING:
+                prefix, quote = _STRING_PREFIX.match(token.string).groups()
+                spans.append((offset(token.start), offset(token.end), ("string", prefix, quote)))
+            elif token.type == fstring_start:
+                open_fstrings.append(token)
+            elif token.type == fstring_end and open_fstrings:
+                start = open_fstrings.pop()
+                prefix, quote = _STRING_PREFIX.match(start.string).groups()
+                spans.append((offset(start.start), offset(token.end), ("string", prefix, quote)))
+    except (tokenize.TokenError, SyntaxError):
+        return None
+    return spans
+
+
+def _python_value(value: str, field: str, context: tuple) -> str:
+    """A value escaped to stand in for a marker in a Python literal or comment."""
+    if context[0] == "comment":
+        return " ".join(value.splitlines())
+    _, prefix, quote = context
+    prefix = prefix.lower()
+    if "b" in prefix and not value.isascii():
+        raise ValueError(f"value for {field} must be ASCII inside a bytes literal")
+    if "r" in prefix:
+        if (
+            quote[0] in value
+            or value.endswith("\\")
+            or (len(quote) == 1 and ("\n" in value or "\r" in value))
+        ):
+            raise ValueError(f"value for {field} cannot be placed in a raw string literal")
+        escaped = value
+    else:
+        escaped = "".join(
+            "\\" + ch if ch in "\\'\"" else f"\\x{ord(ch):02x}" if ch < " " or ch == "\x7f" else ch
+            for ch in value
+        )
+    if "f" in prefix:
+        escaped = escaped.replace("{", "{{").replace("}", "}}")
+    return escaped
+
+
+def _compile(text: str, suffix: str) -> list[str | tuple[str, tuple]]:
+    """Split a bundle file into literal text and (field, context) marker slots."""
+    if suffix == ".py":
+        spans = _python_spans(text)
+    pieces: list[str | tuple[str, tuple]] = []
+    last = 0
+    for match in _MARKER.finditer(text):
+        if suffix == ".json":
+            context: tuple = ("json",)
+        elif suffix != ".py":
+            context = ("text",)
+        elif spans is None:
+            context = _ANY_STRING
+        else:
+            enclosing = [
+                span for span in spans if span[0] <= match.start() and match.end() <= span[1]
+            ]
+            if not enclosing:
+                raise ValueError(
+                    f"marker {match.group(0)} is outside any string literal or comment"
+                )
+            # The innermost literal decides (nested f-strings)
+            context = min(enclosing, key=lambda span: span[1] - span[0])[2]
+        pieces.append(text[last : match.start()])
+        pieces.append((match.group(1), context))
+        last = match.end()
+    pieces.append(text[last:])
+    return pieces
+
+
+def _fill(pieces: list[str | tuple[str, tuple]], params: dict[str, str]) -> str:
+    out = []
+    for piece in pieces:
+        if isinstance(piece, str):
+            out.append(piece)
+            continue
+        field, context = piece
+        if field not in params:
+            out.append(f"@@{field}@@")  # Not a placeholder of this template
+        elif context[0] == "json":
+            out.append(json.dumps(params[field])[1:-1])
+        elif context[0] == "text":
+            out.append(params[field])
+        else:
+            out.append(_python_value(params[field], field, context))
+    return "".join(out)
+
+
+def _param_value(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def iter_param_rows(path: Path) -> Iterator[dict[str, str]]:
+    """Stream parameter rows from a CSV (header row) or JSONL file.
+
+    Rows are read one at a time, so the file can be larger than memory.
+    Non-string JSON values are passed on as their JSON text. A JSONL line
+    that is not an object raises ValueError with its line number.
+    """
+    path = Path(path)
+    if path.suffix == ".csv":
+        with path.open(newline="") as f:
+            for row in csv.DictReader(f):
+                yield {key: value or "" for key, value in row.items() if key is not None}
+        return
+    with path.open() as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from e
+            if not isinstance(row, dict):
+                raise ValueError(f"{path}:{line_number}: expected a JSON object")
+            yield {str(key): _param_value(value) for key, value in row.items()}
+
+
+class BundleTemplate:
+    """A generated bundle whose marker-bearing files are re-rendered per row."""
+
+    def __init__(self, root: Path, agent_dir: Path) -> None:
+        self.root = root
+        self.agent_dir = agent_dir.relative_to(root)
+        self.dirs: list[Path] = []
+        # (relative path, compiled pieces if templated)
+        self.files: list[tuple[Path, list | None]] = []
+        self.fields: set[str] = set()
+        for dirpath, dirnames, filenames in os.walk(root):
+            base = Path(dirpath)
+            dirnames.sort()
+            self.dirs.extend((base / d).relative_to(root) for d in dirnames)
+            for filename in sorted(filenames):
+                path = base / filename
+                rel = path.relative_to(root)
+                try:
+                    text = path.read_bytes().decode()
+                except UnicodeDecodeError:
+                    text = None
+                if text is None or not _MARKER.search(text):
+                    self.files.append((rel, None))
+                    continue
+                try:
+                    pieces = _compile(text, path.suffix)
+                except ValueError as e:
+                    raise ValueError(f"{rel}: {e}") from None
+                self.fields.update(p[0] for p in pieces if not isinstance(p, str))
+                self.files.append((rel, pieces))
+
+    @property
+    def templated(self) -> list[Path]:
+        """Files that differ between rows."""
+        return [rel for rel, pieces in self.files if pieces is not None]
+
+    def render(self, target: Path, params: dict[str, str]) -> Path:
+        """Write the bundle for one row into target and return its agent dir.
+
+        Raises ValueError (and leaves nothing behind) if a value cannot be
+        placed where its marker is.
+        """
+        target.mkdir(parents=True)
+        try:
+            for rel in self.dirs:
+                (target / rel).mkdir(exist_ok=True)
+            for rel, pieces in self.files:
+                src, dst = self.root / rel, target / rel
+                if pieces is None:
+                    shutil.copy2(src, dst)
+                    continue
+                try:
+                    dst.write_text(_fill(pieces, params))
+                except ValueError as e:
+                    raise ValueError(f"{rel}: {e}") from None
+                shutil.copymode(src, dst)
+        except BaseException:
+            shutil.rmtree(target, ignore_errors=True)
+            raise
+        return target / self.agent_dir
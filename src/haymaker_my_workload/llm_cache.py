@@ -0,0 +1,216 @@
+"""Record/replay cache for agent LLM calls.
+
+Deployments with ``llm_cache`` set run their agent with a small shim
+(``_llm_shim/sitecustomize.py``) on ``PYTHONPATH``. The shim wraps the
+installed LLM client libraries so every non-streaming request goes through
+:func:`cached_call`, keyed by the normalized prompt, model and parameters.
+
+Modes:
+    record        always call the LLM and store the response
+    replay        serve only from the cache; a miss raises LLMCacheMiss
+    read_through  serve from the cache, calling (and storing) on a miss
+
+The store is one JSON file per request under the cache directory, written
+atomically. When the total size exceeds the byte budget the least recently
+used entries are evicted.
+
+This module is loaded by file path inside the agent process, so it must
+only depend on the standard library.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+CACHE_MODES = ("record", "replay", "read_through")
+CACHE_DIR_ENV = "HAYMAKER_LLM_CACHE_DIR"
+CACHE_MODE_ENV = "HAYMAKER_LLM_CACHE_MODE"
+CACHE_MAX_BYTES_ENV = "HAYMAKER_LLM_CACHE_MAX_BYTES"
+DEFAULT_MAX_BYTES = 1024**3
+
+# Request parameters that do not affect the response
+_IGNORED_PARAMS = frozenset(
+    {
+        "api_key",
+        "extra_headers",
+        "extra_query",
+        "metadata",
+        "request_timeout",
+        "timeout",
+        "user",
+    }
+)
+
+
+class LLMCacheMiss(LookupError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        lines = value.replace("\r\n", "\n").split("\n")
+        return "\n".join(line.rstrip() for line in lines).strip()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list | tuple):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def request_key(provider: str, params: dict[str, Any]) -> str:
+    """Stable cache key for a request: provider, model, prompt and parameters."""
+    relevant = {k: v for k, v in params.items() if k not in _IGNORED_PARAMS}
+    payload = json.dumps(
+        {"provider": provider, "params": _normalize(relevant)}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    """On-disk response store with size-based LRU eviction."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._size: int | None = None
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        # Reads refresh the entry's position in the LRU order
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(entry).encode()
+        size = self.size()  # measure before writing so the new entry is counted once
+        try:
+            previous = path.stat().st_size
+        except OSError:
+            previous = 0
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._size = size + len(data) - previous
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def size(self) -> int:
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.root.glob("*/*.json"))
+        return self._size
+
+    def evict(self, target_bytes: int | None = None) -> int:
+        """Delete least recently used entries until the store fits target_bytes.
+
+        Defaults to 90% of max_bytes so eviction is not triggered on every
+        write. Returns the number of entries removed.
+        """
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._size = total
+        return removed
+
+
+def cached_call(
+    cache: LLMCache,
+    mode: str,
+    provider: str,
+    params: dict[str, Any],
+    call: Callable[[], Any],
+    dump: Callable[[Any], Any],
+    load: Callable[[Any], Any],
+) -> tuple[Any, bool]:
+    """Serve one request according to ``mode``.
+
+    ``dump`` turns a live response into JSON-serializable data and ``load``
+    rebuilds a response from it. Returns the response and whether it came
+    from the cache.
+    """
+    key = request_key(provider, params)
+    if mode != "record":
+        entry = cache.get(key)
+        if entry is not None:
+            return load(entry["response"]), True
+        if mode == "replay":
+            raise LLMCacheMiss(f"No recorded {provider} response for request {key[:12]}")
+
+    response = call()
+    cache.put(key, {"provider": provider, "recorded_at": time.time(), "response": dump(response)})
+    return response, False
+
+
+async def cached_call_async(
+    cache: LLMCache,
+    mode: str,
+    provider: str,
+    params: dict[str, Any],
+    call: Callable[[], Awaitable[Any]],
+    dump: Callable[[Any], Any],
+    load: Callable[[Any], Any],
+) -> tuple[Any, bool]:
+    """Async counterpart of :func:`cached_call`."""
+    key = request_key(provider, params)
+    if mode != "record":
+        entry = cache.get(key)
+        if entry is not None:
+            return load(entry["response"]), True
+        if mode == "replay":
+            raise LLMCacheMiss(f"No recorded {provider} response for request {key[:12]}")
+
+    response = await call()
+    cache.put(key, {"provider": provider, "recorded_at": time.time(), "response": dump(response)})
+    return response, False
+
+
+def cache_env(cache_dir: Path, mode: str, max_bytes: int | None = None) -> dict[str, str]:
+    """Environment that enables the shim in an agent process."""
+    shim_dir = Path(__file__).parent / "_llm_shim"
+    pythonpath = os.environ.get("PYTHONPATH")
+    env = {
+        CACHE_DIR_ENV: str(cache_dir),
+        CACHE_MODE_ENV: mode,
+        "PYTHONPATH": f"{shim_dir}{os.pathsep}{pythonpath}" if pythonpath else str(shim_dir),
+    }
+    if max_bytes is not None:
+        env[CACHE_MAX_BYTES_ENV] = str(max_bytes)
+    return env
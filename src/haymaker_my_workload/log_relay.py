@@ -0,0 +1,474 @@
+"""Size-based rotation of agent output through a relay process.
+
+With ``log_max_bytes`` set, the agent's stdout and stderr go to pipes
+instead of straight to agent.log and agent.err. A small relay process
+(this file, run as a script) reads the pipes and appends to the log files.
+Once a file reaches the size limit it is rotated at a line boundary into a
+numbered segment (``agent.log.000001``), which is then compressed in the
+background (``agent.log.000001.gz`` or ``.zst``). The live file is always
+the newest segment and stays uncompressed, so tailing it and checking its
+mtime cost the same as before.
+
+The relay is started in its own session like the agent, so it outlives
+the workload process; it exits once the agent closes its end of the pipes
+and the last compression has finished.
+
+The reading helpers here (:func:`log_segments`, :func:`tail_lines`,
+:func:`iter_lines`, :func:`read_last_line`, :func:`log_size`) treat a log and
+its segments as one stream, oldest first, and work whether or not the log
+was ever rotated.
+
+Like events.py, this module only uses the standard library (plus an
+optional zstd codec) and runs without the package installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import os
+import re
+import selectors
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO
+
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+_CHUNK = 64 * 1024
+_MIN_MAX_BYTES = 64 * 1024
+_MIN_MEMBER_BYTES = 256 * 1024
+# How often the relay records a time -> offset index entry while writing
+INDEX_INTERVAL_SECONDS = 1.0
+_SEGMENT = re.compile(r"\.(\d{6})(\.gz|\.zst)?$")
+
+
+def zstd_available() -> bool:
+    return _zstd() is not None
+
+
+def _zstd():
+    try:
+        from compression import zstd  # Python 3.14+
+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        return None
+
+
+def _open_text(path: Path) -> IO[str]:
+    """Open a log or segment for reading as text, decompressing if needed."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", errors="replace")
+    if path.suffix == ".zst":
+        codec = _zstd()
+        if codec is None:
+            raise OSError(f"Cannot read {path}: no zstd codec installed")
+        if hasattr(codec, "open"):
+            return codec.open(path, "rt", errors="replace")
+        raw = codec.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)  # noqa: SIM115
+        return io.TextIOWrapper(raw, errors="replace")
+    try:
+        return open(path, errors="replace")  # noqa: SIM115
+    except FileNotFoundError:
+        # A rotated segment compressed since it was listed
+        for suffix in COMPRESSIONS.values():
+            compressed = path.with_name(path.name + suffix)
+            if compressed.exists():
+                return _open_text(compressed)
+        raise
+
+
+def _compress(path: Path, compression: str) -> None:
+    """Compress a rotated segment in place (``x`` -> ``x.gz``) and drop the original.
+
+    The data is written as a series of independent gzip members (zstd
+    frames), each starting at an index entry, and the index gains the
+    compressed offset of each entry's member so readers can seek into
+    the compressed file.
+    """
+    target = path.with_name(path.name + COMPRESSIONS[compression])
+    tmp = target.with_name(target.name + ".tmp")
+    index = read_index(path)
+    index_tmp = index_path(path).with_name(index_path(path).name + ".tmp")
+    if compression == "gzip":
+
+        def compress_block(block: bytes) -> bytes:
+            return gzip.compress(block, compresslevel=6)
+    else:
+        codec = _zstd()
+        compress_block = (
+            codec.compress if hasattr(codec, "open") else codec.ZstdCompressor().compress
+        )
+    try:
+        starts = [entry[1] for entry in index]
+        members = []  # (raw offset, compressed offset) of each member
+        with open(path, "rb") as src, open(tmp, "wb") as dst:
+            member_start = 0
+            cuts = [s for s in starts if s > 0] + [None]
+            for cut in cuts:
+                # Merge small blocks so members stay worth compressing
+                if cut is not None and cut - member_start < _MIN_MEMBER_BYTES:
+                    continue
+                block = src.read(-1 if cut is None else cut - member_start)
+                if not block and members:
+                    break
+                members.append((member_start, dst.tell()))
+                dst.write(compress_block(block))
+                member_start = cut if cut is not None else member_start + len(block)
+        with open(index_tmp, "w") as f:
+            for ts, raw in index:
+                member_raw, member_comp = max(m for m in members if m[0] <= raw)
+                f.write(f"{ts:.3f} {raw} {member_comp} {member_raw}\n")
+        os.replace(index_tmp, index_path(path))
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        index_tmp.unlink(missing_ok=True)
+        raise
+    # Readers prefer the uncompressed copy while both exist
+    path.unlink()
+
+
+def log_segments(path: Path) -> list[Path]:
+    """Rotated segments of ``path`` followed by ``path`` itself, oldest first."""
+    path = Path(path)
+    numbered: dict[int, Path] = {}
+    try:
+        names = os.listdir(path.parent)
+    except OSError:
+        names = []
+    for name in names:
+        if not name.startswith(path.name + "."):
+            continue
+        match = _SEGMENT.fullmatch(name, len(path.name))
+        if match:
+            number = int(match.group(1))
+            # An uncompressed copy wins: it is complete until its .gz replaces it
+            if number not in numbered or not match.group(2):
+                numbered[number] = path.parent / name
+    segments = [numbered[n] for n in sorted(numbered)]
+    if path.exists():
+        segments.append(path)
+    return segments
+
+
+def iter_lines(path: Path) -> Iterator[str]:
+    """Every line of a log across its segments, oldest first."""
+    for segment in log_segments(path):
+        try:
+            with _open_text(segment) as f:
+                yield from f
+        except FileNotFoundError:
+            continue
+
+
+def tail_lines(path: Path, lines: int) -> list[str]:
+    """The last ``lines`` lines of a log, reading older segments only if needed."""
+    tail: deque[str] = deque()
+    if lines <= 0:
+        return []
+    for segment in reversed(log_segments(path)):
+        try:
+            with _open_text(segment) as f:
+                chunk = deque(f, maxlen=lines - len(tail))
+        except FileNotFoundError:
+            continue
+        tail.extendleft(reversed(chunk))
+        if len(tail) >= lines:
+            break
+    return list(tail)
+
+
+def read_last_line(path: Path) -> str | None:
+    """The last non-empty line of a log, or None if it has none."""
+    for segment in reversed(log_segments(path)):
+        last = None
+        try:
+            with _open_text(segment) as f:
+                for line in f:
+                    if line.strip():
+                        last = line.strip()
+        except FileNotFoundError:
+            continue
+        if last is not None:
+            return last
+    return None
+
+
+def log_size(path: Path) -> int:
+    """Bytes on disk of a log and its segments."""
+    total = 0
+    for segment in log_segments(path):
+        try:
+            total += segment.stat().st_size
+        except OSError:
+            pass
+    return total
+
+
+def index_path(segment: Path) -> Path:
+    """The index file of a log or segment (shared by a segment's compressed form)."""
+    name = segment.name
+    for suffix in COMPRESSIONS.values():
+        name = name.removesuffix(suffix)
+    return segment.with_name(name + ".idx")
+
+
+def read_index(segment: Path) -> list[tuple]:
+    """Index entries of a log or segment, in file order.
+
+    Each entry is ``(time, offset)``: bytes from ``offset`` on were written
+    at ``time`` or later, and ``offset`` is a line start. Entries of a
+    compressed segment also carry the compressed offset and uncompressed
+    offset of the member holding ``offset``. Missing or torn lines are
+    skipped, so an index is never required.
+    """
+    entries = []
+    try:
+        with open(index_path(segment)) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) not in (2, 4):
+                    continue
+                try:
+                    entries.append((float(fields[0]), *map(int, fields[1:])))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return entries
+
+
+def read_lines_at(segment: Path, entry: tuple | None = None) -> Iterator[tuple[int, bytes]]:
+    """Lines of a segment from an index entry on, each with its uncompressed offset.
+
+    Compressed segments are entered at the member holding the entry, so
+    only that member is decompressed before the first line.
+    """
+    offset = 0 if entry is None else entry[1]
+    with open(segment, "rb") as raw:
+        if segment.suffix not in (".gz", ".zst"):
+            raw.seek(offset)
+            yield from _with_offsets(raw, offset)
+            return
+        member = 0
+        if entry is not None and len(entry) == 4:
+            raw.seek(entry[2])
+            member = entry[3]
+        if segment.suffix == ".gz":
+            stream = gzip.GzipFile(fileobj=raw)
+        else:
+            codec = _zstd()
+            if codec is None:
+                raise OSError(f"Cannot read {segment}: no zstd codec installed")
+            if hasattr(codec, "ZstdFile"):
+                stream = codec.ZstdFile(raw)
+            else:
+                stream = io.BufferedReader(
+                    codec.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+                )
+        with stream:
+            _skip(stream, offset - member)
+            yield from _with_offsets(stream, offset)
+
+
+def _with_offsets(stream: IO[bytes], offset: int) -> Iterator[tuple[int, bytes]]:
+    for line in stream:
+        yield offset, line
+        offset += len(line)
+
+
+def _skip(stream: IO[bytes], count: int) -> None:
+    while count > 0:
+        chunk = stream.read(min(count, _CHUNK))
+        if not chunk:
+            return
+        count -= len(chunk)
+
+
+class RotatingLog:
+    """Append-only log file that rotates into numbered, compressed segments.
+
+    Alongside each segment it keeps a sparse index (see :func:`read_index`)
+    of when the bytes at each offset were written.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int,
+        compression: str,
+        append: bool,
+        index_interval: float = INDEX_INTERVAL_SECONDS,
+    ) -> None:
+        self.path = Path(path)
+        self.index_path = index_path(self.path)
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.index_interval = index_interval
+        self._compressors: list[threading.Thread] = []
+        if not append:
+            for segment in [*log_segments(self.path), self.path]:
+                segment.unlink(missing_ok=True)
+                index_path(segment).unlink(missing_ok=True)
+        numbers = [
+            int(m.group(1)) for p in log_segments(self.path) if (m := _SEGMENT.search(p.name))
+        ]
+        self._next = max(numbers, default=0) + 1
+        self._open()
+
+    def _open(self) -> None:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        self._fd = os.open(self.path, flags, 0o644)
+        self._index_fd = os.open(self.index_path, flags, 0o644)
+        self._size = os.fstat(self._fd).st_size
+        self._last_indexed = None
+        # Appending to a file that ended mid-line: the next line start is unknown
+        self._at_line_start = True
+        if self._size:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                self._at_line_start = f.read(1) == b"\n"
+
+    def write(self, data: bytes) -> None:
+        while self._size + len(data) > self.max_bytes:
+            # Split after the last newline that fits so no line spans two segments
+            cut = data.rfind(b"\n", 0, max(0, self.max_bytes - self._size)) + 1
+            if cut == 0 and self._size == 0:
+                # A single line longer than the limit: keep it whole
+                cut = data.find(b"\n") + 1 or len(data)
+            self._write(data[:cut])
+            data = data[cut:]
+            self._rotate()
+        self._write(data)
+
+    def _write(self, data: bytes) -> None:
+        if not data:
+            return
+        now = time.time()
+        if self._last_indexed is None or now - self._last_indexed >= self.index_interval:
+            # Index entries point at line starts so readers can begin there
+            skip = 0 if self._at_line_start else data.find(b"\n") + 1
+            if skip or self._at_line_start:
+                os.write(self._index_fd, f"{now:.3f} {self._size + skip}\n".encode())
+                self._last_indexed = now
+        view = memoryview(data)
+        while view:
+            written = os.write(self._fd, view)
+            view = view[written:]
+            self._size += written
+        self._at_line_start = data.endswith(b"\n")
+
+    def _rotate(self) -> None:
+        if not self._size:
+            return
+        segment = self.path.with_name(f"{self.path.name}.{self._next:06d}")
+        self._next += 1
+        os.close(self._fd)
+        os.close(self._index_fd)
+        os.replace(self.index_path, index_path(segment))
+        os.replace(self.path, segment)
+        self._open()
+        # Compress off the read loop so the agent never blocks on a full pipe
+        thread = threading.Thread(target=_compress, args=(segment, self.compression))
+        thread.start()
+        self._compressors.append(thread)
+        self._compressors = [t for t in self._compressors if t.is_alive()]
+
+    def close(self) -> None:
+        os.close(self._fd)
+        os.close(self._index_fd)
+        for thread in self._compressors:
+            thread.join()
+
+
+def log_rotation(workload_config: dict) -> dict | None:
+    """The deployment's log rotation settings, or None to write logs directly."""
+    max_bytes = workload_config.get("log_max_bytes")
+    if not max_bytes:
+        return None
+    return {"max_bytes": max_bytes, "compression": workload_config.get("log_compression", "gzip")}
+
+
+def relay_command(rotation: dict, streams: list[tuple[int, Path, bool]]) -> list[str]:
+    """Command line that runs this file as a relay for (fd, log path, append) streams."""
+    command = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--max-bytes",
+        str(rotation["max_bytes"]),
+        "--compression",
+        rotation["compression"],
+    ]
+    for fd, path, append in streams:
+        command += ["--stream", f"{fd}:{'a' if append else 'w'}:{Path(path).absolute()}"]
+    return command
+
+
+def validate_log_options(workload_config: dict) -> list[str]:
+    """Return validation errors for the log_* options in a workload config."""
+    errors = []
+    max_bytes = workload_config.get("log_max_bytes")
+    if max_bytes is not None and (
+        isinstance(max_bytes, bool) or not isinstance(max_bytes, int) or max_bytes < _MIN_MAX_BYTES
+    ):
+        errors.append(f"log_max_bytes must be an integer of at least {_MIN_MAX_BYTES}")
+    compression = workload_config.get("log_compression", "gzip")
+    if compression not in COMPRESSIONS:
+        errors.append(f"log_compression must be one of: {', '.join(COMPRESSIONS)}")
+    elif compression == "zstd" and not zstd_available():
+        errors.append("log_compression=zstd needs Python 3.14+ or the zstandard package")
+    return errors
+
+
+def relay(streams: dict[int, RotatingLog]) -> None:
+    """Copy each input fd into its log until every writer has closed."""
+    selector = selectors.DefaultSelector()
+    for fd, log in streams.items():
+        selector.register(fd, selectors.EVENT_READ, log)
+    open_fds = set(streams)
+    while open_fds:
+        for key, _ in selector.select():
+            data = os.read(key.fd, _CHUNK)
+            if data:
+                key.data.write(data)
+            else:
+                selector.unregister(key.fd)
+                open_fds.discard(key.fd)
+    for log in streams.values():
+        log.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Relay agent output into rotating logs")
+    parser.add_argument("--max-bytes", type=int, required=True)
+    parser.add_argument("--compression", choices=sorted(COMPRESSIONS), default="gzip")
+    parser.add_argument(
+        "--stream",
+        action="append",
+        required=True,
+        metavar="FD:MODE:PATH",
+        help="inherited fd to read, a (append) or w (truncate), and the log file to write",
+    )
+    args = parser.parse_args(argv)
+    streams = {}
+    for spec in args.stream:
+        fd, mode, path = spec.split(":", 2)
+        streams[int(fd)] = RotatingLog(Path(path), args.max_bytes, args.compression, mode == "a")
+    relay(streams)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
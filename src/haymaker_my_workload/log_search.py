@@ -0,0 +1,110 @@
+"""Time-bounded search over agent logs and their rotated segments.
+
+Logs written through the relay (see log_relay.py) carry a sparse index of
+when each stretch of bytes was written. A search with ``since``/``until``
+skips segments outside the window, starts reading at the last index entry
+before ``since`` -- inside a compressed segment, at the member holding it
+-- and stops at the first entry after ``until``, so only the bytes
+written in the window (plus at most one index interval either side) are
+read. Matches report the time of the index entry before them.
+
+Logs without an index (written directly, or before rotation was turned on)
+are scanned whole and report no time; MyWorkload.search_logs() still
+narrows them down by deployment start and finish times.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from .log_relay import log_segments, read_index, read_lines_at
+
+# Matches are handed over in batches of at most this many
+_BATCH = 500
+
+
+def search_log(
+    path: Path,
+    regex: re.Pattern[str],
+    since: float | None = None,
+    until: float | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """Matching lines of a log across its segments, oldest first, in batches.
+
+    ``since`` and ``until`` are epoch seconds. Each match has the segment
+    file name, the uncompressed byte offset of the line in it, its
+    approximate write time (a datetime, or None without an index) and the
+    line text.
+    """
+    segments = log_segments(path)
+    indexes = [read_index(segment) for segment in segments]
+    for i, segment in enumerate(segments):
+        index = indexes[i]
+        # A segment's bytes were written before the next segment's first entry
+        following = next((idx[0][0] for idx in indexes[i + 1 :] if idx), None)
+        if following is None:
+            try:
+                following = os.stat(segment).st_mtime
+            except OSError:
+                continue
+        if index and (
+            (until is not None and index[0][0] > until) or (since is not None and following < since)
+        ):
+            continue
+        try:
+            yield from _search_segment(segment, index, following, regex, since, until)
+        except FileNotFoundError:
+            # Compressed since listing: search the compressed copy instead
+            for retry in log_segments(path):
+                if retry.name.startswith(segment.name + "."):
+                    yield from _search_segment(
+                        retry, read_index(retry), following, regex, since, until
+                    )
+
+
+def _search_segment(
+    segment: Path,
+    index: list[tuple],
+    end: float,
+    regex: re.Pattern[str],
+    since: float | None,
+    until: float | None,
+) -> Iterator[list[dict[str, Any]]]:
+    start = None
+    if since is not None:
+        # Last entry at or before since: its block may hold lines written after it
+        start = next((entry for entry in reversed(index) if entry[0] <= since), None)
+    # Entry boundaries after the start, with the time each block began
+    blocks = [entry for entry in index if start is None or entry[1] >= start[1]]
+    block = 0
+    batch: list[dict[str, Any]] = []
+    for offset, raw in read_lines_at(segment, start):
+        while block + 1 < len(blocks) and blocks[block + 1][1] <= offset:
+            block += 1
+        written = blocks[block][0] if blocks and blocks[block][1] <= offset else None
+        if written is not None:
+            if until is not None and written > until:
+                break
+            block_end = blocks[block + 1][0] if block + 1 < len(blocks) else end
+            if since is not None and block_end < since:
+                continue
+        line = raw.decode(errors="replace").rstrip("\n")
+        if regex.search(line):
+            batch.append(
+                {
+                    "segment": segment.name,
+                    "offset": offset,
+                    "time": datetime.fromtimestamp(written, tz=UTC) if written else None,
+                    "line": line,
+                }
+            )
+            if len(batch) >= _BATCH:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
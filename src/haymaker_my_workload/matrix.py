@@ -0,0 +1,118 @@
+"""SDK/parameter matrix runs for comparing configurations of one goal.
+
+A matrix expands a grid of ``sdk`` x ``max_turns`` x ``enable_memory`` into
+variants, which MyWorkload.run_matrix() deploys concurrently under an
+AdmissionController. This module holds the pure parts: grid expansion,
+per-variant result extraction and the comparison report.
+"""
+
+from __future__ import annotations
+
+import itertools
+import re
+from pathlib import Path
+from typing import Any
+
+from agent_haymaker.workloads.models import DeploymentState, DeploymentStatus
+
+
+def expand_grid(
+    sdks: list[str], max_turns: list[int], enable_memory: list[bool]
+) -> list[dict[str, Any]]:
+    """All combinations of the grid axes, in a stable order."""
+    return [
+        {"sdk": sdk, "max_turns": turns, "enable_memory": memory}
+        for sdk, turns, memory in itertools.product(sdks, max_turns, enable_memory)
+    ]
+
+
+def read_peak_rss_mb(pid: int) -> float | None:
+    """Peak resident set size of a live process in MB (Linux VmHWM), or None."""
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+    match = re.search(r"VmHWM:\s+(\d+)\s+kB", status)
+    return int(match.group(1)) / 1024 if match else None
+
+
+def variant_result(
+    variant: dict[str, Any], state: DeploymentState, wall_seconds: float, peak_rss_mb: float | None
+) -> dict[str, Any]:
+    """Summarize one finished variant for the comparison report.
+
+    Token counts are None for a variant whose agent emitted no llm_call
+    events: its usage is unknown, not zero.
+    """
+    metadata = state.metadata or {}
+    usage = metadata.get("llm_usage")
+    return {
+        **variant,
+        "deployment_id": state.deployment_id,
+        "status": state.status.value,
+        "success": state.status == DeploymentStatus.COMPLETED,
+        "error": state.error,
+        "wall_seconds": round(wall_seconds, 2),
+        "turns_used": metadata.get("agent_progress", {}).get("turns_used"),
+        "input_tokens": usage.get("input_tokens", 0) if usage else None,
+        "output_tokens": usage.get("output_tokens", 0) if usage else None,
+        "llm_calls": usage.get("calls", 0) if usage else None,
+        "peak_rss_mb": None if peak_rss_mb is None else round(peak_rss_mb, 1),
+    }
+
+
+def launch_failure_result(
+    variant: dict[str, Any], error: str, wall_seconds: float
+) -> dict[str, Any]:
+    """Result for a variant whose deployment could not be started."""
+    return {
+        **variant,
+        "deployment_id": None,
+        "status": "failed",
+        "success": False,
+        "error": error,
+        "wall_seconds": round(wall_seconds, 2),
+        "turns_used": None,
+        "input_tokens": None,
+        "output_tokens": None,
+        "llm_calls": None,
+        "peak_rss_mb": None,
+    }
+
+
+def build_report(goal_file: str, results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Comparison report: all variants plus the fastest and cheapest successes.
+
+    Only metered variants (see variant_result) compete for cheapest.
+    """
+    successes = [r for r in results if r["success"]]
+    fastest = min(successes, key=lambda r: r["wall_seconds"], default=None)
+    metered = [r for r in successes if r["input_tokens"] is not None]
+    cheapest = min(metered, key=lambda r: r["input_tokens"] + r["output_tokens"], default=None)
+    return {
+        "goal_file": goal_file,
+        "variants": sorted(results, key=lambda r: (not r["success"], r["wall_seconds"])),
+        "succeeded": len(successes),
+        "failed": len(results) - len(successes),
+        "fastest": fastest and fastest["deployment_id"],
+        "cheapest": cheapest and cheapest["deployment_id"],
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """Render a report as a fixed-width comparison table."""
+    header = (
+        f"{'sdk':<10} {'turns':>5} {'mem':>5} {'status':<10} {'wall s':>8} "
+        f"{'used':>5} {'tokens':>9} {'rss MB':>7}"
+    )
+    lines = [f"Matrix: {report['goal_file']}", header, "-" * len(header)]
+    for r in report["variants"]:
+        tokens = "-" if r["input_tokens"] is None else r["input_tokens"] + r["output_tokens"]
+        rss = "-" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.0f}"
+        used = "-" if r["turns_used"] is None else str(r["turns_used"])
+        lines.append(
+            f"{r['sdk']:<10} {r['max_turns']:>5} {str(r['enable_memory']):>5} "
+            f"{r['status']:<10} {r['wall_seconds']:>8.1f} {used:>5} {tokens:>9} {rss:>7}"
+        )
+    lines.append(f"fastest: {report['fastest'] or '-'}  cheapest: {report['cheapest'] or '-'}")
+    return "\n".join(lines)
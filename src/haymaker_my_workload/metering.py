@@ -0,0 +1,102 @@
+"""LLM usage metering.
+
+Aggregates the agent's ``llm_call`` events (see events.py) into a compact
+per-deployment usage record:
+
+    {"type": "llm_call", "model": "claude-sonnet", "input_tokens": 1200,
+     "output_tokens": 300, "cache_hit": false, "cache_read_tokens": 0,
+     "latency_ms": 840}
+
+Latencies are kept as a log-scale histogram rather than raw samples, so
+the record stays small however long the agent runs and records from many
+deployments can be merged without losing percentile accuracy.
+
+Only agents that emit these events (the mock SDK, agents instrumented with
+``events.emit()``, LLM calls through the cache shim) are metered. A
+deployment without them has no usage record: its usage is unknown, and
+reports leave it out rather than count it as free.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+# Bucket i covers (GROWTH ** (i - 1), GROWTH ** i] ms, so estimates are
+# within ~12% of the true value.
+_GROWTH = 1.25
+_COUNTERS = ("calls", "input_tokens", "output_tokens", "cache_hits", "cache_read_tokens")
+PERCENTILES = (50, 90, 99)
+
+
+def _bucket(latency_ms: float) -> int:
+    if latency_ms <= 1:
+        return 0
+    return math.ceil(math.log(latency_ms, _GROWTH))
+
+
+def record_llm_calls(usage: dict[str, Any], events: list[dict[str, Any]]) -> bool:
+    """Fold ``llm_call`` events into a usage record in-place.
+
+    Returns True if any call was recorded.
+    """
+    recorded = False
+    histogram: dict[str, int] = usage.setdefault("latency_histogram", {})
+    for event in events:
+        if event.get("type") != "llm_call":
+            continue
+        recorded = True
+        usage["calls"] = usage.get("calls", 0) + 1
+        for key in ("input_tokens", "output_tokens", "cache_read_tokens"):
+            value = event.get(key)
+            if isinstance(value, int):
+                usage[key] = usage.get(key, 0) + value
+        if event.get("cache_hit"):
+            usage["cache_hits"] = usage.get("cache_hits", 0) + 1
+        latency = event.get("latency_ms")
+        if isinstance(latency, int | float) and latency >= 0:
+            key = str(_bucket(latency))
+            histogram[key] = histogram.get(key, 0) + 1
+            usage["latency_max_ms"] = max(usage.get("latency_max_ms", 0), latency)
+        model = event.get("model")
+        if model:
+            models = usage.setdefault("models", {})
+            models[model] = models.get(model, 0) + 1
+    if recorded:
+        usage["latency_ms"] = latency_percentiles(histogram)
+    return recorded
+
+
+def latency_percentiles(histogram: dict[str, int]) -> dict[str, float]:
+    """Estimate latency percentiles (ms) from a bucket histogram."""
+    total = sum(histogram.values())
+    if not total:
+        return {}
+    buckets = sorted((int(k), v) for k, v in histogram.items())
+    result = {}
+    for pct in PERCENTILES:
+        threshold = total * pct / 100
+        seen = 0
+        for index, count in buckets:
+            seen += count
+            if seen >= threshold:
+                result[f"p{pct}"] = round(_GROWTH**index, 1)
+                break
+    return result
+
+
+def merge_usage(records: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine usage records from several deployments into one."""
+    merged: dict[str, Any] = {key: 0 for key in _COUNTERS}
+    histogram: dict[str, int] = {}
+    for record in records:
+        for key in _COUNTERS:
+            merged[key] += record.get(key, 0)
+        for bucket, count in record.get("latency_histogram", {}).items():
+            histogram[bucket] = histogram.get(bucket, 0) + count
+        if "latency_max_ms" in record:
+            merged["latency_max_ms"] = max(
+                merged.get("latency_max_ms", 0), record["latency_max_ms"]
+            )
+    merged["latency_ms"] = latency_percentiles(histogram)
+    return merged
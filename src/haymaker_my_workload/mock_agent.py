@@ -0,0 +1,64 @@
+"""Offline synthetic agent runtime (sdk=mock).
+
+Instead of running the amplihack generator, a mock deployment copies a
+stand-in ``main.py`` into the agent directory together with a
+``mock_config.json`` built from the ``mock_*`` config options. The
+stand-in behaves like a real agent from the workload's point of view but
+never calls an LLM, which makes it suitable for load-testing deploy,
+get_status, get_logs and stop on a single machine without network access.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from typing import Any
+
+MOCK_SDK = "mock"
+MOCK_PHASES = ["plan", "execute", "verify"]
+
+# option name -> (default, type, minimum)
+_OPTIONS: dict[str, tuple[Any, type, float]] = {
+    "mock_turns": (5, int, 1),
+    "mock_turn_seconds": (0.5, float, 0),
+    "mock_turn_jitter": (0.3, float, 0),
+    "mock_log_lines_per_turn": (3, int, 0),
+    "mock_exit_code": (0, int, 0),
+    "mock_memory_mb": (0, int, 0),
+}
+_TEMPLATE = Path(__file__).parent / "_mock_agent" / "main.py"
+
+
+def validate_mock_options(workload_config: dict[str, Any]) -> list[str]:
+    """Return validation errors for the mock_* options in a workload config."""
+    errors = []
+    for name, (_, kind, minimum) in _OPTIONS.items():
+        if name not in workload_config:
+            continue
+        value = workload_config[name]
+        accepted = (int, float) if kind is float else (int,)
+        if isinstance(value, bool) or not isinstance(value, accepted) or value < minimum:
+            kind_name = "number" if kind is float else "integer"
+            errors.append(f"{name} must be a {kind_name} >= {minimum:g}")
+    exit_code = workload_config.get("mock_exit_code", 0)
+    if isinstance(exit_code, int) and exit_code > 255:
+        errors.append("mock_exit_code must be between 0 and 255")
+    seed = workload_config.get("mock_seed")
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+        errors.append("mock_seed must be an integer")
+    return errors
+
+
+def write_mock_bundle(agent_dir: Path, workload_config: dict[str, Any]) -> Path:
+    """Create a runnable mock agent in agent_dir and return it."""
+    agent_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(_TEMPLATE, agent_dir / "main.py")
+    options = {
+        name.removeprefix("mock_"): kind(workload_config.get(name, default))
+        for name, (default, kind, _) in _OPTIONS.items()
+    }
+    options["phases"] = MOCK_PHASES
+    options["seed"] = workload_config.get("mock_seed")
+    (agent_dir / "mock_config.json").write_text(json.dumps(options, indent=2))
+    return agent_dir
@@ -0,0 +1,200 @@
+"""Goal pipelines: several goals run as a dependency graph.
+
+A pipeline manifest is a JSON file naming goal files and what each one
+needs, with optional config shared by every goal and per-goal overrides::
+
+    {
+      "name": "organize-then-analyze",
+      "config": {"sdk": "claude"},
+      "goals": [
+        {"id": "organize", "goal_file": "goals/example-file-organizer.md"},
+        {"id": "analyze", "goal_file": "goals/example-structure-analyzer.md",
+         "needs": ["organize"], "config": {"max_turns": 25}}
+      ]
+    }
+
+MyWorkload.run_pipeline() deploys a goal as soon as everything it needs
+has completed, with independent goals running side by side under an
+AdmissionController. A goal whose upstream failed is skipped. Each goal
+is given its upstream goals' ``output/`` directories through the
+``inputs`` config option (``HAYMAKER_INPUTS`` in the agent environment),
+and ``{id}`` placeholders in its goal file are replaced by the output
+directory of the upstream goal with that id.
+
+This module holds the pure parts: manifest loading and validation, and the
+report with its critical path, the chain of goals that set the finish time.
+"""
+
+from __future__ import annotations
+
+import graphlib
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+INPUTS_ENV = "HAYMAKER_INPUTS"
+PIPELINES_DIR = "pipelines"
+
+_STEP_KEYS = {"id", "goal_file", "needs", "config"}
+# Names become a directory for the run's rendered goal files
+_NAME = re.compile(r"[A-Za-z0-9._-]+")
+
+
+def load_manifest(path: str | Path) -> dict[str, Any]:
+    """Read a pipeline manifest; its name defaults to the file name."""
+    path = Path(path)
+    try:
+        manifest = json.loads(path.read_text())
+    except ValueError as e:
+        raise ValueError(f"pipeline manifest is not valid JSON: {path}: {e}") from e
+    if isinstance(manifest, dict):
+        manifest.setdefault("name", path.stem)
+    return manifest
+
+
+def validate_manifest(manifest: Any) -> list[str]:
+    """Return validation errors for a manifest's shape and dependency graph."""
+    if not isinstance(manifest, dict):
+        return ["pipeline manifest must be a JSON object"]
+    errors = []
+    name = manifest.get("name", "pipeline")
+    if not isinstance(name, str) or not _NAME.fullmatch(name):
+        errors.append(f"pipeline name must be letters, digits, '.', '_' or '-' (got {name!r})")
+    if not isinstance(manifest.get("config", {}), dict):
+        errors.append("pipeline config must be an object")
+    goals = manifest.get("goals")
+    if not isinstance(goals, list) or not goals:
+        return [*errors, "pipeline goals must be a non-empty list"]
+
+    ids: set[str] = set()
+    graph: dict[str, list[str]] = {}
+    for position, step in enumerate(goals, 1):
+        if not isinstance(step, dict):
+            errors.append(f"goal {position} must be an object")
+            continue
+        step_id = step.get("id")
+        if not isinstance(step_id, str) or not step_id.isidentifier():
+            errors.append(f"goal {position}: id must be an identifier (got {step_id!r})")
+            continue
+        if step_id in ids:
+            errors.append(f"goal {step_id}: duplicate id")
+        ids.add(step_id)
+        unknown = sorted(set(step) - _STEP_KEYS)
+        if unknown:
+            errors.append(f"goal {step_id}: unknown keys: {', '.join(unknown)}")
+        if not isinstance(step.get("goal_file"), str):
+            errors.append(f"goal {step_id}: goal_file is required")
+        if not isinstance(step.get("config", {}), dict):
+            errors.append(f"goal {step_id}: config must be an object")
+        needs = step.get("needs", [])
+        if not isinstance(needs, list) or not all(isinstance(n, str) for n in needs):
+            errors.append(f"goal {step_id}: needs must be a list of goal ids")
+            needs = []
+        graph[step_id] = needs
+
+    for step_id, needs in graph.items():
+        for need in needs:
+            if need not in ids:
+                errors.append(f"goal {step_id}: needs unknown goal '{need}'")
+    if not errors:
+        try:
+            graphlib.TopologicalSorter(graph).prepare()
+        except graphlib.CycleError as e:
+            errors.append(f"pipeline has a dependency cycle: {' -> '.join(e.args[1])}")
+    return errors
+
+
+def validate_inputs(workload_config: dict[str, Any]) -> list[str]:
+    """Return validation errors for the inputs option."""
+    inputs = workload_config.get("inputs")
+    if inputs is None:
+        return []
+    if not isinstance(inputs, dict) or not all(
+        isinstance(k, str) and isinstance(v, str) for k, v in inputs.items()
+    ):
+        return ["inputs must map names to directory paths"]
+    return []
+
+
+def inputs_env(workload_config: dict[str, Any]) -> dict[str, str]:
+    """Agent environment for the inputs option."""
+    inputs = workload_config.get("inputs")
+    return {INPUTS_ENV: json.dumps(inputs)} if inputs else {}
+
+
+def skipped_result(step: dict[str, Any], blocked_by: list[str], at: float) -> dict[str, Any]:
+    """Result for a goal that did not run because an upstream goal failed."""
+    return {
+        **step,
+        "deployment_id": None,
+        "status": "skipped",
+        "success": False,
+        "error": f"upstream goals did not complete: {', '.join(blocked_by)}",
+        "ready_at": round(at, 2),
+        "started_at": None,
+        "finished_at": None,
+        "queued_seconds": 0.0,
+        "wall_seconds": 0.0,
+    }
+
+
+def critical_path(results: dict[str, dict[str, Any]]) -> list[str]:
+    """The goals that set the pipeline's finish time, first to last.
+
+    Starts at the goal that finished last and walks back through the
+    upstream goal that finished last, which is the one its start waited on.
+    """
+    ran = {step_id: r for step_id, r in results.items() if r["finished_at"] is not None}
+    if not ran:
+        return []
+    path = [max(ran, key=lambda step_id: ran[step_id]["finished_at"])]
+    while True:
+        needs = [n for n in ran[path[-1]]["needs"] if n in ran]
+        if not needs:
+            break
+        path.append(max(needs, key=lambda n: ran[n]["finished_at"]))
+    return path[::-1]
+
+
+def build_report(
+    name: str, results: dict[str, dict[str, Any]], wall_seconds: float
+) -> dict[str, Any]:
+    """Pipeline report: every goal's result and timing, plus the critical path."""
+    path = critical_path(results)
+    steps = sorted(
+        results.values(), key=lambda r: (r["started_at"] is None, r["started_at"] or 0.0)
+    )
+    return {
+        "pipeline": name,
+        "steps": steps,
+        "succeeded": sum(r["success"] for r in steps),
+        "failed": sum(not r["success"] and r["status"] != "skipped" for r in steps),
+        "skipped": sum(r["status"] == "skipped" for r in steps),
+        "wall_seconds": round(wall_seconds, 2),
+        "critical_path": path,
+        "critical_path_seconds": results[path[-1]]["finished_at"] if path else 0.0,
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """Render a report as a fixed-width timeline table; * marks the critical path."""
+    header = f"  {'goal':<20} {'status':<10} {'ready':>8} {'start':>8} {'finish':>8} {'wall s':>8}"
+    lines = [f"Pipeline: {report['pipeline']}", header, "-" * len(header)]
+    critical = set(report["critical_path"])
+
+    def seconds(value: float | None) -> str:
+        return "-" if value is None else f"{value:.1f}"
+
+    for r in report["steps"]:
+        mark = "*" if r["step"] in critical else " "
+        lines.append(
+            f"{mark} {r['step']:<20} {r['status']:<10} {seconds(r['ready_at']):>8} "
+            f"{seconds(r['started_at']):>8} {seconds(r['finished_at']):>8} "
+            f"{r['wall_seconds']:>8.1f}"
+        )
+    lines.append(
+        f"critical path: {' -> '.join(report['critical_path']) or '-'} "
+        f"({report['critical_path_seconds']:.1f} s of {report['wall_seconds']:.1f} s)"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,133 @@
+"""Ready-made agent bundles for goal files, generated ahead of deploys.
+
+MyWorkload.start_pregeneration() watches the goal directories through the
+goal index and, for every goal file, keeps one packaged bundle for a given
+deploy configuration (SDK and memory setting) under
+``<artifact_root>/prebuilt/<sdk>-<memory>-<goal hash>/``. Editing a goal
+changes its hash: a bundle for the new text is built and the old one is
+dropped.
+
+A deploy of the same goal text with the same configuration claims the
+bundle with a single rename into ``agents/<id>``, so it skips generation
+entirely; the watcher then builds a fresh one for the next deploy. A
+bundle can only be claimed once, so concurrent deploys never share one.
+Bundles are built in a staging directory and renamed into place when
+complete, with a small JSON file recording the goal hash, the plan summary,
+the name the bundle was built under and where in the directory the packager
+put the agent. Claiming renames the bundle after the deployment.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any
+
+PREBUILT_DIR = "prebuilt"
+INFO_FILE = "pregenerated.json"
+# Staging directories older than this were left by a crashed builder
+_STALE_STAGING_SECONDS = 3600
+
+
+def _prefix(sdk: str, enable_memory: bool) -> str:
+    return f"{sdk}-{'memory' if enable_memory else 'plain'}-"
+
+
+def prebuilt_path(agents_dir: Path, goal_hash: str, sdk: str, enable_memory: bool) -> Path:
+    """Where the bundle for this goal text and configuration is kept when ready."""
+    return agents_dir.parent / PREBUILT_DIR / f"{_prefix(sdk, enable_memory)}{goal_hash[:32]}"
+
+
+def staging_path(prebuilt: Path, token: str) -> Path:
+    return prebuilt.with_name(f".{prebuilt.name}.{token}")
+
+
+def publish(
+    staging: Path, prebuilt: Path, agent_dir: Path, name: str, goal_hash: str, plan: dict | None
+) -> bool:
+    """Make a bundle built in staging claimable. False if one was already there."""
+    info = {
+        "name": name,
+        "goal_hash": goal_hash,
+        "agent_dir": agent_dir.relative_to(staging).as_posix(),
+        "plan": plan,
+        "created_at": time.time(),
+    }
+    (staging / INFO_FILE).write_text(json.dumps(info))
+    try:
+        os.rename(staging, prebuilt)
+    except OSError:
+        return False
+    return True
+
+
+def claim(prebuilt: Path, target: Path) -> tuple[Path, dict[str, Any]] | None:
+    """Move a ready bundle to target; returns its agent dir and info, or None.
+
+    The bundle is renamed to target's name, the deployment id.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.rename(prebuilt, target)
+    except OSError:
+        return None  # Not built yet, or another deploy took it
+    try:
+        info = json.loads((target / INFO_FILE).read_text())
+        agent_dir = _rename(target / info["agent_dir"], info.get("name"), target.name)
+    except (OSError, ValueError):
+        shutil.rmtree(target, ignore_errors=True)
+        return None
+    return agent_dir, info
+
+
+def _rename(agent_dir: Path, old: str | None, new: str) -> Path:
+    """Replace the build name in the bundle's text files and its directory name."""
+    if not old:
+        return agent_dir
+    for path in agent_dir.rglob("*"):
+        if path.is_symlink() or not path.is_file():
+            continue
+        data = path.read_bytes()
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            continue  # Binary: any embedded name is not something to patch
+        if old in text:
+            path.write_bytes(text.replace(old, new).encode("utf-8"))
+    if agent_dir.name != old:
+        return agent_dir
+    renamed = agent_dir.with_name(new)
+    agent_dir.rename(renamed)
+    return renamed
+
+
+def sweep(root: Path, sdk: str, enable_memory: bool, wanted: set[Path]) -> set[Path]:
+    """Drop this configuration's bundles for goal texts no longer wanted.
+
+    Returns the wanted bundles that are ready. Bundles for other
+    configurations are left alone.
+    """
+    prefix = _prefix(sdk, enable_memory)
+    ready = set()
+    try:
+        entries = list(os.scandir(root))
+    except FileNotFoundError:
+        return ready
+    now = time.time()
+    for entry in entries:
+        path = Path(entry.path)
+        if entry.name.startswith(f".{prefix}"):
+            try:
+                if now - entry.stat().st_mtime > _STALE_STAGING_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+        elif entry.name.startswith(prefix):
+            if path in wanted:
+                ready.add(path)
+            else:
+                shutil.rmtree(path, ignore_errors=True)
+    return ready
@@ -0,0 +1,96 @@
+"""Progress estimation for running agents.
+
+Combines the agent's reported progress (see events.py) with the plan the
+generator produced -- its phase list and total_estimated_duration -- into
+a small summary schedulers can use to predict when a slot frees up.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+_DURATION_UNITS = {
+    "s": 1,
+    "sec": 1,
+    "secs": 1,
+    "second": 1,
+    "seconds": 1,
+    "m": 60,
+    "min": 60,
+    "mins": 60,
+    "minute": 60,
+    "minutes": 60,
+    "h": 3600,
+    "hr": 3600,
+    "hrs": 3600,
+    "hour": 3600,
+    "hours": 3600,
+    "d": 86400,
+    "day": 86400,
+    "days": 86400,
+}
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([a-zA-Z]+)")
+
+
+def parse_duration(text: str | None) -> float | None:
+    """Parse a plan duration such as "1 hour 12 minutes" or "15 min" into seconds.
+
+    Returns None if no recognizable quantity is found.
+    """
+    if not text:
+        return None
+    total = 0.0
+    found = False
+    for amount, unit in _DURATION_RE.findall(text):
+        factor = _DURATION_UNITS.get(unit.lower())
+        if factor is None:
+            continue
+        total += float(amount) * factor
+        found = True
+    return total if found else None
+
+
+def compute_progress(
+    agent_progress: dict[str, Any],
+    plan_phases: list[str],
+    max_turns: int,
+    estimated_seconds: float | None,
+    elapsed_seconds: float,
+) -> dict[str, Any]:
+    """Summarize how far an agent has got and how long it likely has left.
+
+    Completion is the larger of the phase fraction and the turn-budget
+    fraction. Once there is any progress, the remaining time is projected
+    from the observed pace; before that, the plan estimate is used.
+    """
+    phase = agent_progress.get("current_phase")
+    phases_done = len(agent_progress.get("phases_completed", []))
+    turns_used = agent_progress.get("turns_used", 0)
+    phases_total = len(plan_phases)
+
+    fractions = []
+    if phases_total:
+        fractions.append(min(phases_done / phases_total, 1.0))
+    if max_turns:
+        fractions.append(min(turns_used / max_turns, 1.0))
+    fraction = max(fractions, default=0.0)
+
+    remaining: float | None = None
+    if 0 < fraction < 1 and elapsed_seconds > 0:
+        remaining = elapsed_seconds * (1 - fraction) / fraction
+    elif fraction >= 1:
+        remaining = 0.0
+    elif estimated_seconds is not None:
+        remaining = max(estimated_seconds - elapsed_seconds, 0.0)
+
+    return {
+        "phase": phase,
+        "phase_index": plan_phases.index(phase) + 1 if phase in plan_phases else None,
+        "phases_completed": phases_done,
+        "phases_total": phases_total,
+        "turns_used": turns_used,
+        "max_turns": max_turns,
+        "fraction_complete": round(fraction, 3),
+        "estimated_remaining_seconds": None if remaining is None else round(remaining, 1),
+    }
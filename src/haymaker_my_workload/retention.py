@@ -0,0 +1,181 @@
+"""Retention policy for finished agent directories.
+
+Agent directories (``<artifact root>/agents/<id>``) hold a deployment's bundle,
+logs, events, checkpoint and outputs, and nothing removes them when the
+deployment finishes. MyWorkload.collect_garbage() applies a retention
+policy to the directories of finished (completed, failed or stopped)
+deployments:
+
+    keep_per_goal    keep only the newest N finished deployments of each goal
+    max_age_seconds  remove deployments that finished longer ago than this
+    max_bytes        remove the least recently finished deployments until
+                     the rest fit in this many bytes
+
+Each removed directory can first be archived: its logs, events, checkpoint
+and outputs -- not the regenerable bundle -- are written to
+``<artifact root>/archive/<id>.tar.gz``, the artifact root being
+artifact_root or ``.haymaker`` in the directory the deployment started from.
+
+Sizes count only a directory's own files. Bundle files shared through the
+blob store (see bundle_store.py) are freed by pruning the store once no
+directory links to them.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tarfile
+import threading
+import time
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .checkpoint import CHECKPOINT_FILE
+from .events import EVENTS_FILE
+
+# What an archive keeps of an agent directory
+ARCHIVE_MEMBERS = ("agent.log", "agent.err", EVENTS_FILE, CHECKPOINT_FILE, "output")
+# Niceness of the GC worker thread; Linux derives the I/O priority of
+# threads without an explicit I/O class from it.
+_GC_NICENESS = 19
+
+
+def finished_at(row: dict[str, Any]) -> float:
+    """Epoch seconds a catalog row's deployment finished (or was last written)."""
+    for key in ("completed_at", "stopped_at"):
+        value = row.get(key)
+        if value:
+            try:
+                return datetime.fromisoformat(value).timestamp()
+            except (TypeError, ValueError):
+                pass
+    return row["updated_at"]
+
+
+def dir_usage(path: Path) -> int:
+    """Bytes that removing ``path`` would free: files not hardlinked elsewhere."""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                st = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            if st.st_nlink == 1:
+                total += st.st_size
+    return total
+
+
+def select_for_removal(
+    candidates: Iterable[dict[str, Any]],
+    keep_per_goal: int | None = None,
+    max_age_seconds: float | None = None,
+    max_bytes: int | None = None,
+    now: float | None = None,
+) -> list[dict[str, Any]]:
+    """Apply a retention policy to finished deployments.
+
+    Each candidate needs ``deployment_id``, ``goal_hash``, ``finished_at``
+    (epoch seconds) and, for a byte budget, ``bytes``. Returns the
+    candidates to remove, oldest first, each with the ``reason`` it was
+    selected.
+    """
+    now = time.time() if now is None else now
+    newest_first = sorted(candidates, key=lambda c: c["finished_at"], reverse=True)
+    remove: dict[str, str] = {}
+    seen_per_goal: dict[Any, int] = {}
+    for candidate in newest_first:
+        dep_id = candidate["deployment_id"]
+        if keep_per_goal is not None:
+            seen = seen_per_goal.get(candidate["goal_hash"], 0)
+            seen_per_goal[candidate["goal_hash"]] = seen + 1
+            if seen >= keep_per_goal:
+                remove[dep_id] = "keep_per_goal"
+                continue
+        if max_age_seconds is not None and now - candidate["finished_at"] > max_age_seconds:
+            remove[dep_id] = "max_age"
+    if max_bytes is not None:
+        used = 0
+        for candidate in newest_first:
+            if candidate["deployment_id"] in remove:
+                continue
+            used += candidate["bytes"]
+            if used > max_bytes:
+                remove[candidate["deployment_id"]] = "max_bytes"
+    return [
+        {**candidate, "reason": remove[candidate["deployment_id"]]}
+        for candidate in reversed(newest_first)
+        if candidate["deployment_id"] in remove
+    ]
+
+
+def archive_members(agent_dir: Path) -> list[Path]:
+    """The logs and outputs of an agent directory that exist, worth keeping."""
+    return [
+        path
+        for name in ARCHIVE_MEMBERS
+        # Rotated log segments (agent.log.000001.gz, ...) go with their log
+        for path in [agent_dir / name, *sorted(agent_dir.glob(f"{name}.[0-9]*"))]
+        if path.exists()
+    ]
+
+
+def archive_agent_dir(agent_dir: Path, archive_path: Path) -> Path | None:
+    """Write the logs and outputs of an agent directory to a .tar.gz.
+
+    Returns the archive, or None if there was nothing to keep. The archive
+    only appears once it is complete.
+    """
+    members = archive_members(agent_dir)
+    if not members:
+        return None
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = archive_path.with_name(archive_path.name + ".tmp")
+    try:
+        with tarfile.open(tmp, "w:gz") as tar:
+            for member in members:
+                tar.add(member, arcname=member.name)
+        os.replace(tmp, archive_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return archive_path
+
+
+def remove_agent_dir(agent_dir: Path) -> None:
+    shutil.rmtree(agent_dir, ignore_errors=True)
+
+
+def lower_io_priority() -> None:
+    """Thread initializer: run GC I/O behind the agents' and the workload's."""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), _GC_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+def validate_retention_options(
+    keep_per_goal: Any = None, max_age_seconds: Any = None, max_bytes: Any = None
+) -> list[str]:
+    """Return validation errors for a retention policy."""
+    errors = []
+    if keep_per_goal is not None and (
+        isinstance(keep_per_goal, bool) or not isinstance(keep_per_goal, int) or keep_per_goal < 0
+    ):
+        errors.append("keep_per_goal must be a non-negative integer")
+    if max_age_seconds is not None and (
+        isinstance(max_age_seconds, bool)
+        or not isinstance(max_age_seconds, int | float)
+        or max_age_seconds < 0
+    ):
+        errors.append("max_age_seconds must be a non-negative number of seconds")
+    if max_bytes is not None and (
+        isinstance(max_bytes, bool) or not isinstance(max_bytes, int) or max_bytes < 0
+    ):
+        errors.append("max_bytes must be a non-negative integer")
+    if keep_per_goal is None and max_age_seconds is None and max_bytes is None:
+        errors.append("a retention policy needs keep_per_goal, max_age_seconds or max_bytes")
+    return errors
@@ -0,0 +1,139 @@
+"""Retry policy for transient agent failures.
+
+When an agent exits with a failure, the workload classifies it from the
+exit code and the tail of ``agent.err`` (plus any error the agent reported
+in its outcome event). If the class is in the deployment's ``retry_on``
+list and attempts remain, the deployment goes back to PENDING and is
+relaunched in its existing bundle after an exponential backoff with full
+jitter: a random delay between 0 and ``min(max, base * 2 ** (attempt - 1))``.
+
+Failure classes:
+    rate_limit    HTTP 429, "rate limit", provider overload errors
+    timeout       SDK or network timeouts
+    connection    connection resets and refusals, DNS failures
+    server_error  HTTP 5xx from the provider
+    killed        terminated by SIGKILL (e.g. the OOM killer)
+    unknown       anything else
+"""
+
+from __future__ import annotations
+
+import random
+import re
+from pathlib import Path
+from typing import Any
+
+FAILURE_CLASSES = ("rate_limit", "timeout", "connection", "server_error", "killed", "unknown")
+DEFAULT_RETRY_ON = ("rate_limit", "timeout", "connection", "server_error")
+DEFAULT_BACKOFF_SECONDS = 30.0
+DEFAULT_BACKOFF_MAX_SECONDS = 600.0
+_MAX_ATTEMPTS = 20
+_STDERR_TAIL_BYTES = 64 * 1024
+
+# Checked in order; the first match wins. HTTP statuses only count next to
+# a status label so traceback line numbers never match.
+_STATUS = r"(?:status(?: code)?|HTTP(?:/[\d.]+)?|Error code)\W{0,3}"
+_PATTERNS = [
+    (
+        "rate_limit",
+        re.compile(
+            _STATUS + r"429\b|rate[ _-]?limit|RateLimitError|too many requests|overloaded",
+            re.IGNORECASE,
+        ),
+    ),
+    ("timeout", re.compile(r"timed? ?out|TimeoutError|deadline exceeded", re.IGNORECASE)),
+    (
+        "connection",
+        re.compile(
+            r"ConnectionError|connection (?:reset|refused|aborted)"
+            r"|ECONNRESET|ECONNREFUSED|Name or service not known|Temporary failure in name",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "server_error",
+        re.compile(
+            _STATUS + r"50[0234]\b|InternalServerError|Internal Server Error"
+            r"|ServiceUnavailable|Service Unavailable|Bad Gateway",
+            re.IGNORECASE,
+        ),
+    ),
+]
+
+
+def read_stderr_tail(path: Path, max_bytes: int = _STDERR_TAIL_BYTES) -> str:
+    """Last max_bytes of a file as text, or "" if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            f.seek(max(0, f.tell() - max_bytes))
+            return f.read().decode(errors="replace")
+    except OSError:
+        return ""
+
+
+def classify_failure(exit_code: int | None, text: str) -> str:
+    """Failure class for an agent exit, from its exit code and error output."""
+    # Only the last lines matter: tracebacks end with the exception that won
+    tail = "\n".join(text.strip().splitlines()[-20:])
+    for name, pattern in _PATTERNS:
+        if pattern.search(tail):
+            return name
+    if exit_code in (-9, 137):
+        return "killed"
+    return "unknown"
+
+
+def retry_policy(workload_config: dict[str, Any]) -> dict[str, Any] | None:
+    """The deployment's retry policy, or None if it does not retry."""
+    max_attempts = workload_config.get("retry_max_attempts", 1)
+    if max_attempts <= 1:
+        return None
+    retry_on = workload_config.get("retry_on", DEFAULT_RETRY_ON)
+    if isinstance(retry_on, str):
+        retry_on = [name.strip() for name in retry_on.split(",") if name.strip()]
+    return {
+        "max_attempts": max_attempts,
+        "backoff_seconds": workload_config.get("retry_backoff_seconds", DEFAULT_BACKOFF_SECONDS),
+        "backoff_max_seconds": workload_config.get(
+            "retry_backoff_max_seconds", DEFAULT_BACKOFF_MAX_SECONDS
+        ),
+        "retry_on": list(retry_on),
+    }
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random | None = None) -> float:
+    """Full-jitter exponential backoff before retrying after ``attempt`` failed."""
+    ceiling = min(cap, base * 2 ** (attempt - 1))
+    return (rng or random).uniform(0, ceiling)
+
+
+def validate_retry_options(workload_config: dict[str, Any]) -> list[str]:
+    """Return validation errors for the retry_* options in a workload config."""
+    errors = []
+    max_attempts = workload_config.get("retry_max_attempts", 1)
+    if (
+        isinstance(max_attempts, bool)
+        or not isinstance(max_attempts, int)
+        or not 1 <= max_attempts <= _MAX_ATTEMPTS
+    ):
+        errors.append(f"retry_max_attempts must be an integer between 1 and {_MAX_ATTEMPTS}")
+    for name in ("retry_backoff_seconds", "retry_backoff_max_seconds"):
+        value = workload_config.get(name)
+        if value is not None and (
+            isinstance(value, bool) or not isinstance(value, int | float) or value < 0
+        ):
+            errors.append(f"{name} must be a non-negative number of seconds")
+    retry_on = workload_config.get("retry_on")
+    if retry_on is not None:
+        names = retry_on.split(",") if isinstance(retry_on, str) else retry_on
+        if not isinstance(names, list | tuple):
+            errors.append("retry_on must be a list of failure classes")
+        else:
+            unknown = [n for n in names if str(n).strip() not in FAILURE_CLASSES]
+            if unknown:
+                errors.append(
+                    f"retry_on entries must be among: {', '.join(FAILURE_CLASSES)} "
+                    f"(got {', '.join(map(str, unknown))})"
+                )
+    return errors
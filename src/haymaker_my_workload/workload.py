@@ -11,21 +11,42 @@ On deploy, the workload uses the amplihack goal agent generator to:
 Configuration:
     haymaker deploy my-workload --config goal_file=goals/my-goal.md
     haymaker deploy my-workload --config goal_file=goals/my-goal.md sdk=claude
+    haymaker deploy my-workload --config goal_file=goals/my-goal.md timeout_seconds=300
+    haymaker deploy my-workload --config goal_file=goals/my-goal.md stall_timeout_seconds=120
+    haymaker deploy my-workload --config goal_file=goals/my-goal.md llm_cache=replay
+    haymaker deploy my-workload --config sdk=mock mock_turns=20 mock_turn_seconds=2
+    haymaker deploy my-workload --config artifact_root=/mnt/nvme artifact_store=s3://bucket/runs
 """
 
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import contextlib
+import copy
+import dataclasses
+import fcntl
+import functools
+import graphlib
+import hashlib
+import itertools
+import json
 import logging
 import os
+import random
+import re
+import shutil
+import signal
+import sqlite3
 import subprocess
 import tempfile
 import time
 import uuid
-from collections import deque
-from collections.abc import AsyncIterator
-from datetime import UTC, datetime
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextvars import ContextVar
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import IO
+from typing import IO, Any
 
 from agent_haymaker.workloads.base import (
     DeploymentNotFoundError,
@@ -39,11 +60,155 @@ from agent_haymaker.workloads.models import (
 )
 from agent_haymaker.workloads.platform import Platform
 
+from .admission import AdmissionController
+from .artifact_store import artifact_store, upload_agent_dir, validate_artifact_options
+from .bundle_store import BundleStore
+from .catalog import DeploymentCatalog
+from .checkpoint import (
+    CHECKPOINT_FILE,
+    CHECKPOINT_FILE_ENV,
+    RESUME_ENV,
+    read_checkpoint,
+    resume_summary,
+)
+from .events import (
+    EVENTS_FD_ENV,
+    EVENTS_FILE,
+    EVENTS_FILE_ENV,
+    apply_events,
+    log_events,
+    read_events,
+)
+from .goal_index import GoalIndex, goal_dirs, parse_goal
+from .goal_templates import (
+    ROW_SUFFIXES,
+    TEMPLATES_DIR,
+    BundleTemplate,
+    iter_param_rows,
+    marker_goal,
+    render_goal,
+    template_fields,
+)
+from .llm_cache import CACHE_MODES, cache_env
+from .log_relay import (
+    log_rotation,
+    log_size,
+    read_last_line,
+    relay_command,
+    tail_lines,
+    validate_log_options,
+)
+from .log_search import search_log
+from .matrix import (
+    build_report,
+    expand_grid,
+    launch_failure_result,
+    read_peak_rss_mb,
+    variant_result,
+)
+from .metering import merge_usage, record_llm_calls
+from .mock_agent import MOCK_PHASES, MOCK_SDK, validate_mock_options, write_mock_bundle
+from .pipeline import (
+    PIPELINES_DIR,
+    inputs_env,
+    load_manifest,
+    skipped_result,
+    validate_inputs,
+    validate_manifest,
+)
+from .pipeline import build_report as build_pipeline_report
+from .pregeneration import PREBUILT_DIR, claim, prebuilt_path, publish, staging_path, sweep
+from .progress import compute_progress, parse_duration
+from .retention import (
+    archive_agent_dir,
+    dir_usage,
+    finished_at,
+    lower_io_priority,
+    remove_agent_dir,
+    select_for_removal,
+    validate_retention_options,
+)
+from .retry import (
+    backoff_delay,
+    classify_failure,
+    read_stderr_tail,
+    retry_policy,
+    validate_retry_options,
+)
+
 logger = logging.getLogger(__name__)
 
 _TERMINAL_STATES = frozenset({DeploymentStatus.COMPLETED, DeploymentStatus.FAILED})
 _MAX_LOG_LINES = 10_000
-_VALID_SDKS = ("claude", "copilot", "microsoft", "mini")
+_VALID_SDKS = ("claude", "copilot", "microsoft", "mini", MOCK_SDK)
+# SDKs whose agents call the LLM through the Python clients the cache shim
+# patches; claude and copilot drive a CLI the shim never sees
+_LLM_CACHE_SDKS = ("microsoft", "mini")
+_VALID_STALL_ACTIONS = ("flag", "stop", "restart")
+_MAX_STALL_RESTARTS = 3
+# How long a stalled agent's process group gets to exit after SIGTERM, then SIGKILL
+_STOP_GRACE_SECONDS = 10.0
+_KILL_GRACE_SECONDS = 5.0
+# How long a relaunch waits for the previous run's log relay to drain
+_RELAY_DRAIN_SECONDS = 5.0
+_HEARTBEAT_ENV = "HAYMAKER_HEARTBEAT_FILE"
+_AGENTS_DIR = Path(".haymaker/agents")
+_LLM_CACHE_DIR = Path(".haymaker/llm-cache")
+_BLOBS_DIR = Path(".haymaker/blobs")
+_ARCHIVE_DIR = Path(".haymaker/archive")
+_STATE_ROOT_ENV = "HAYMAKER_STATE_ROOT"
+# Shared by every process on the host, whatever its working directory; next
+# to the platform's ~/.haymaker/state/ unless HAYMAKER_STATE_ROOT moves it
+_STATE_ROOT = Path(os.environ.get(_STATE_ROOT_ENV) or "~/.haymaker").expanduser().absolute()
+_CATALOG_PATH = _STATE_ROOT / "catalog.db"
+_LOCKS_DIR = _STATE_ROOT / "locks"
+_GOAL_INDEX_PATH = _STATE_ROOT / "goal-index.json"
+_VERSION_KEY = "state_version"
+_MAX_SAVE_ATTEMPTS = 5
+_LOCK_TIMEOUT_SECONDS = 10.0
+# Re-read catalog rows this far behind the watch cursor, in case a slower
+# writer committed an older updated_at after a faster one.
+_WATCH_OVERLAP_SECONDS = 2.0
+# Query the catalog at least every this many ticks even if it looks unchanged
+_WATCH_RESCAN_TICKS = 10
+# Retries are relaunched through admission control, spaced out so a wave of
+# rate-limited agents does not come back as one burst.
+_RETRY_MAX_CONCURRENT_LAUNCHES = 4
+_RETRY_LAUNCH_INTERVAL_SECONDS = 0.5
+# Background GC removes at most this many agent directories per pass
+_GC_BATCH_SIZE = 20
+# A failed artifact upload is retried by status checks no sooner than this
+_SHIP_RETRY_SECONDS = 60.0
+# A goal whose pre-generation failed is not retried sooner than this
+_PREGEN_RETRY_SECONDS = 60.0
+# States saved while a get_status call is in progress, flushed once at its
+# end, together with the workload instance whose call it is
+_SAVE_BATCH: ContextVar[tuple[object, dict[str, DeploymentState]] | None] = ContextVar(
+    "haymaker_save_batch", default=None
+)
+
+
+class StateConflictError(RuntimeError):
+    """A deployment's state changed since it was read, so the save was rejected."""
+
+
+def _retry_on_conflict(method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Re-run a read-modify-write operation from a fresh read when its save conflicts."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        for attempt in range(_MAX_SAVE_ATTEMPTS):
+            try:
+                return await method(self, *args, **kwargs)
+            except StateConflictError:
+                if attempt == _MAX_SAVE_ATTEMPTS - 1:
+                    raise
+                # Jittered backoff so contending writers do not collide again
+                await asyncio.sleep(random.uniform(0, 0.01 * 2**attempt))
+
+    return wrapper
+
+
 _DEFAULT_GOAL = """\
 # Default Goal
 
@@ -80,11 +245,49 @@ class MyWorkload(WorkloadBase):
         self._logs: dict[str, list[str]] = {}
         self._processes: dict[str, subprocess.Popen] = {}
         self._agent_log_files: dict[str, Path] = {}
+        # How far agent.log has been read for progress, ahead of the saved log_offset
+        self._log_progress_offsets: dict[str, int] = {}
         self._log_file_handles: dict[str, IO] = {}
+        self._log_relays: dict[str, subprocess.Popen] = {}
         self._temp_goal_files: dict[str, Path] = {}
+        self._watchdogs: dict[str, asyncio.Task] = {}
+        self._plan_summaries: dict[str, dict] = {}
+        self._generation_cache: dict[tuple, Any] | None = None
+        self._catalog: DeploymentCatalog | None = None
+        self._goal_index: GoalIndex | None = None
+        self._persisted: dict[str, str] = {}
+        self._watchers: set[asyncio.Event] = set()
+        self._retry_timers: dict[str, asyncio.Task] = {}
+        self._stall_restarts: dict[str, asyncio.Task] = {}
+        self._retry_admission = AdmissionController(
+            _RETRY_MAX_CONCURRENT_LAUNCHES, min_interval=_RETRY_LAUNCH_INTERVAL_SECONDS
+        )
+        self._gc_task: asyncio.Task | None = None
+        self._gc_executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._shipments: dict[str, asyncio.Task] = {}
+        self._shipment_failures: dict[str, float] = {}
+        self._pregen_task: asyncio.Task | None = None
+        self._pregen_executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._pregen_builds: dict[Path, asyncio.Task] = {}
+        self._pregen_failures: dict[Path, float] = {}
 
     async def deploy(self, config: DeploymentConfig) -> str:
         """Generate an agent from a goal prompt and execute it."""
+        return await self._deploy(config)
+
+    async def _deploy(
+        self,
+        config: DeploymentConfig,
+        template_row: dict | None = None,
+        rendered_goal: Path | None = None,
+    ) -> str:
+        """deploy(), or one row of deploy_template() when template_row is given.
+
+        template_row carries the rendered goal metadata, the row's params and
+        the BundleTemplate to render the agent from instead of generating.
+        rendered_goal is a filled-in copy of goal_file to generate from
+        (pipelines); the config keeps naming the original goal file.
+        """
         errors = await self.validate_config(config)
         if errors:
             raise ValueError(f"Invalid config: {'; '.join(errors)}")
@@ -94,6 +297,7 @@ class MyWorkload(WorkloadBase):
         sdk = config.workload_config.get("sdk", "claude")
         enable_memory = config.workload_config.get("enable_memory", False)
         max_turns = config.workload_config.get("max_turns", 15)
+        timeout_seconds = config.workload_config.get("timeout_seconds")
 
         self._logs[deployment_id] = []
         self._append_log(deployment_id, f"Starting deployment {deployment_id}")
@@ -102,6 +306,9 @@ class MyWorkload(WorkloadBase):
         if goal_file:
             goal_path = self._resolve_goal_path(goal_file)
             self._append_log(deployment_id, f"Using goal: {goal_path}")
+            if rendered_goal is not None:
+                goal_path = rendered_goal
+                self._append_log(deployment_id, f"Goal placeholders filled in: {goal_path}")
         else:
             fd, tmp_path = tempfile.mkstemp(prefix=f"haymaker-{deployment_id}-", suffix=".md")
             goal_path = Path(tmp_path)
@@ -110,19 +317,51 @@ class MyWorkload(WorkloadBase):
             self._temp_goal_files[deployment_id] = goal_path
             self._append_log(deployment_id, "Using default goal (no goal_file specified)")
 
-        # Generate the agent
-        self._append_log(deployment_id, "Generating agent from goal prompt...")
-        agent_dir = await self._generate_agent(
-            deployment_id=deployment_id,
-            goal_path=goal_path,
-            sdk=sdk,
-            enable_memory=enable_memory,
-        )
+        # Goal metadata from the index: a stat call unless the file changed
+        if template_row is not None:
+            goal = template_row["goal"]
+            self._append_log(deployment_id, f"Template parameters: {template_row['params']}")
+        elif rendered_goal is not None:
+            text = rendered_goal.read_text()
+            goal = {"hash": hashlib.sha256(text.encode()).hexdigest(), **parse_goal(text)}
+        elif goal_file:
+            goal = self.goal_index.get(goal_path)
+            self.goal_index.save()
+        else:
+            goal = {
+                "hash": hashlib.sha256(_DEFAULT_GOAL.encode()).hexdigest(),
+                **parse_goal(_DEFAULT_GOAL),
+            }
+        goal_summary = goal["title"] or "Goal agent"
+
+        # Generate the agent, unless a pre-generated bundle is ready for it
+        agents_dir, blobs_dir, archive_dir = self._artifact_dirs(config.workload_config)
+        agent_dir = None
+        if template_row is not None:
+            agent_dir = await asyncio.to_thread(
+                template_row["bundle"].render, agents_dir / deployment_id, template_row["params"]
+            )
+            if template_row["plan"]:
+                self._plan_summaries[deployment_id] = template_row["plan"]
+        elif sdk == MOCK_SDK:
+            self._append_log(deployment_id, "Writing synthetic mock agent (no LLM calls)...")
+            agent_dir = self._generate_mock_agent(deployment_id, config.workload_config, agents_dir)
+        elif goal_file:
+            agent_dir = await self._claim_pregenerated(
+                deployment_id, goal["hash"], sdk, enable_memory, agents_dir
+            )
+        if agent_dir is None:
+            self._append_log(deployment_id, "Generating agent from goal prompt...")
+            agent_dir = await self._generate_agent(
+                deployment_id=deployment_id,
+                goal_path=goal_path,
+                sdk=sdk,
+                enable_memory=enable_memory,
+                agents_dir=agents_dir,
+            )
         self._append_log(deployment_id, f"Agent generated in {agent_dir}")
-
-        # Read goal for metadata
-        goal_text = goal_path.read_text()
-        goal_summary = goal_text.split("\n")[0].strip("# ").strip() or "Goal agent"
+        if config.workload_config.get("bundle_dedup", False):
+            self._dedupe_bundle(deployment_id, agent_dir, blobs_dir)
 
         # Persist state
         state = DeploymentState(
@@ -134,29 +373,83 @@ class MyWorkload(WorkloadBase):
             config=config.workload_config,
             metadata={
                 "goal_summary": goal_summary,
+                "goal_hash": goal["hash"],
                 "sdk": sdk,
                 "agent_dir": str(agent_dir),
                 "max_turns": max_turns,
             },
         )
-        await self.save_state(state)
+        # Recorded so gc finds them from any working directory
+        state.metadata["blobs_dir"] = str(blobs_dir)
+        state.metadata["archive_dir"] = str(archive_dir)
+        if template_row is not None:
+            state.metadata["goal_params"] = template_row["params"]
+        plan_summary = self._plan_summaries.pop(deployment_id, None)
+        if plan_summary:
+            state.metadata["plan_phases"] = plan_summary["phases"]
+            state.metadata["estimated_duration"] = plan_summary["estimated_duration"]
+            state.metadata["estimated_duration_seconds"] = parse_duration(
+                plan_summary["estimated_duration"]
+            )
+        if timeout_seconds is not None:
+            deadline = state.started_at + timedelta(seconds=timeout_seconds)
+            state.metadata["timeout_seconds"] = timeout_seconds
+            state.metadata["deadline"] = deadline.isoformat()
 
         # Launch agent as detached subprocess (returns immediately)
-        self._execute_agent_detached(deployment_id, agent_dir, max_turns)
+        try:
+            self._execute_agent_detached(
+                deployment_id,
+                agent_dir,
+                max_turns,
+                extra_env=self._agent_env(config.workload_config),
+                log_rotation=log_rotation(config.workload_config),
+            )
+        except OSError as e:
+            state.status = DeploymentStatus.FAILED
+            state.phase = "failed"
+            state.error = f"Failed to launch agent: {e}"
+            state.completed_at = datetime.now(tz=UTC)
+            await self.save_state(state)
+            raise
 
-        # Persist PID for cross-process status detection
+        # Persist once, with the PID for cross-process status detection
         proc = self._processes.get(deployment_id)
         if proc:
             state.metadata["agent_pid"] = proc.pid
-            await self.save_state(state)
+        await self.save_state(state)
+
+        if timeout_seconds is not None:
+            self._watchdogs[deployment_id] = asyncio.create_task(
+                self._watchdog(deployment_id, timeout_seconds)
+            )
 
         return deployment_id
 
+    @_retry_on_conflict
     async def get_status(self, deployment_id: str) -> DeploymentState:
+        batch = _SAVE_BATCH.get()
+        if batch is not None and batch[0] is self:
+            return await self._refresh_status(deployment_id)
+        # Coalesce the saves of one status refresh into at most one write
+        pending: dict[str, DeploymentState] = {}
+        token = _SAVE_BATCH.set((self, pending))
+        try:
+            return await self._refresh_status(deployment_id)
+        finally:
+            _SAVE_BATCH.reset(token)
+            for state in pending.values():
+                await self._persist_state(state)
+
+    async def _refresh_status(self, deployment_id: str) -> DeploymentState:
         state = await self.load_state(deployment_id)
         if state is None:
             raise DeploymentNotFoundError(f"Deployment {deployment_id} not found")
 
+        # Fold newly appended agent events into state before deciding status
+        if state.status == DeploymentStatus.RUNNING and self._consume_events(state):
+            await self.save_state(state)
+
         # Check if detached agent process has finished (in-memory handle)
         proc = self._processes.get(deployment_id)
         if proc and state.status == DeploymentStatus.RUNNING:
@@ -171,6 +464,8 @@ class MyWorkload(WorkloadBase):
                     state.phase = "failed"
                     state.error = f"Agent exited with code {rc}"
                 state.completed_at = datetime.now(tz=UTC)
+                if state.status == DeploymentStatus.FAILED:
+                    self._schedule_retry(state, rc)
                 await self.save_state(state)
 
         # If still RUNNING but no in-memory process, use PID + log detection
@@ -187,20 +482,54 @@ class MyWorkload(WorkloadBase):
                     pass  # Process exists but we can't signal it -- assume alive
 
             if not process_alive:
-                # Process is dead -- check logs for completion vs failure
-                resolved = self._detect_status_from_log(state)
+                # Process is dead -- check the reported outcome, then logs
+                resolved = self._detect_status_from_events(state) or (
+                    self._detect_status_from_log(state)
+                )
                 if not resolved:
                     state.status = DeploymentStatus.FAILED
                     state.phase = "failed"
                     state.error = "Agent process exited unexpectedly (PID no longer exists)"
                     state.completed_at = datetime.now(tz=UTC)
+                if state.status == DeploymentStatus.FAILED:
+                    self._schedule_retry(state, None)
                 await self.save_state(state)
 
             elif not pid:
-                # No PID stored (legacy deployment) -- fall back to log-based detection only
-                if self._detect_status_from_log(state):
+                # No PID stored (legacy deployment) -- fall back to events and logs only
+                if self._detect_status_from_events(state) or self._detect_status_from_log(state):
+                    if state.status == DeploymentStatus.FAILED:
+                        self._schedule_retry(state, None)
                     await self.save_state(state)
 
+        # Relaunch a failed attempt once its backoff has elapsed; whichever
+        # process polls first does it. Never wait for admission here: when
+        # launches are being paced, the retry timer launches it instead.
+        if state.status == DeploymentStatus.PENDING and self._retry_due(state):
+            if await self._retry_admission.try_acquire():
+                try:
+                    await self._launch_retry(state)
+                finally:
+                    self._retry_admission.release()
+            elif deployment_id not in self._retry_timers:
+                self._retry_timers[deployment_id] = asyncio.create_task(
+                    self._retry_timer(deployment_id, 0.0)
+                )
+
+        # Enforce the wall-clock deadline for agents this process does not
+        # supervise with a watchdog (e.g. after a CLI restart).
+        if state.status in (
+            DeploymentStatus.RUNNING,
+            DeploymentStatus.PENDING,
+        ) and self._deadline_passed(state):
+            await self._fail_timed_out(state)
+
+        if state.status == DeploymentStatus.RUNNING:
+            await self._check_stalled(state)
+
+        if self._needs_shipping(state):
+            self._schedule_shipping(deployment_id)
+
         # Include agent_dir in metadata so `haymaker status` shows it
         agent_dir_str = (state.metadata or {}).get("agent_dir")
         if agent_dir_str:
@@ -208,6 +537,7 @@ class MyWorkload(WorkloadBase):
 
         return state
 
+    @_retry_on_conflict
     async def stop(self, deployment_id: str) -> bool:
         state = await self.get_status(deployment_id)
         if state.status == DeploymentStatus.STOPPED:
@@ -224,16 +554,91 @@ class MyWorkload(WorkloadBase):
         await self.save_state(state)
         return True
 
+    @_retry_on_conflict
     async def start(self, deployment_id: str) -> bool:
-        """Resume is not supported -- stopped agents cannot be restarted."""
-        raise NotImplementedError(
-            f"Cannot resume deployment {deployment_id}. "
-            "Stopped agents cannot be restarted. Deploy a new one instead."
+        """Resume a stopped or failed deployment from its last checkpoint.
+
+        Relaunches the existing agent bundle, so nothing is regenerated,
+        and appends to its logs and event stream. If the agent saved a
+        checkpoint (see checkpoint.py) it is told to resume from it and
+        skip completed phases. Returns True if the agent is running, False
+        if it completed or its bundle no longer exists.
+        """
+        state = await self.get_status(deployment_id)
+        if state.status == DeploymentStatus.RUNNING:
+            return True
+        if state.status not in (DeploymentStatus.STOPPED, DeploymentStatus.FAILED):
+            return False
+
+        metadata = state.metadata
+        agent_dir_str = metadata.get("agent_dir")
+        if not agent_dir_str or not (Path(agent_dir_str) / "main.py").exists():
+            self._append_log(deployment_id, "Cannot resume: agent bundle no longer exists")
+            return False
+        agent_dir = Path(agent_dir_str)
+
+        checkpoint = read_checkpoint(agent_dir / CHECKPOINT_FILE)
+        metadata["resumes"] = metadata.get("resumes", 0) + 1
+        metadata["resumed_from"] = resume_summary(checkpoint) if checkpoint else None
+        # Forget how the previous run ended so it is not mistaken for this one's outcome
+        metadata.get("agent_progress", {}).pop("outcome", None)
+        for key in ("timed_out", "partial_progress", "stalled", "stall_restarts", "artifacts"):
+            metadata.pop(key, None)
+        timeout_seconds = metadata.get("timeout_seconds")
+        if timeout_seconds is not None:
+            deadline = datetime.now(tz=UTC) + timedelta(seconds=timeout_seconds)
+            metadata["deadline"] = deadline.isoformat()
+        state.status = DeploymentStatus.RUNNING
+        state.phase = "resuming"
+        state.error = None
+        state.completed_at = None
+        state.stopped_at = None
+
+        checkpoint_note = (
+            f"from checkpoint ({len(checkpoint.get('phases_completed', []))} phases done)"
+            if checkpoint
+            else "from the start (no checkpoint)"
         )
+        self._append_log(deployment_id, f"Resuming agent {checkpoint_note}")
+        try:
+            self._execute_agent_detached(
+                deployment_id,
+                agent_dir,
+                metadata.get("max_turns", 15),
+                append_log=True,
+                extra_env={**self._agent_env(state.config or {}), **self._resume_env(agent_dir)},
+                log_rotation=log_rotation(state.config or {}),
+            )
+        except OSError as e:
+            state.status = DeploymentStatus.FAILED
+            state.phase = "failed"
+            state.error = f"Failed to resume agent: {e}"
+            state.completed_at = datetime.now(tz=UTC)
+            await self.save_state(state)
+            raise
+
+        proc = self._processes.get(deployment_id)
+        if proc:
+            metadata["agent_pid"] = proc.pid
+        try:
+            await self.save_state(state)
+        except StateConflictError:
+            # Someone else changed the deployment meanwhile: undo the launch
+            # and let the retry decide again from fresh state.
+            self._terminate_process(deployment_id)
+            raise
+        if timeout_seconds is not None:
+            self._watchdogs[deployment_id] = asyncio.create_task(
+                self._watchdog(deployment_id, timeout_seconds)
+            )
+        return True
 
+    @_retry_on_conflict
     async def cleanup(self, deployment_id: str) -> CleanupReport:
         state = await self.get_status(deployment_id)
         if state.status in _TERMINAL_STATES:
+            self._release_deployment(deployment_id)
+            await self._drop_state_lock(deployment_id)
             return CleanupReport(
                 deployment_id=deployment_id,
                 details=[f"Already in {state.status} state"],
@@ -242,17 +647,13 @@ class MyWorkload(WorkloadBase):
         start_time = time.monotonic()
 
         self._terminate_process(deployment_id)
-        self._logs.pop(deployment_id, None)
-
-        # Clean up temp goal file
-        temp_file = self._temp_goal_files.pop(deployment_id, None)
-        if temp_file and temp_file.exists():
-            temp_file.unlink()
 
         state.status = DeploymentStatus.COMPLETED
         state.phase = "cleaned_up"
         state.completed_at = datetime.now(tz=UTC)
         await self.save_state(state)
+        self._release_deployment(deployment_id)
+        await self._drop_state_lock(deployment_id)
 
         return CleanupReport(
             deployment_id=deployment_id,
@@ -281,11 +682,1105 @@ class MyWorkload(WorkloadBase):
                     log_file = candidate
 
         if log_file and log_file.exists():
-            with open(log_file) as f:
-                tail = deque(f, maxlen=lines)
-            for line in tail:
+            # Reads back into rotated segments if the live file is short
+            for line in tail_lines(log_file, lines):
                 yield line.rstrip()
 
+    async def search_logs(
+        self,
+        pattern: str | re.Pattern[str],
+        since: datetime | None = None,
+        until: datetime | None = None,
+        filter: dict | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[dict]:
+        """Stream agent log lines matching a regex across deployments.
+
+        Deployments come from the catalog (this workload's only), newest
+        first, narrowed by ``filter`` (as for catalog.list_deployments) and by whether they
+        ran at all between ``since`` and ``until``. Within rotated logs the
+        time index limits reading to the window (see log_search.py). Each
+        match is a dict with deployment_id, log (agent.log or agent.err),
+        segment, offset, time and line. File reads run on worker threads.
+        """
+        regex = re.compile(pattern) if isinstance(pattern, str) else pattern
+        lower = since.timestamp() if since else None
+        upper = until.timestamp() if until else None
+        # The catalog is shared by every workload on the host
+        query = {"workload_name": self.name, **(filter or {})}
+        if until is not None:
+            query["started_before"] = until
+        found = 0
+        for row in self.catalog.list_deployments(query):
+            agent_dir = row["metadata"].get("agent_dir")
+            if not agent_dir or "agent_dir_removed_at" in row["metadata"]:
+                continue
+            if lower is not None and row["status"] != DeploymentStatus.RUNNING.value:
+                finished = row["completed_at"] or row["stopped_at"]
+                if finished and datetime.fromisoformat(finished).timestamp() < lower:
+                    continue
+            for name in ("agent.log", "agent.err"):
+                batches = search_log(Path(agent_dir) / name, regex, lower, upper)
+                try:
+                    while batch := await asyncio.to_thread(next, batches, None):
+                        for match in batch:
+                            yield {"deployment_id": row["deployment_id"], "log": name, **match}
+                            found += 1
+                            if limit is not None and found >= limit:
+                                return
+                finally:
+                    batches.close()
+
+    async def watch(
+        self,
+        deployment_ids: list[str] | None = None,
+        filter: dict | None = None,
+        poll_interval: float = 1.0,
+    ) -> AsyncIterator[dict]:
+        """Yield status and phase transitions instead of polling get_status.
+
+        Watches the given deployments, or this workload's deployments that
+        match a catalog ``filter`` (including ones created later). Each
+        transition is a dict with deployment_id, status, phase,
+        previous_status and previous_phase; current states are not
+        reported, only changes. With explicit ids the iterator ends once
+        every one of them has finished or stopped.
+
+        Transitions come from the catalog, which every state save in any
+        process updates; saves in this process wake the watcher at once,
+        others are noticed within poll_interval. Between saves, the watcher
+        itself checks supervised processes for exit, PIDs for liveness and
+        events.jsonl for growth, and refreshes only those deployments.
+        """
+        catalog = self.catalog
+        match = {"workload_name": self.name, **(filter or {})}
+        if deployment_ids is not None:
+            match["deployment_id"] = list(deployment_ids)
+
+        seen: dict[str, tuple[str, str]] = {}
+        watched_agents: dict[str, tuple[int | None, str | None]] = {}
+        events_sizes: dict[str, int] = {}
+        cursor = time.time()
+
+        def track(row: dict) -> None:
+            seen[row["deployment_id"]] = (row["status"], row["phase"])
+            metadata = row["metadata"]
+            if row["status"] == DeploymentStatus.RUNNING.value:
+                watched_agents[row["deployment_id"]] = (
+                    metadata.get("agent_pid"),
+                    metadata.get("agent_dir"),
+                )
+            else:
+                watched_agents.pop(row["deployment_id"], None)
+                events_sizes.pop(row["deployment_id"], None)
+
+        for row in catalog.list_deployments(match, order="updated_at"):
+            track(row)
+        # Index deployments saved before the catalog existed
+        for dep_id in set(deployment_ids or ()) - seen.keys():
+            state = await self.load_state(dep_id)
+            if state is None:
+                raise DeploymentNotFoundError(f"Deployment {dep_id} not found")
+            catalog.upsert(state)
+            track(catalog.list_deployments({"deployment_id": dep_id})[0])
+
+        finished = {DeploymentStatus.STOPPED.value} | {s.value for s in _TERMINAL_STATES}
+        wakeup = asyncio.Event()
+        self._watchers.add(wakeup)
+        token = catalog.change_token()
+        try:
+            for tick in itertools.count(1):
+                if deployment_ids is not None and all(
+                    seen.get(dep_id, ("", ""))[0] in finished for dep_id in deployment_ids
+                ):
+                    return
+
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(wakeup.wait(), poll_interval)
+                woken = wakeup.is_set()
+                wakeup.clear()
+
+                # Refresh deployments whose agent looks like it moved on;
+                # any resulting save lands in the catalog.
+                for dep_id, (pid, agent_dir) in list(watched_agents.items()):
+                    if self._agent_activity(dep_id, pid, agent_dir, events_sizes):
+                        try:
+                            await self.get_status(dep_id)
+                        except DeploymentNotFoundError:
+                            watched_agents.pop(dep_id, None)
+
+                new_token = catalog.change_token()
+                if not woken and new_token == token and tick % _WATCH_RESCAN_TICKS:
+                    continue
+                token = new_token
+
+                since = cursor - _WATCH_OVERLAP_SECONDS
+                changed = catalog.list_deployments({"updated_after": since}, order="updated_at")
+                new_ids = {
+                    row["deployment_id"]
+                    for row in catalog.list_deployments({**match, "updated_after": since})
+                }
+                for row in changed:
+                    cursor = max(cursor, row["updated_at"])
+                    dep_id = row["deployment_id"]
+                    if dep_id not in seen and dep_id not in new_ids:
+                        continue
+                    previous = seen.get(dep_id)
+                    track(row)
+                    if previous == (row["status"], row["phase"]):
+                        continue
+                    yield {
+                        "deployment_id": dep_id,
+                        "status": DeploymentStatus(row["status"]),
+                        "phase": row["phase"],
+                        "previous_status": DeploymentStatus(previous[0]) if previous else None,
+                        "previous_phase": previous[1] if previous else None,
+                    }
+        finally:
+            self._watchers.discard(wakeup)
+
+    def _agent_activity(
+        self, deployment_id: str, pid: int | None, agent_dir: str | None, sizes: dict[str, int]
+    ) -> bool:
+        """True if a running agent exited or reported new events since last checked."""
+        proc = self._processes.get(deployment_id)
+        if proc is not None:
+            if proc.poll() is not None:
+                return True
+        elif pid:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return True
+            except PermissionError:
+                pass
+        if agent_dir:
+            try:
+                size = (Path(agent_dir) / EVENTS_FILE).stat().st_size
+            except OSError:
+                return False
+            if sizes.get(deployment_id, size) != size:
+                sizes[deployment_id] = size
+                return True
+            sizes[deployment_id] = size
+        return False
+
+    @property
+    def catalog(self) -> DeploymentCatalog:
+        """Local SQLite index of deployments, updated on every state save.
+
+        Use it for listing and dashboard queries instead of loading every
+        state, e.g. ``catalog.list_deployments({"status": "running"})``.
+        """
+        if self._catalog is None:
+            self._catalog = DeploymentCatalog(_CATALOG_PATH)
+        return self._catalog
+
+    @property
+    def goal_index(self) -> GoalIndex:
+        """Cached metadata of goal files; see list_goals()."""
+        if self._goal_index is None:
+            self._goal_index = GoalIndex(_GOAL_INDEX_PATH)
+        return self._goal_index
+
+    async def list_goals(self, directories: list[Path] | None = None) -> list[dict]:
+        """List the goal files under goals/ and HAYMAKER_GOAL_DIRS, or the given directories.
+
+        Each goal is a dict with path, name, hash (the goal_hash its
+        deployments get), title, sections (heading -> text),
+        missing_sections (of Goal, Constraints and Success Criteria), size
+        and mtime. Only files that changed since the index last saw them
+        are read; the walk runs on a worker thread.
+        """
+        index = self.goal_index
+
+        def scan() -> list[dict]:
+            goals = index.refresh(goal_dirs(directories))
+            index.save()
+            return goals
+
+        goals = await asyncio.to_thread(scan)
+        return [{k: v for k, v in goal.items() if k != "stat"} for goal in goals]
+
+    async def load_state(self, deployment_id: str) -> DeploymentState | None:
+        state = await super().load_state(deployment_id)
+        if state is not None:
+            self._persisted[deployment_id] = self._state_fingerprint(state)
+        return state
+
+    async def save_state(self, state: DeploymentState) -> None:
+        """Persist state, skipping writes that would not change it.
+
+        Inside get_status the write is deferred to the end of the call, so
+        several updates during one refresh cost a single write.
+        """
+        batch = _SAVE_BATCH.get()
+        if batch is not None and batch[0] is self:
+            batch[1][state.deployment_id] = state
+            return
+        await self._persist_state(state)
+
+    async def _persist_state(self, state: DeploymentState) -> None:
+        """Compare-and-swap write: succeeds only if nobody saved since we read.
+
+        The version this state was read at lives in metadata; the stored
+        copy must still carry it. The check and the write run under a
+        per-deployment file lock, so only writers contend -- loads never
+        take it. States without a version (new, or from before versioning)
+        are written unconditionally.
+        """
+        fingerprint = self._state_fingerprint(state)
+        if self._persisted.get(state.deployment_id) == fingerprint:
+            return
+        if state.metadata is None:
+            state.metadata = {}
+        expected = state.metadata.get(_VERSION_KEY)
+        async with self._state_lock(state.deployment_id):
+            if expected is not None:
+                current = await super().load_state(state.deployment_id)
+                found = (current.metadata or {}).get(_VERSION_KEY) if current else None
+                if current is not None and found != expected:
+                    raise StateConflictError(
+                        f"Deployment {state.deployment_id} was modified concurrently "
+                        f"(read version {expected}, stored version {found})"
+                    )
+            state.metadata[_VERSION_KEY] = (expected or 0) + 1
+            await super().save_state(state)
+        self._persisted[state.deployment_id] = self._state_fingerprint(state)
+        try:
+            self.catalog.upsert(state)
+        except sqlite3.Error as e:
+            # The catalog is derived data; never fail a transition over it
+            logger.warning("Could not update catalog for %s: %s", state.deployment_id, e)
+        for wakeup in self._watchers:
+            wakeup.set()
+
+    @contextlib.asynccontextmanager
+    async def _state_lock(self, deployment_id: str) -> AsyncIterator[None]:
+        """Hold an exclusive per-deployment lock shared with other processes.
+
+        Polls a non-blocking flock so waiting never blocks the event loop,
+        and so tasks in this process exclude each other too. The lock file
+        may be deleted by its holder (_drop_state_lock), so once locked the
+        file is checked to still be the one at the path, else reopened.
+        """
+        path = _LOCKS_DIR / f"{deployment_id}.lock"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        deadline = time.monotonic() + _LOCK_TIMEOUT_SECONDS
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                while True:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if time.monotonic() > deadline:
+                            raise StateConflictError(
+                                f"Timed out waiting to save deployment {deployment_id}"
+                            ) from None
+                        await asyncio.sleep(0.005)
+                try:
+                    current = os.stat(path).st_ino
+                except FileNotFoundError:
+                    current = None
+                if current == os.fstat(fd).st_ino:
+                    yield
+                    return
+            finally:
+                os.close(fd)
+
+    async def _drop_state_lock(self, deployment_id: str) -> None:
+        """Delete a released deployment's lock file while holding the lock."""
+        async with self._state_lock(deployment_id):
+            (_LOCKS_DIR / f"{deployment_id}.lock").unlink(missing_ok=True)
+
+    @staticmethod
+    def _state_fingerprint(state: DeploymentState) -> str:
+        """Digest of every persisted field, to detect no-op saves."""
+        fields = {
+            "status": state.status,
+            "phase": state.phase,
+            "started_at": state.started_at,
+            "completed_at": state.completed_at,
+            "stopped_at": state.stopped_at,
+            "error": state.error,
+            "config": state.config,
+            "metadata": state.metadata,
+        }
+        payload = json.dumps(fields, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode(), usedforsecurity=False).hexdigest()
+
+    async def rebuild_catalog(self) -> int:
+        """Re-index every stored deployment of this workload. Returns the count."""
+        states = await self.list_deployments()
+        self.catalog.upsert_many(states)
+        return len(states)
+
+    async def collect_garbage(
+        self,
+        keep_per_goal: int | None = None,
+        max_age_seconds: float | None = None,
+        max_bytes: int | None = None,
+        archive: bool = False,
+        limit: int | None = None,
+    ) -> dict:
+        """Remove agent directories of finished deployments under a retention policy.
+
+        Candidates are this workload's completed, failed and stopped
+        deployments in the catalog whose directory has not been removed yet; see retention.py
+        for the policies. With archive=True their logs and outputs are
+        first written to <id>.tar.gz in the archive/ directory beside the
+        deployment's agents/ (under artifact_root or .haymaker). At most limit
+        directories are removed, oldest first. File work runs on a
+        low-priority worker thread. The deployment states are kept, with
+        ``agent_dir_removed_at`` (and ``archive``) added to their metadata.
+        """
+        errors = validate_retention_options(keep_per_goal, max_age_seconds, max_bytes)
+        if errors:
+            raise ValueError(f"Invalid retention policy: {'; '.join(errors)}")
+
+        finished = [DeploymentStatus.STOPPED, *_TERMINAL_STATES]
+        candidates = []
+        # The catalog is shared by every workload on the host
+        query = {"workload_name": self.name, "status": finished}
+        for row in self.catalog.list_deployments(query):
+            agent_dir = row["metadata"].get("agent_dir")
+            if agent_dir and "agent_dir_removed_at" not in row["metadata"]:
+                candidates.append(
+                    {
+                        "deployment_id": row["deployment_id"],
+                        "goal_hash": row["goal_hash"],
+                        "finished_at": finished_at(row),
+                        "agent_dir": Path(agent_dir),
+                        "blobs_dir": Path(
+                            row["metadata"].get("blobs_dir", Path.cwd() / _BLOBS_DIR)
+                        ),
+                    }
+                )
+        if max_bytes is not None:
+            sizes = await self._run_gc_io(lambda: [dir_usage(c["agent_dir"]) for c in candidates])
+            for candidate, size in zip(candidates, sizes, strict=True):
+                candidate["bytes"] = size
+
+        plan = select_for_removal(candidates, keep_per_goal, max_age_seconds, max_bytes)
+        report: dict[str, Any] = {"removed": [], "archived": [], "bytes_freed": 0}
+        batch = plan[:limit]
+        blob_dirs = set()
+        for candidate in batch:
+            removed, archive_path = await self._remove_agent_dir(
+                candidate["deployment_id"], archive
+            )
+            if removed:
+                report["removed"].append(candidate["deployment_id"])
+                report["bytes_freed"] += candidate.get("bytes", 0)
+                blob_dirs.add(candidate["blobs_dir"])
+            if archive_path is not None:
+                report["archived"].append(str(archive_path))
+        report["pending"] = len(plan) - len(batch)
+        if report["removed"]:
+            report["blobs_removed"] = 0
+            for blobs_dir in sorted(blob_dirs):
+                blobs, blob_bytes = await self._run_gc_io(BundleStore(blobs_dir).prune)
+                report["blobs_removed"] += blobs
+                report["bytes_freed"] += blob_bytes
+        return report
+
+    def start_gc(self, interval_seconds: float = 3600.0, **policy: Any) -> asyncio.Task:
+        """Run collect_garbage in the background every interval_seconds.
+
+        Each pass removes at most a batch of directories (override with
+        limit=), so a large backlog is worked off gradually rather than in
+        one burst of I/O. Takes the same policy arguments as
+        collect_garbage.
+        """
+        errors = validate_retention_options(
+            policy.get("keep_per_goal"), policy.get("max_age_seconds"), policy.get("max_bytes")
+        )
+        if errors:
+            raise ValueError(f"Invalid retention policy: {'; '.join(errors)}")
+        policy.setdefault("limit", _GC_BATCH_SIZE)
+        self.stop_gc()
+        self._gc_task = asyncio.create_task(self._gc_loop(interval_seconds, policy))
+        return self._gc_task
+
+    def stop_gc(self) -> None:
+        """Stop background garbage collection started with start_gc."""
+        if self._gc_task is not None:
+            self._gc_task.cancel()
+            self._gc_task = None
+        if self._gc_executor is not None:
+            self._gc_executor.shutdown(wait=False)
+            self._gc_executor = None
+
+    async def _gc_loop(self, interval_seconds: float, policy: dict[str, Any]) -> None:
+        while True:
+            try:
+                report = await self.collect_garbage(**policy)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Garbage collection pass failed: %s", e)
+            else:
+                if report["removed"]:
+                    logger.info(
+                        "Removed %d agent directories (%d bytes), %d pending",
+                        len(report["removed"]),
+                        report["bytes_freed"],
+                        report["pending"],
+                    )
+                if report["pending"]:
+                    # Work off a backlog batch by batch without waiting a full interval
+                    await asyncio.sleep(min(interval_seconds, 1.0))
+                    continue
+            await asyncio.sleep(interval_seconds)
+
+    async def _run_gc_io(self, func: Callable[[], Any]) -> Any:
+        """Run background file work (GC, uploads) at lowered CPU and I/O priority."""
+        if self._gc_executor is None:
+            self._gc_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="haymaker-gc", initializer=lower_io_priority
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._gc_executor, func)
+
+    async def _remove_agent_dir(
+        self, deployment_id: str, archive: bool
+    ) -> tuple[bool, Path | None]:
+        """Archive and delete one finished deployment's agent directory.
+
+        Returns whether it was removed and the archive written. The removal
+        is recorded with a compare-and-swap save before anything is
+        deleted, so a concurrent start() of the same deployment either wins
+        (and the directory is kept) or sees it gone.
+        """
+        state = await self.load_state(deployment_id)
+        finished = (
+            state is not None
+            and state.workload_name == self.name
+            and (state.status == DeploymentStatus.STOPPED or state.status in _TERMINAL_STATES)
+        )
+        if not finished or "agent_dir_removed_at" in (state.metadata or {}):
+            return False, None
+        agent_dir = Path(state.metadata["agent_dir"])
+        if self._needs_shipping(state):
+            # Never delete outputs that have not reached the durable store
+            try:
+                await self._upload_artifacts(state)
+            except Exception as e:  # any store backend's error
+                logger.warning("Keeping %s: artifact upload failed: %s", deployment_id, e)
+                return False, None
+        archive_path = None
+        if archive:
+            # States from before archive_dir was recorded use .haymaker here
+            archive_dir = Path(state.metadata.get("archive_dir", Path.cwd() / _ARCHIVE_DIR))
+            archive_path = await self._run_gc_io(
+                lambda: archive_agent_dir(agent_dir, archive_dir / f"{deployment_id}.tar.gz")
+            )
+        state.metadata["agent_dir_removed_at"] = datetime.now(tz=UTC).isoformat()
+        if archive_path is not None:
+            state.metadata["archive"] = str(archive_path)
+        try:
+            await self.save_state(state)
+        except StateConflictError:
+            # Changed since we looked (e.g. resumed); reconsider it next pass
+            self._persisted.pop(deployment_id, None)
+            if archive_path is not None:
+                archive_path.unlink(missing_ok=True)
+            return False, None
+        await self._run_gc_io(lambda: remove_agent_dir(agent_dir))
+        self._release_deployment(deployment_id)
+        await self._drop_state_lock(deployment_id)
+        return True, archive_path
+
+    @_retry_on_conflict
+    async def ship_artifacts(self, deployment_id: str) -> dict:
+        """Upload a deployment's logs and outputs to its artifact store.
+
+        Ships the files an archive would keep (see artifact_store.py) under
+        ``<deployment_id>/`` and records the upload in
+        ``metadata["artifacts"]``. Deployments configured with
+        ``artifact_store`` are shipped in the background once get_status
+        sees them finish, and before retention removes their directory;
+        this ships one on demand.
+        """
+        state = await self.load_state(deployment_id)
+        if state is None:
+            raise DeploymentNotFoundError(f"Deployment {deployment_id} not found")
+        if artifact_store(state.config or {}) is None:
+            raise ValueError(f"Deployment {deployment_id} has no artifact_store configured")
+        if not state.metadata.get("agent_dir") or "agent_dir_removed_at" in state.metadata:
+            raise ValueError(f"Deployment {deployment_id} has no agent directory to ship")
+        await self._upload_artifacts(state)
+        await self.save_state(state)
+        return state.metadata["artifacts"]
+
+    async def _upload_artifacts(self, state: DeploymentState) -> None:
+        """Upload the agent directory's artifacts and note them in the (unsaved) state."""
+        store = artifact_store(state.config or {})
+        agent_dir = Path(state.metadata["agent_dir"])
+        stats = await self._run_gc_io(
+            lambda: upload_agent_dir(agent_dir, store, state.deployment_id)
+        )
+        state.metadata["artifacts"] = {
+            "store": store.url,
+            "prefix": state.deployment_id,
+            **stats,
+            "shipped_at": datetime.now(tz=UTC).isoformat(),
+        }
+
+    @staticmethod
+    def _needs_shipping(state: DeploymentState) -> bool:
+        metadata = state.metadata or {}
+        return (
+            (state.status == DeploymentStatus.STOPPED or state.status in _TERMINAL_STATES)
+            and bool((state.config or {}).get("artifact_store"))
+            and "agent_dir" in metadata
+            and "artifacts" not in metadata
+            and "agent_dir_removed_at" not in metadata
+        )
+
+    def _schedule_shipping(self, deployment_id: str) -> None:
+        """Ship a finished deployment's artifacts in the background, once at a time."""
+        if deployment_id in self._shipments:
+            return
+        failed_at = self._shipment_failures.get(deployment_id)
+        if failed_at is not None and time.monotonic() - failed_at < _SHIP_RETRY_SECONDS:
+            return
+        self._shipments[deployment_id] = asyncio.create_task(
+            self._ship_in_background(deployment_id)
+        )
+
+    @_retry_on_conflict
+    async def _ship_if_finished(self, deployment_id: str) -> None:
+        # Re-check from fresh state: it may have been resumed or shipped meanwhile
+        state = await self.load_state(deployment_id)
+        if state is not None and self._needs_shipping(state):
+            await self._upload_artifacts(state)
+            await self.save_state(state)
+
+    async def _ship_in_background(self, deployment_id: str) -> None:
+        # This task inherited the scheduling get_status call's save batch,
+        # which is flushed by now: save directly.
+        _SAVE_BATCH.set(None)
+        try:
+            await self._ship_if_finished(deployment_id)
+            self._shipment_failures.pop(deployment_id, None)
+        except Exception as e:  # any store backend's error; a later status check retries
+            self._shipment_failures[deployment_id] = time.monotonic()
+            logger.warning("Artifact upload for %s failed: %s", deployment_id, e)
+        finally:
+            self._shipments.pop(deployment_id, None)
+
+    def start_pregeneration(
+        self,
+        workload_config: dict | None = None,
+        interval_seconds: float = 2.0,
+        max_concurrent: int = 1,
+        directories: list[Path] | None = None,
+    ) -> asyncio.Task:
+        """Keep a generated bundle ready for every goal file, rebuilt when it changes.
+
+        Watches the goal directories (as list_goals) every interval_seconds
+        and generates bundles for the sdk, enable_memory and artifact_root
+        in workload_config -- the settings deploys will use -- on at most
+        max_concurrent low-priority worker threads. A deploy of an
+        unchanged goal with those settings then claims the ready bundle
+        instead of generating (see pregeneration.py). Call
+        stop_pregeneration() to end it.
+        """
+        config = {"sdk": "claude", **(workload_config or {})}
+        errors = []
+        if config["sdk"] not in _VALID_SDKS or config["sdk"] == MOCK_SDK:
+            errors.append(f"sdk must be a generating SDK (got '{config['sdk']}')")
+        if not isinstance(max_concurrent, int) or max_concurrent < 1:
+            errors.append("max_concurrent must be a positive integer")
+        if errors:
+            raise ValueError(f"Invalid pre-generation settings: {'; '.join(errors)}")
+
+        self.stop_pregeneration()
+        self._pregen_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrent,
+            thread_name_prefix="haymaker-pregen",
+            initializer=lower_io_priority,
+        )
+        self._pregen_task = asyncio.create_task(
+            self._pregen_loop(config, interval_seconds, directories)
+        )
+        return self._pregen_task
+
+    def stop_pregeneration(self) -> None:
+        """Stop watching goals; bundles already being built are still published."""
+        if self._pregen_task is not None:
+            self._pregen_task.cancel()
+            self._pregen_task = None
+        if self._pregen_executor is not None:
+            self._pregen_executor.shutdown(wait=False, cancel_futures=True)
+            self._pregen_executor = None
+
+    async def _pregen_loop(
+        self, config: dict, interval_seconds: float, directories: list[Path] | None
+    ) -> None:
+        sdk = config["sdk"]
+        enable_memory = config.get("enable_memory", False)
+        agents_dir, _, _ = self._artifact_dirs(config)
+        while True:
+            try:
+                wanted = {
+                    prebuilt_path(agents_dir, goal["hash"], sdk, enable_memory): goal
+                    for goal in await self.list_goals(directories)
+                }
+                ready = await asyncio.to_thread(
+                    sweep, agents_dir.parent / PREBUILT_DIR, sdk, enable_memory, set(wanted)
+                )
+                now = time.monotonic()
+                for prebuilt, goal in wanted.items():
+                    failed_at = self._pregen_failures.get(prebuilt)
+                    if (
+                        prebuilt in ready
+                        or prebuilt in self._pregen_builds
+                        or (failed_at is not None and now - failed_at < _PREGEN_RETRY_SECONDS)
+                    ):
+                        continue
+                    self._pregen_builds[prebuilt] = asyncio.create_task(
+                        self._pregenerate(prebuilt, goal, sdk, enable_memory)
+                    )
+            except OSError as e:
+                logger.warning("Goal pre-generation pass failed: %s", e)
+            await asyncio.sleep(interval_seconds)
+
+    async def _pregenerate(self, prebuilt: Path, goal: dict, sdk: str, enable_memory: bool) -> None:
+        """Build one bundle on the pre-generation threads and publish it."""
+        build = functools.partial(self._build_prebuilt, prebuilt, goal, sdk, enable_memory)
+        try:
+            loop = asyncio.get_running_loop()
+            if await loop.run_in_executor(self._pregen_executor, build):
+                logger.info("Pre-generated agent bundle for %s", goal["path"])
+            self._pregen_failures.pop(prebuilt, None)
+        except Exception as e:  # whatever the generator raises; retried after a pause
+            self._pregen_failures[prebuilt] = time.monotonic()
+            logger.warning("Pre-generating %s failed: %s", goal["path"], e)
+        finally:
+            self._pregen_builds.pop(prebuilt, None)
+
+    def _build_prebuilt(self, prebuilt: Path, goal: dict, sdk: str, enable_memory: bool) -> bool:
+        """Generate a bundle into a staging directory and publish it (worker thread)."""
+        name = f"pregen-{uuid.uuid4().hex[:8]}"
+        staging = staging_path(prebuilt, name)
+        goal_path = Path(goal["path"])
+        try:
+            agent_dir = self._build_agent(name, goal_path, sdk, enable_memory, staging)
+            if self.goal_index.get(goal_path)["hash"] != goal["hash"]:
+                return False  # Edited meanwhile; the next pass builds the new text
+            return publish(
+                staging, prebuilt, agent_dir, name, goal["hash"], self._plan_summaries.get(name)
+            )
+        finally:
+            self._logs.pop(name, None)
+            self._plan_summaries.pop(name, None)
+            shutil.rmtree(staging, ignore_errors=True)
+
+    async def _claim_pregenerated(
+        self,
+        deployment_id: str,
+        goal_hash: str,
+        sdk: str,
+        enable_memory: bool,
+        agents_dir: Path,
+    ) -> Path | None:
+        """Take the ready bundle for this goal text and configuration, if there is one."""
+        prebuilt = prebuilt_path(agents_dir, goal_hash, sdk, enable_memory)
+        build = self._pregen_builds.get(prebuilt)
+        if build is not None:
+            # Already being built here: finishing it beats starting over
+            await asyncio.wait([build])
+        claimed = claim(prebuilt, agents_dir / deployment_id)
+        if claimed is None:
+            return None
+        agent_dir, info = claimed
+        if info.get("plan"):
+            self._plan_summaries[deployment_id] = info["plan"]
+        self._append_log(deployment_id, "Using pre-generated agent bundle")
+        return agent_dir
+
+    async def get_usage_summary(self, deployment_ids: list[str] | None = None) -> dict:
+        """Aggregate LLM usage across deployments, grouped by goal and SDK.
+
+        Covers all of this workload's deployments unless deployment_ids is
+        given. Each group reports call count, token totals, cache hits and
+        latency percentiles; "total" combines every group. Deployments whose
+        agent reported no LLM calls are only counted, under "unmetered".
+        """
+        if deployment_ids is None:
+            states = await self.list_deployments()
+        else:
+            states = [await self.get_status(dep_id) for dep_id in deployment_ids]
+
+        groups: dict[tuple[str, str], list[dict]] = {}
+        unmetered = 0
+        for state in states:
+            metadata = state.metadata or {}
+            usage = metadata.get("llm_usage")
+            if not usage:
+                unmetered += 1
+                continue
+            goal = (state.config or {}).get("goal_file") or "default"
+            groups.setdefault((goal, metadata.get("sdk", "claude")), []).append(usage)
+
+        return {
+            "groups": [
+                {"goal": goal, "sdk": sdk, "deployments": len(records), **merge_usage(records)}
+                for (goal, sdk), records in sorted(groups.items())
+            ],
+            "total": merge_usage([r for records in groups.values() for r in records]),
+            "unmetered": unmetered,
+        }
+
+    async def run_matrix(
+        self,
+        goal_file: str,
+        sdks: list[str] | None = None,
+        max_turns: list[int] | None = None,
+        enable_memory: list[bool] | None = None,
+        max_concurrent: int = 4,
+        poll_interval: float = 5.0,
+        extra_config: dict | None = None,
+    ) -> dict:
+        """Run one goal across a grid of sdk x max_turns x enable_memory and compare.
+
+        Generator stages run once per distinct input (analysis and plan once
+        per goal, skill synthesis once per SDK, assembly once per SDK and
+        memory setting); only packaging is per variant. At most
+        max_concurrent variants run at once. Returns a comparison report
+        (see matrix.build_report).
+        """
+        variants = expand_grid(sdks or ["claude"], max_turns or [15], enable_memory or [False])
+        configs = [
+            DeploymentConfig(
+                workload_name=self.name,
+                workload_config={**(extra_config or {}), "goal_file": goal_file, **variant},
+            )
+            for variant in variants
+        ]
+        errors = [e for config in configs for e in await self.validate_config(config)]
+        if errors:
+            raise ValueError(f"Invalid matrix: {'; '.join(dict.fromkeys(errors))}")
+
+        admission = AdmissionController(max_concurrent)
+
+        async def run_variant(variant: dict, config: DeploymentConfig) -> dict:
+            async with admission:
+                return await self._run_to_finish(
+                    variant, functools.partial(self.deploy, config), poll_interval
+                )
+
+        previous_cache = self._generation_cache
+        self._generation_cache = previous_cache if previous_cache is not None else {}
+        try:
+            results = await asyncio.gather(
+                *(run_variant(v, c) for v, c in zip(variants, configs, strict=True))
+            )
+        finally:
+            self._generation_cache = previous_cache
+        return build_report(goal_file, list(results))
+
+    async def deploy_template(
+        self,
+        config: DeploymentConfig,
+        rows_file: str | Path,
+        max_concurrent: int = 4,
+        poll_interval: float = 5.0,
+    ) -> AsyncIterator[dict]:
+        """Run one agent per parameter row of a goal template, yielding results.
+
+        config's goal_file is a template with ``{name}`` placeholders and
+        rows_file a CSV or JSONL file with one row of values per agent (see
+        goal_templates.py). The bundle is generated once for the template;
+        each row only renders its values into a copy. Rows are read as
+        slots free up, with at most max_concurrent agents running, and each
+        row's result (matrix.variant_result plus "row" and "params") is
+        yielded when its agent finishes. A row missing a parameter, or with
+        a value that cannot be placed in the bundle, yields a failed result
+        without stopping the batch. Raises ValueError if the generated
+        bundle dropped a placeholder's marker.
+        """
+        workload_config = config.workload_config
+        errors = await self.validate_config(config)
+        if not workload_config.get("goal_file"):
+            errors.append("goal_file is required for a template deploy")
+        rows_path = Path(rows_file)
+        if rows_path.suffix not in ROW_SUFFIXES:
+            errors.append(f"rows_file must be one of {', '.join(ROW_SUFFIXES)}: {rows_path}")
+        elif not rows_path.is_file():
+            errors.append(f"rows_file not found: {rows_path}")
+        if isinstance(max_concurrent, bool) or not isinstance(max_concurrent, int):
+            errors.append("max_concurrent must be an integer")
+        elif max_concurrent < 1:
+            errors.append("max_concurrent must be at least 1")
+        if errors:
+            raise ValueError(f"Invalid config: {'; '.join(errors)}")
+
+        template_path = self._resolve_goal_path(workload_config["goal_file"])
+        text = template_path.read_text()
+        fields = template_fields(text)
+        if not fields:
+            raise ValueError(f"goal_file has no {{placeholders}}: {template_path}")
+
+        agents_dir, _, _ = self._artifact_dirs(workload_config)
+        name = f"template-{uuid.uuid4().hex[:8]}"
+        root = agents_dir.parent / TEMPLATES_DIR / name
+        try:
+            bundle, plan = await self._generate_template(name, text, workload_config, root)
+            lost = [field for field in fields if field not in bundle.fields]
+            if lost:
+                raise ValueError(
+                    "generated bundle lost the markers for template parameters: "
+                    f"{', '.join(lost)} (every row would get the same agent)"
+                )
+            logger.info(
+                "Generated template bundle for %s (%d of %d files per row)",
+                template_path,
+                len(bundle.templated),
+                len(bundle.files),
+            )
+
+            async def run_row(index: int, params: dict[str, str]) -> dict:
+                async def launch() -> str:
+                    rendered = render_goal(text, params)
+                    goal = {
+                        "hash": hashlib.sha256(rendered.encode()).hexdigest(),
+                        **parse_goal(rendered),
+                    }
+                    row = {"goal": goal, "params": params, "bundle": bundle, "plan": plan}
+                    return await self._deploy(config, template_row=row)
+
+                try:
+                    return await self._run_to_finish(
+                        {"row": index, "params": params}, launch, poll_interval
+                    )
+                finally:
+                    admission.release()
+
+            admission = AdmissionController(max_concurrent)
+            rows = iter_param_rows(rows_path)
+            pending: set[asyncio.Task] = set()
+            try:
+                for index in itertools.count(1):
+                    # Take a slot before reading, so rows are only read as they can run
+                    await admission.acquire()
+                    params = await asyncio.to_thread(next, rows, None)
+                    if params is None:
+                        admission.release()
+                        break
+                    pending.add(asyncio.create_task(run_row(index, params)))
+                    for task in [t for t in pending if t.done()]:
+                        pending.discard(task)
+                        yield task.result()
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            finally:
+                # Launched agents keep running; only their result tracking stops
+                for task in pending:
+                    task.cancel()
+                rows.close()
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    async def _generate_template(
+        self, name: str, text: str, workload_config: dict, root: Path
+    ) -> tuple[BundleTemplate, dict | None]:
+        """Generate the bundle for a goal template once, with markers for its placeholders."""
+        sdk = workload_config.get("sdk", "claude")
+        try:
+            if sdk == MOCK_SDK:
+                agent_dir = self._generate_mock_agent(name, workload_config, root)
+                # Stands in for the goal prompt a generated bundle carries
+                (agent_dir / "prompt.md").write_text(marker_goal(text))
+            else:
+                root.mkdir(parents=True)
+                goal_path = root.with_suffix(".md")
+                goal_path.write_text(marker_goal(text))
+                try:
+                    agent_dir = await asyncio.to_thread(
+                        self._build_agent,
+                        name,
+                        goal_path,
+                        sdk,
+                        workload_config.get("enable_memory", False),
+                        root,
+                    )
+                finally:
+                    goal_path.unlink(missing_ok=True)
+            return await asyncio.to_thread(BundleTemplate, root, agent_dir), (
+                self._plan_summaries.get(name)
+            )
+        finally:
+            self._logs.pop(name, None)
+            self._plan_summaries.pop(name, None)
+
+    async def run_pipeline(
+        self,
+        manifest: str | Path | dict,
+        max_concurrent: int = 4,
+        poll_interval: float = 5.0,
+    ) -> dict:
+        """Run a pipeline of goals in dependency order and report its timing.
+
+        manifest is a pipeline manifest file or its parsed contents (see
+        pipeline.py). Each goal is deployed once every goal it needs has
+        completed, and receives their output directories as inputs;
+        independent goals run in parallel, at most max_concurrent at once.
+        Goals downstream of a failure are skipped. Returns a report with
+        each goal's result, ready/start/finish times in seconds from the
+        pipeline start, and the critical path (see pipeline.build_report).
+        """
+        if not isinstance(manifest, dict):
+            manifest = load_manifest(manifest)
+        errors = validate_manifest(manifest)
+        if errors:
+            raise ValueError(f"Invalid pipeline: {'; '.join(errors)}")
+        if isinstance(max_concurrent, bool) or not isinstance(max_concurrent, int):
+            raise ValueError("Invalid pipeline: max_concurrent must be an integer")
+
+        steps = {step["id"]: step for step in manifest["goals"]}
+        configs = {}
+        for step_id, step in steps.items():
+            config = DeploymentConfig(
+                workload_name=self.name,
+                workload_config={
+                    **manifest.get("config", {}),
+                    **step.get("config", {}),
+                    "goal_file": step["goal_file"],
+                },
+            )
+            errors.extend(f"goal {step_id}: {e}" for e in await self.validate_config(config))
+            configs[step_id] = config
+        if errors:
+            raise ValueError(f"Invalid pipeline: {'; '.join(errors)}")
+        for step_id, step in steps.items():
+            goal_path = self._resolve_goal_path(step["goal_file"])
+            unknown = set(template_fields(goal_path.read_text())) - set(step.get("needs", []))
+            if unknown:
+                errors.append(
+                    f"goal {step_id}: placeholders are not upstream goals: "
+                    f"{', '.join(sorted(unknown))}"
+                )
+        if errors:
+            raise ValueError(f"Invalid pipeline: {'; '.join(errors)}")
+
+        name = manifest.get("name", "pipeline")
+        admission = AdmissionController(max_concurrent)
+        run_id = f"{name}-{uuid.uuid4().hex[:8]}"
+        started = time.monotonic()
+        results: dict[str, dict] = {}
+
+        async def run_step(step_id: str) -> dict:
+            step = steps[step_id]
+            needs = step.get("needs", [])
+            variant = {"step": step_id, "goal_file": step["goal_file"], "needs": needs}
+            ready_at = time.monotonic() - started
+            blocked = [n for n in needs if not results[n]["success"]]
+            if blocked:
+                return skipped_result(variant, blocked, ready_at)
+            inputs = {
+                n: str(Path(results[n]["agent_dir"]) / "output")
+                for n in needs
+                if results[n].get("agent_dir")
+            }
+            config = configs[step_id]
+            if inputs:
+                config = DeploymentConfig(
+                    workload_name=self.name,
+                    workload_config={**config.workload_config, "inputs": inputs},
+                )
+            async with admission:
+                started_at = time.monotonic() - started
+                launch = functools.partial(self._launch_pipeline_step, run_id, step_id, config)
+                result = await self._run_to_finish(variant, launch, poll_interval)
+            if result["deployment_id"]:
+                state = await self.get_status(result["deployment_id"])
+                result["agent_dir"] = state.metadata.get("agent_dir")
+            finished_at = time.monotonic() - started
+            return {
+                **result,
+                "ready_at": round(ready_at, 2),
+                "started_at": round(started_at, 2),
+                "finished_at": round(finished_at, 2),
+                "queued_seconds": round(started_at - ready_at, 2),
+            }
+
+        graph = graphlib.TopologicalSorter(
+            {step_id: step.get("needs", []) for step_id, step in steps.items()}
+        )
+        graph.prepare()
+        running: dict[asyncio.Task, str] = {}
+        try:
+            while graph.is_active():
+                for step_id in graph.get_ready():
+                    running[asyncio.create_task(run_step(step_id))] = step_id
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step_id = running.pop(task)
+                    results[step_id] = task.result()
+                    graph.done(step_id)
+        finally:
+            for task in running:
+                task.cancel()
+        return build_pipeline_report(name, results, time.monotonic() - started)
+
+    async def _launch_pipeline_step(
+        self, run_id: str, step_id: str, config: DeploymentConfig
+    ) -> str:
+        """Deploy one pipeline goal, first filling {id} placeholders with upstream outputs."""
+        goal_path = self._resolve_goal_path(config.workload_config["goal_file"])
+        text = goal_path.read_text()
+        if template_fields(text):
+            inputs = config.workload_config.get("inputs", {})
+            agents_dir, _, _ = self._artifact_dirs(config.workload_config)
+            rendered = agents_dir.parent / PIPELINES_DIR / run_id / f"{step_id}.md"
+            rendered.parent.mkdir(parents=True, exist_ok=True)
+            rendered.write_text(render_goal(text, inputs))
+            try:
+                return await self._deploy(config, rendered_goal=rendered)
+            finally:
+                # The agent is generated by now, so the filled-in copy is not needed
+                rendered.unlink(missing_ok=True)
+                with contextlib.suppress(OSError):
+                    rendered.parent.rmdir()  # Only succeeds once the run's last copy is gone
+        return await self.deploy(config)
+
+    async def _run_to_finish(
+        self, variant: dict, launch: Callable[[], Awaitable[str]], poll_interval: float
+    ) -> dict:
+        """Launch one batch item, poll it until it settles and summarize it.
+
+        A deployment waiting between retry attempts (PENDING with retry_at)
+        has not settled yet; the batch keeps polling through its retries.
+        """
+        started = time.monotonic()
+        try:
+            deployment_id = await launch()
+        except Exception as e:
+            logger.warning("Batch item %s failed to deploy: %s", variant, e)
+            return launch_failure_result(variant, str(e), time.monotonic() - started)
+        peak_rss = None
+        while True:
+            state = await self.get_status(deployment_id)
+            pid = state.metadata.get("agent_pid")
+            rss = read_peak_rss_mb(pid) if pid else None
+            if rss is not None:
+                peak_rss = max(peak_rss or 0.0, rss)
+            if self._settled(state):
+                break
+            await asyncio.sleep(poll_interval)
+        return variant_result(variant, state, time.monotonic() - started, peak_rss)
+
+    @staticmethod
+    def _settled(state: DeploymentState) -> bool:
+        """True once a deployment is finished for good, not running or awaiting a retry."""
+        if state.status in (*_TERMINAL_STATES, DeploymentStatus.STOPPED):
+            return True
+        return state.status == DeploymentStatus.PENDING and not state.metadata.get("retry_at")
+
     async def validate_config(self, config: DeploymentConfig) -> list[str]:
         errors = []
         wc = config.workload_config
@@ -293,9 +1788,11 @@ class MyWorkload(WorkloadBase):
         goal_file = wc.get("goal_file")
         if goal_file:
             try:
-                self._resolve_goal_path(goal_file)
+                self.goal_index.get(self._resolve_goal_path(goal_file))
             except ValueError as e:
                 errors.append(str(e))
+            except OSError as e:
+                errors.append(f"goal_file cannot be read: {e}")
 
         sdk = wc.get("sdk", "claude")
         if sdk not in _VALID_SDKS:
@@ -308,6 +1805,56 @@ class MyWorkload(WorkloadBase):
         enable_memory = wc.get("enable_memory", False)
         if not isinstance(enable_memory, bool):
             errors.append("enable_memory must be a boolean (true/false)")
+        if not isinstance(wc.get("bundle_dedup", False), bool):
+            errors.append("bundle_dedup must be a boolean (true/false)")
+
+        timeout_seconds = wc.get("timeout_seconds")
+        if timeout_seconds is not None and (
+            isinstance(timeout_seconds, bool)
+            or not isinstance(timeout_seconds, int | float)
+            or timeout_seconds <= 0
+        ):
+            errors.append("timeout_seconds must be a positive number of seconds")
+
+        stall_timeout = wc.get("stall_timeout_seconds")
+        if stall_timeout is not None and (
+            isinstance(stall_timeout, bool)
+            or not isinstance(stall_timeout, int | float)
+            or stall_timeout <= 0
+        ):
+            errors.append("stall_timeout_seconds must be a positive number of seconds")
+
+        errors.extend(validate_mock_options(wc))
+        errors.extend(validate_log_options(wc))
+        errors.extend(validate_retry_options(wc))
+        errors.extend(validate_artifact_options(wc))
+        errors.extend(validate_inputs(wc))
+
+        llm_cache = wc.get("llm_cache", "off")
+        if llm_cache != "off" and llm_cache not in CACHE_MODES:
+            errors.append(
+                f"llm_cache must be one of: off, {', '.join(CACHE_MODES)} (got '{llm_cache}')"
+            )
+        elif llm_cache != "off" and sdk not in _LLM_CACHE_SDKS:
+            errors.append(
+                f"llm_cache needs an SDK whose LLM calls can be intercepted "
+                f"({', '.join(_LLM_CACHE_SDKS)}); sdk '{sdk}' would call the live LLM"
+            )
+
+        llm_cache_max_bytes = wc.get("llm_cache_max_bytes")
+        if llm_cache_max_bytes is not None and (
+            isinstance(llm_cache_max_bytes, bool)
+            or not isinstance(llm_cache_max_bytes, int)
+            or llm_cache_max_bytes <= 0
+        ):
+            errors.append("llm_cache_max_bytes must be a positive integer")
+
+        stall_action = wc.get("stall_action", "flag")
+        if stall_action not in _VALID_STALL_ACTIONS:
+            errors.append(
+                f"stall_action must be one of: {', '.join(_VALID_STALL_ACTIONS)} "
+                f"(got '{stall_action}')"
+            )
 
         return errors
 
@@ -343,8 +1890,24 @@ class MyWorkload(WorkloadBase):
         goal_path: Path,
         sdk: str,
         enable_memory: bool,
+        agents_dir: Path | None = None,
     ) -> Path:
         """Use the amplihack goal agent generator to create an agent bundle."""
+        output_dir = (agents_dir or _AGENTS_DIR) / deployment_id
+        return self._build_agent(deployment_id, goal_path, sdk, enable_memory, output_dir)
+
+    def _build_agent(
+        self,
+        deployment_id: str,
+        goal_path: Path,
+        sdk: str,
+        enable_memory: bool,
+        output_dir: Path,
+    ) -> Path:
+        """Run the generator pipeline and package the bundle into output_dir.
+
+        Synchronous, so pre-generation can run it on a worker thread.
+        """
         from amplihack.goal_agent_generator import (
             AgentAssembler,
             GoalAgentPackager,
@@ -353,22 +1916,32 @@ class MyWorkload(WorkloadBase):
             SkillSynthesizer,
         )
 
-        analyzer = PromptAnalyzer()
-        goal_def = analyzer.analyze(goal_path)
+        # Stages are memoized by their inputs while a batch (e.g. a matrix
+        # run) has _generation_cache set; otherwise every call regenerates.
+        goal_key = hashlib.sha256(goal_path.read_bytes()).hexdigest()
+
+        def analyze_and_plan():
+            goal_def = PromptAnalyzer().analyze(goal_path)
+            return goal_def, ObjectivePlanner().generate_plan(goal_def)
+
+        goal_def, plan = self._generation_stage(("plan", goal_key), analyze_and_plan)
         self._append_log(
             deployment_id,
             f"Goal analyzed: domain={goal_def.domain}, complexity={goal_def.complexity}",
         )
-
-        planner = ObjectivePlanner()
-        plan = planner.generate_plan(goal_def)
         self._append_log(
             deployment_id,
             f"Execution plan: {len(plan.phases)} phases, est. {plan.total_estimated_duration}",
         )
-
-        synthesizer = SkillSynthesizer()
-        synthesis = synthesizer.synthesize_with_sdk_tools(plan, sdk=sdk)
+        self._plan_summaries[deployment_id] = {
+            "phases": [phase.name for phase in plan.phases],
+            "estimated_duration": plan.total_estimated_duration,
+        }
+
+        synthesis = self._generation_stage(
+            ("synthesize", goal_key, sdk),
+            lambda: SkillSynthesizer().synthesize_with_sdk_tools(plan, sdk=sdk),
+        )
         skills = synthesis.get("skills", [])
         sdk_tools = synthesis.get("sdk_tools", [])
         self._append_log(
@@ -376,70 +1949,192 @@ class MyWorkload(WorkloadBase):
             f"Matched {len(skills)} skills, {len(sdk_tools)} SDK tools",
         )
 
-        assembler = AgentAssembler()
-        bundle = assembler.assemble(
-            goal_def,
-            plan,
-            skills,
-            bundle_name=deployment_id,
-            enable_memory=enable_memory,
-            sdk=sdk,
-            sdk_tools=sdk_tools,
+        def assemble():
+            bundle = AgentAssembler().assemble(
+                goal_def,
+                plan,
+                skills,
+                bundle_name=deployment_id,
+                enable_memory=enable_memory,
+                sdk=sdk,
+                sdk_tools=sdk_tools,
+            )
+            return bundle, deployment_id
+
+        bundle, built_for = self._generation_stage(
+            ("assemble", goal_key, sdk, enable_memory), assemble
         )
+        if built_for != deployment_id and dataclasses.is_dataclass(bundle):
+            # Reused from another deployment in the batch: rename for this one
+            bundle = dataclasses.replace(bundle, name=deployment_id)
 
-        output_dir = Path(f".haymaker/agents/{deployment_id}")
         packager = GoalAgentPackager(output_dir=output_dir)
         agent_dir = packager.package(bundle)
         self._append_log(deployment_id, "Agent bundle packaged")
 
         return agent_dir
 
-    def _execute_agent_detached(self, deployment_id: str, agent_dir: Path, max_turns: int) -> None:
-        """Launch the agent as a detached subprocess (fire-and-forget)."""
+    def _generation_stage(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        """Return a generator stage result, reusing it if the batch cache has one."""
+        cache = self._generation_cache
+        if cache is None:
+            return compute()
+        if key not in cache:
+            cache[key] = compute()
+        return cache[key]
+
+    @staticmethod
+    def _agent_env(workload_config: dict) -> dict[str, str]:
+        """Extra agent environment derived from the deployment config."""
+        env = inputs_env(workload_config)
+        mode = workload_config.get("llm_cache", "off")
+        if mode == "off":
+            return env
+        agents_dir, _, _ = MyWorkload._artifact_dirs(workload_config)
+        # Next to the agent directories, under artifact_root when it is set
+        cache_dir = agents_dir.parent / _LLM_CACHE_DIR.name
+        return {**env, **cache_env(cache_dir, mode, workload_config.get("llm_cache_max_bytes"))}
+
+    @staticmethod
+    def _resume_env(agent_dir: Path) -> dict[str, str]:
+        """Tell a relaunched agent to resume if it left a checkpoint."""
+        if (agent_dir / CHECKPOINT_FILE).exists():
+            return {RESUME_ENV: "1"}
+        return {}
+
+    @staticmethod
+    def _artifact_dirs(workload_config: dict) -> tuple[Path, Path, Path]:
+        """Where agent directories, their shared bundle blobs and archives go.
+
+        All sit under artifact_root when it is set (blobs must share its
+        filesystem to be hardlinked), else under .haymaker. The paths are
+        absolute, so commands run from elsewhere still find the agent.
+        """
+        root = workload_config.get("artifact_root")
+        if not root:
+            return Path.cwd() / _AGENTS_DIR, Path.cwd() / _BLOBS_DIR, Path.cwd() / _ARCHIVE_DIR
+        root_path = Path(os.path.abspath(Path(root).expanduser()))
+        return root_path / "agents", root_path / "blobs", root_path / "archive"
+
+    def _dedupe_bundle(self, deployment_id: str, agent_dir: Path, blobs_dir: Path) -> None:
+        """Hardlink the bundle's files to identical ones from earlier deployments."""
+        try:
+            stats = BundleStore(blobs_dir).dedupe(agent_dir)
+        except OSError as e:
+            # Deduplication only saves space; a bundle that keeps its own copies still runs
+            logger.warning("Bundle deduplication failed for %s: %s", deployment_id, e)
+            return
+        self._append_log(
+            deployment_id,
+            f"Bundle files: {stats['files']} ({stats['shared']} shared with earlier "
+            f"deployments, {stats['bytes_shared']} of {stats['bytes']} bytes)",
+        )
+
+    def _generate_mock_agent(
+        self, deployment_id: str, workload_config: dict, agents_dir: Path | None = None
+    ) -> Path:
+        """Write a synthetic agent bundle for sdk=mock (see mock_agent.py)."""
+        agent_dir = write_mock_bundle((agents_dir or _AGENTS_DIR) / deployment_id, workload_config)
+        turns = workload_config.get("mock_turns", 5)
+        turn_seconds = workload_config.get("mock_turn_seconds", 0.5)
+        self._plan_summaries[deployment_id] = {
+            "phases": list(MOCK_PHASES),
+            "estimated_duration": f"{turns * turn_seconds} seconds",
+        }
+        return agent_dir
+
+    def _execute_agent_detached(
+        self,
+        deployment_id: str,
+        agent_dir: Path,
+        max_turns: int,
+        append_log: bool = False,
+        extra_env: dict[str, str] | None = None,
+        log_rotation: dict | None = None,
+    ) -> None:
+        """Launch the agent as a detached subprocess (fire-and-forget).
+
+        Set append_log when relaunching into an existing agent_dir so the
+        previous run's agent.log is kept. extra_env is merged into the
+        agent's environment. With log_rotation (see log_relay.log_rotation)
+        the agent's output is relayed into rotating, compressed segments.
+        """
         main_py = agent_dir / "main.py"
         if not main_py.exists():
             self._append_log(deployment_id, f"ERROR: {main_py} not found")
             raise FileNotFoundError(f"Agent entry point not found: {main_py}")
 
         log_file = agent_dir / "agent.log"
+        err_file = agent_dir / "agent.err"
         self._append_log(deployment_id, f"Executing agent (max_turns={max_turns})")
         self._append_log(deployment_id, f"Agent log: {log_file}")
 
         self._agent_log_files[deployment_id] = log_file
 
-        # Open log and error files. We duplicate the fds for the child process
-        # so that even if the parent's MyWorkload instance is garbage-collected
-        # (closing lf/ef), the child retains its own independent fd copies.
-        lf = open(log_file, "w", buffering=1)  # noqa: SIM115  # line-buffered
-        self._log_file_handles[deployment_id] = lf
+        if log_rotation:
+            # Output goes through pipes to a relay that rotates and compresses it
+            child_stdout_fd, child_stderr_fd = self._start_log_relay(
+                deployment_id, log_file, err_file, log_rotation, append_log
+            )
+            ef = None
+        else:
+            # Open log and error files. We duplicate the fds for the child process
+            # so that even if the parent's MyWorkload instance is garbage-collected
+            # (closing lf/ef), the child retains its own independent fd copies.
+            log_mode = "a" if append_log else "w"
+            lf = open(log_file, log_mode, buffering=1)  # noqa: SIM115  # line-buffered
+            self._log_file_handles[deployment_id] = lf
 
-        err_file = agent_dir / "agent.err"
-        ef = open(err_file, "w", buffering=1)  # noqa: SIM115
+            ef = open(err_file, "w", buffering=1)  # noqa: SIM115
 
-        # Create duplicate fds for the child -- survives parent GC
-        child_stdout_fd = os.dup(lf.fileno())
-        child_stderr_fd = os.dup(ef.fileno())
+            # Create duplicate fds for the child -- survives parent GC
+            child_stdout_fd = os.dup(lf.fileno())
+            child_stderr_fd = os.dup(ef.fileno())
 
         # Strip CLAUDECODE env var to prevent "cannot launch inside
         # another Claude Code session" error in the agent subprocess
         env = {k: v for k, v in os.environ.items() if k != "CLAUDECODE"}
+        env.update(extra_env or {})
+
+        # The agent touches this file to signal progress; seed it so the stall
+        # window starts at launch rather than at the first heartbeat.
+        heartbeat_file = agent_dir / "heartbeat"
+        heartbeat_file.touch()
+        # Paths handed to the agent must be absolute: its cwd is agent_dir
+        env[_HEARTBEAT_ENV] = str(heartbeat_file.absolute())
+
+        # Structured event stream: hand the child an append-only fd so it
+        # never has to resolve paths, and keep agent.log purely human-readable.
+        events_file = agent_dir / EVENTS_FILE
+        events_flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        if not append_log:
+            events_flags |= os.O_TRUNC
+        child_events_fd = os.open(events_file, events_flags, 0o644)
+        env[EVENTS_FD_ENV] = str(child_events_fd)
+        env[EVENTS_FILE_ENV] = str(events_file.absolute())
+        env[CHECKPOINT_FILE_ENV] = str((agent_dir / CHECKPOINT_FILE).absolute())
 
         try:
             proc = subprocess.Popen(
                 ["python3", "-u", "main.py"],  # -u: unbuffered stdout/stderr
                 stdout=child_stdout_fd,
                 stderr=child_stderr_fd,
+                pass_fds=(child_events_fd,),
                 cwd=str(agent_dir),
                 env=env,
                 start_new_session=True,
             )
         except OSError:
-            # Clean up all fds on Popen failure to prevent leaks
+            # Clean up all fds on Popen failure to prevent leaks; closing
+            # the pipe ends also lets a relay see EOF and exit.
             os.close(child_stdout_fd)
             os.close(child_stderr_fd)
-            ef.close()
-            lf.close()
-            self._log_file_handles.pop(deployment_id, None)
+            os.close(child_events_fd)
+            if ef is not None:
+                ef.close()
+            lf = self._log_file_handles.pop(deployment_id, None)
+            if lf is not None:
+                lf.close()
             raise
 
         self._processes[deployment_id] = proc
@@ -448,13 +2143,66 @@ class MyWorkload(WorkloadBase):
         # process has inherited its own copies via Popen.
         os.close(child_stdout_fd)
         os.close(child_stderr_fd)
+        os.close(child_events_fd)
 
         # Close the error file handle in the parent (we don't need it).
         # The original lf stays open in _log_file_handles for in-memory reads.
-        ef.close()
+        if ef is not None:
+            ef.close()
 
         self._append_log(deployment_id, f"Agent started (pid={proc.pid})")
 
+    def _start_log_relay(
+        self,
+        deployment_id: str,
+        log_file: Path,
+        err_file: Path,
+        rotation: dict,
+        append_log: bool,
+    ) -> tuple[int, int]:
+        """Launch a log relay for an agent; returns the stdout and stderr fds to give it."""
+        previous = self._log_relays.pop(deployment_id, None)
+        if previous is not None:
+            # Two relays rotating one agent.log would number segments independently
+            self._join_relay(previous)
+        out_read, out_write = os.pipe()
+        err_read, err_write = os.pipe()
+        try:
+            relay = subprocess.Popen(
+                relay_command(
+                    rotation, [(out_read, log_file, append_log), (err_read, err_file, False)]
+                ),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(out_read, err_read),
+                start_new_session=True,
+            )
+        except OSError:
+            os.close(out_write)
+            os.close(err_write)
+            raise
+        finally:
+            # Only the relay reads; keeping these open would hide the agent's EOF
+            os.close(out_read)
+            os.close(err_read)
+        self._log_relays[deployment_id] = relay
+        return out_write, err_write
+
+    @staticmethod
+    def _join_relay(relay: subprocess.Popen) -> None:
+        """Wait for a previous run's relay to drain, stopping it if it does not."""
+        try:
+            relay.wait(timeout=_RELAY_DRAIN_SECONDS)
+        except subprocess.TimeoutExpired:
+            # Something the old agent left running still holds the pipes open
+            relay.terminate()
+            try:
+                relay.wait(timeout=_KILL_GRACE_SECONDS)
+            except subprocess.TimeoutExpired:
+                relay.kill()
+                relay.wait()
+
     def _terminate_process(self, deployment_id: str) -> None:
         """Terminate a process with SIGTERM, escalate to SIGKILL if needed."""
         proc = self._processes.get(deployment_id)
@@ -470,16 +2218,523 @@ class MyWorkload(WorkloadBase):
                     logger.warning("Process %s did not exit after SIGKILL", proc.pid)
         self._cleanup_process(deployment_id)
 
+    def _release_deployment(self, deployment_id: str) -> None:
+        """Drop in-memory tracking and the temp goal file of a cleaned-up deployment."""
+        self._logs.pop(deployment_id, None)
+        self._agent_log_files.pop(deployment_id, None)
+        self._log_progress_offsets.pop(deployment_id, None)
+        self._plan_summaries.pop(deployment_id, None)
+        self._persisted.pop(deployment_id, None)
+        self._log_relays.pop(deployment_id, None)
+        temp_file = self._temp_goal_files.pop(deployment_id, None)
+        if temp_file and temp_file.exists():
+            temp_file.unlink()
+
+    def _stop_agent(self, state: DeploymentState) -> None:
+        """Terminate an agent via its in-memory handle, or by PID if launched elsewhere."""
+        if state.deployment_id in self._processes:
+            self._terminate_process(state.deployment_id)
+            return
+        pid = (state.metadata or {}).get("agent_pid")
+        if pid:
+            # Agents run in their own session, so the PID is also the process group
+            try:
+                os.killpg(pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    @staticmethod
+    async def _wait_for_group_exit(pid: int) -> bool:
+        """Wait for a stopped agent's process group to exit, escalating to SIGKILL.
+
+        Covers agents launched by another process, which _stop_agent only
+        signals. Returns False if the group is still alive after SIGKILL.
+        """
+        for sig, grace in ((None, _STOP_GRACE_SECONDS), (signal.SIGKILL, _KILL_GRACE_SECONDS)):
+            if sig is not None:
+                with contextlib.suppress(ProcessLookupError, PermissionError):
+                    os.killpg(pid, sig)
+            deadline = time.monotonic() + grace
+            while True:
+                try:
+                    os.killpg(pid, 0)
+                except (ProcessLookupError, PermissionError):
+                    # PermissionError: the PID now belongs to someone else's process
+                    return True
+                if time.monotonic() > deadline:
+                    break
+                await asyncio.sleep(0.05)
+        return False
+
+    def _arm_watchdog(self, state: DeploymentState) -> None:
+        """(Re)start the timeout watchdog for the time left until the deployment's deadline."""
+        deadline = state.metadata.get("deadline")
+        if not deadline:
+            return
+        old = self._watchdogs.pop(state.deployment_id, None)
+        if old is not None:
+            old.cancel()
+        remaining = (datetime.fromisoformat(deadline) - datetime.now(tz=UTC)).total_seconds()
+        self._watchdogs[state.deployment_id] = asyncio.create_task(
+            self._watchdog(state.deployment_id, max(remaining, 0.0))
+        )
+
+    async def _watchdog(self, deployment_id: str, timeout_seconds: float) -> None:
+        """Sleep until the deployment deadline, then stop the agent if still running."""
+        # Armed from inside get_status, this task inherited its save batch,
+        # which is flushed by now: save directly.
+        _SAVE_BATCH.set(None)
+        await asyncio.sleep(timeout_seconds)
+        # Deregister first so _cleanup_process does not cancel this task mid-termination
+        self._watchdogs.pop(deployment_id, None)
+        await self._enforce_deadline(deployment_id)
+
+    @_retry_on_conflict
+    async def _enforce_deadline(self, deployment_id: str) -> None:
+        try:
+            state = await self.get_status(deployment_id)
+        except DeploymentNotFoundError:
+            return
+        if state.status == DeploymentStatus.RUNNING:
+            await self._fail_timed_out(state)
+
+    async def _check_stalled(self, state: DeploymentState) -> None:
+        """Flag (and optionally stop or restart) a RUNNING agent that shows no progress.
+
+        Progress is the newest mtime of the heartbeat file and agent.log, so
+        the check costs two stat calls and never reads the log.
+        """
+        stall_timeout = (state.config or {}).get("stall_timeout_seconds")
+        agent_dir_str = (state.metadata or {}).get("agent_dir")
+        if not stall_timeout or not agent_dir_str:
+            return
+
+        agent_dir = Path(agent_dir_str)
+        mtimes = []
+        for name in ("heartbeat", "agent.log"):
+            try:
+                mtimes.append((agent_dir / name).stat().st_mtime)
+            except OSError:
+                pass
+        if not mtimes:
+            return
+        last_activity = max(mtimes)
+        stalled = time.time() - last_activity > stall_timeout
+
+        if not stalled:
+            if state.metadata.pop("stalled", None):
+                await self.save_state(state)
+            return
+
+        state.metadata["last_activity_at"] = datetime.fromtimestamp(
+            last_activity, tz=UTC
+        ).isoformat()
+        action = state.config.get("stall_action", "flag")
+        restarts = state.metadata.get("stall_restarts", 0)
+
+        if action == "restart" and restarts < _MAX_STALL_RESTARTS:
+            self._append_log(
+                state.deployment_id, f"Agent stalled for {stall_timeout}s -- restarting"
+            )
+            self._stop_agent(state)
+            # Relaunch once the old process group has exited, without holding
+            # up this poll. PENDING keeps pollers from taking the stopped agent
+            # for a failed one meanwhile; the deadline still applies.
+            state.status = DeploymentStatus.PENDING
+            state.phase = "restarting"
+            state.metadata["stall_restarts"] = restarts + 1
+            state.metadata.pop("stalled", None)
+            await self.save_state(state)
+            self._stall_restarts[state.deployment_id] = asyncio.create_task(
+                self._restart_stalled(state.deployment_id, state.metadata.get("agent_pid"))
+            )
+        elif action in ("stop", "restart"):
+            self._stop_agent(state)
+            self._append_log(state.deployment_id, f"Agent stalled for {stall_timeout}s -- stopped")
+            state.status = DeploymentStatus.FAILED
+            state.phase = "failed"
+            state.error = f"Agent stalled: no heartbeat or log activity for {stall_timeout}s"
+            state.completed_at = datetime.now(tz=UTC)
+            state.metadata["stalled"] = True
+            await self.save_state(state)
+        elif not state.metadata.get("stalled"):
+            self._append_log(state.deployment_id, f"Agent stalled for {stall_timeout}s")
+            state.metadata["stalled"] = True
+            await self.save_state(state)
+
+    async def _restart_stalled(self, deployment_id: str, pid: int | None) -> None:
+        """Wait for a stalled agent's process group to exit, then relaunch it."""
+        # Scheduled from inside get_status; its save batch is flushed by now
+        _SAVE_BATCH.set(None)
+        # Never run two copies in one agent_dir: relaunch only once the old one is gone
+        exited = not pid or await self._wait_for_group_exit(pid)
+        # Deregister first so _cleanup_process does not cancel this task mid-launch
+        self._stall_restarts.pop(deployment_id, None)
+        await self._relaunch_stalled(deployment_id, pid, exited)
+
+    @_retry_on_conflict
+    async def _relaunch_stalled(self, deployment_id: str, pid: int | None, exited: bool) -> None:
+        state = await self.load_state(deployment_id)
+        # Stopped or timed out while the old agent was exiting
+        if state is None or (state.status, state.phase) != (
+            DeploymentStatus.PENDING,
+            "restarting",
+        ):
+            return
+
+        def fail(error: str) -> None:
+            state.status = DeploymentStatus.FAILED
+            state.phase = "failed"
+            state.error = error
+            state.completed_at = datetime.now(tz=UTC)
+            state.metadata["stalled"] = True
+
+        if not exited:
+            fail(f"Stalled agent (pid {pid}) did not exit; not restarted")
+            await self.save_state(state)
+            return
+        agent_dir = Path(state.metadata["agent_dir"])
+        try:
+            self._execute_agent_detached(
+                deployment_id,
+                agent_dir,
+                state.metadata.get("max_turns", 15),
+                append_log=True,
+                extra_env={
+                    **self._agent_env(state.config or {}),
+                    **self._resume_env(agent_dir),
+                },
+                log_rotation=log_rotation(state.config or {}),
+            )
+        except OSError as e:
+            fail(f"Failed to restart stalled agent: {e}")
+            await self.save_state(state)
+            return
+        proc = self._processes.get(deployment_id)
+        if proc:
+            state.metadata["agent_pid"] = proc.pid
+        state.status = DeploymentStatus.RUNNING
+        state.phase = "executing"
+        try:
+            await self.save_state(state)
+        except StateConflictError:
+            self._terminate_process(deployment_id)
+            raise
+        # Stopping the old process cancelled its watchdog; the deadline still holds
+        self._arm_watchdog(state)
+
+    def _schedule_retry(self, state: DeploymentState, exit_code: int | None) -> bool:
+        """Record a failed attempt and, if the retry policy allows, schedule another.
+
+        Classifies the failure from the exit code, the tail of agent.err and
+        any error the agent reported. A retryable failure puts the
+        deployment back to PENDING with metadata["retry_at"] set after a
+        jittered backoff. Returns True if a retry was scheduled.
+        """
+        metadata = state.metadata
+        agent_dir_str = metadata.get("agent_dir")
+        outcome = metadata.get("agent_progress", {}).get("outcome") or {}
+        evidence = "\n".join(
+            text
+            for text in (
+                read_stderr_tail(Path(agent_dir_str) / "agent.err") if agent_dir_str else "",
+                outcome.get("error"),
+                state.error,
+            )
+            if text
+        )
+        failure_class = classify_failure(exit_code, evidence)
+        now = datetime.now(tz=UTC)
+        attempts = metadata.setdefault("attempts", [])
+        record = {
+            "attempt": len(attempts) + 1,
+            "exit_code": exit_code,
+            "failure_class": failure_class,
+            "error": state.error,
+            "ended_at": now.isoformat(),
+        }
+        attempts.append(record)
+
+        policy = retry_policy(state.config or {})
+        if (
+            policy is None
+            or failure_class not in policy["retry_on"]
+            or record["attempt"] >= policy["max_attempts"]
+        ):
+            return False
+
+        delay = backoff_delay(
+            record["attempt"], policy["backoff_seconds"], policy["backoff_max_seconds"]
+        )
+        record["retry_in_seconds"] = round(delay, 2)
+        metadata["retry_at"] = (now + timedelta(seconds=delay)).isoformat()
+        state.status = DeploymentStatus.PENDING
+        state.phase = "retry_scheduled"
+        state.completed_at = None
+        state.error = (
+            f"Attempt {record['attempt']} failed ({failure_class}); retrying in {delay:.0f}s"
+        )
+        self._append_log(state.deployment_id, state.error)
+
+        previous = self._retry_timers.pop(state.deployment_id, None)
+        if previous:
+            previous.cancel()
+        self._retry_timers[state.deployment_id] = asyncio.create_task(
+            self._retry_timer(state.deployment_id, delay)
+        )
+        return True
+
+    async def _retry_timer(self, deployment_id: str, delay: float) -> None:
+        """Relaunch the deployment when its retry falls due, waiting for admission."""
+        # Scheduled from inside get_status; its save batch is flushed by now
+        _SAVE_BATCH.set(None)
+        await asyncio.sleep(delay)
+        async with self._retry_admission:
+            # Deregister first so _cleanup_process does not cancel this task mid-launch
+            self._retry_timers.pop(deployment_id, None)
+            await self._launch_due_retry(deployment_id)
+
+    @_retry_on_conflict
+    async def _launch_due_retry(self, deployment_id: str) -> None:
+        state = await self.load_state(deployment_id)
+        # Stopped, or relaunched by another process, while this one waited
+        if state is None or state.status != DeploymentStatus.PENDING:
+            return
+        if not self._retry_due(state):
+            return
+        if self._deadline_passed(state):
+            await self._fail_timed_out(state)
+        else:
+            await self._launch_retry(state)
+
+    @staticmethod
+    def _retry_due(state: DeploymentState) -> bool:
+        retry_at = (state.metadata or {}).get("retry_at")
+        return bool(retry_at) and datetime.now(tz=UTC) >= datetime.fromisoformat(retry_at)
+
+    async def _launch_retry(self, state: DeploymentState) -> None:
+        """Relaunch a PENDING deployment's existing bundle for its next attempt.
+
+        The caller holds a _retry_admission slot. timeout_seconds bounds all
+        attempts together: the relaunched agent gets a watchdog for whatever
+        is left of the original deadline.
+        """
+        deployment_id = state.deployment_id
+        metadata = state.metadata
+        agent_dir = Path(metadata["agent_dir"])
+        attempt = len(metadata.get("attempts", [])) + 1
+        metadata.pop("retry_at", None)
+        metadata.get("agent_progress", {}).pop("outcome", None)
+        self._append_log(deployment_id, f"Retrying agent (attempt {attempt})")
+        try:
+            self._execute_agent_detached(
+                deployment_id,
+                agent_dir,
+                metadata.get("max_turns", 15),
+                append_log=True,
+                extra_env={
+                    **self._agent_env(state.config or {}),
+                    **self._resume_env(agent_dir),
+                },
+                log_rotation=log_rotation(state.config or {}),
+            )
+        except OSError as e:
+            state.status = DeploymentStatus.FAILED
+            state.phase = "failed"
+            state.error = f"Failed to relaunch agent for attempt {attempt}: {e}"
+            state.completed_at = datetime.now(tz=UTC)
+            await self.save_state(state)
+            return
+
+        proc = self._processes.get(deployment_id)
+        if proc:
+            metadata["agent_pid"] = proc.pid
+        state.status = DeploymentStatus.RUNNING
+        state.phase = "executing"
+        state.error = None
+        # Claim the attempt now rather than at the end of get_status: if
+        # another process relaunched it first, undo ours.
+        try:
+            await self._persist_state(state)
+        except StateConflictError:
+            self._terminate_process(deployment_id)
+            raise
+        # The previous attempt's watchdog went with its process
+        self._arm_watchdog(state)
+
+    @staticmethod
+    def _deadline_passed(state: DeploymentState) -> bool:
+        deadline = (state.metadata or {}).get("deadline")
+        if not deadline:
+            return False
+        return datetime.now(tz=UTC) >= datetime.fromisoformat(deadline)
+
+    async def _fail_timed_out(self, state: DeploymentState) -> None:
+        """Stop an overdue agent and record FAILED with partial-progress metadata."""
+        timeout_seconds = state.metadata.get("timeout_seconds")
+        self._stop_agent(state)
+        self._append_log(
+            state.deployment_id, f"Agent exceeded timeout of {timeout_seconds}s -- terminated"
+        )
+
+        now = datetime.now(tz=UTC)
+        log_bytes = 0
+        agent_dir_str = state.metadata.get("agent_dir")
+        if agent_dir_str:
+            try:
+                log_bytes = log_size(Path(agent_dir_str) / "agent.log")
+            except OSError:
+                pass
+        progress = state.metadata.get("agent_progress", {})
+        state.metadata["partial_progress"] = {
+            "last_phase": state.phase,
+            "phases_completed": progress.get("phases_completed", []),
+            "turns_used": progress.get("turns_used", 0),
+            "elapsed_seconds": (now - state.started_at).total_seconds()
+            if state.started_at
+            else None,
+            "log_bytes": log_bytes,
+        }
+        state.metadata["timed_out"] = True
+        state.status = DeploymentStatus.FAILED
+        state.phase = "failed"
+        state.error = f"Agent timed out after {timeout_seconds}s"
+        state.completed_at = now
+        await self.save_state(state)
+
     def _cleanup_process(self, deployment_id: str) -> None:
-        """Clean up process tracking and close log file handle."""
+        """Clean up process tracking, watchdog and log file handle."""
         self._processes.pop(deployment_id, None)
+        watchdog = self._watchdogs.pop(deployment_id, None)
+        if watchdog:
+            watchdog.cancel()
+        retry_timer = self._retry_timers.pop(deployment_id, None)
+        if retry_timer:
+            retry_timer.cancel()
+        stall_restart = self._stall_restarts.pop(deployment_id, None)
+        if stall_restart:
+            stall_restart.cancel()
         lf = self._log_file_handles.pop(deployment_id, None)
         if lf and not lf.closed:
             lf.close()
+        relay = self._log_relays.get(deployment_id)
+        if relay and relay.poll() is not None:
+            del self._log_relays[deployment_id]
+        # A relay still draining the pipes stays tracked, so a relaunch can
+        # join it before starting the next one.
+
+    def _consume_events(self, state: DeploymentState) -> bool:
+        """Fold events appended to events.jsonl since the saved offset into state.
+
+        Returns True if new events were read and state was updated. A stat
+        call short-circuits the common no-new-events case. Until the agent
+        writes its first event, progress is read from agent.log instead.
+        """
+        agent_dir_str = (state.metadata or {}).get("agent_dir")
+        if not agent_dir_str:
+            return False
+        events_file = Path(agent_dir_str) / EVENTS_FILE
+        offset = state.metadata.get("events_offset", 0)
+        try:
+            size = events_file.stat().st_size
+        except OSError:
+            size = 0
+        if size <= offset:
+            return offset == 0 and self._consume_log_progress(state)
+
+        events, new_offset = read_events(events_file, offset)
+        if new_offset == offset:
+            return False
+        progress = state.metadata.setdefault("agent_progress", {})
+        apply_events(progress, events)
+        usage = state.metadata.get("llm_usage", {})
+        if record_llm_calls(usage, events):
+            state.metadata["llm_usage"] = usage
+        state.metadata["events_offset"] = new_offset
+        if progress.get("current_phase"):
+            state.phase = progress["current_phase"]
+        self._update_progress(state)
+        return True
+
+    def _consume_log_progress(self, state: DeploymentState) -> bool:
+        """Fold phase and turn lines appended to agent.log into state.
+
+        For agents that write no events.jsonl (see events.log_events). The
+        read position is kept in memory and saved as log_offset only with
+        new progress, so a chatty log does not turn every poll into a write.
+        Returns True if state was updated.
+        """
+        deployment_id = state.deployment_id
+        log_file = Path(state.metadata["agent_dir"]) / "agent.log"
+        offset = self._log_progress_offsets.get(deployment_id, state.metadata.get("log_offset", 0))
+        try:
+            size = log_file.stat().st_size
+        except OSError:
+            return False
+        if size < offset:
+            offset = 0  # Rotated: the live file is a new segment
+        if size == offset:
+            return False
+
+        events, new_offset = log_events(log_file, offset, state.metadata.get("plan_phases", []))
+        self._log_progress_offsets[deployment_id] = new_offset
+        before = state.metadata.get("agent_progress", {})
+        progress = copy.deepcopy(before)
+        apply_events(progress, events)
+        if progress == before:
+            return False
+        state.metadata["agent_progress"] = progress
+        state.metadata["log_offset"] = new_offset
+        if progress.get("current_phase"):
+            state.phase = progress["current_phase"]
+        self._update_progress(state)
+        return True
+
+    @staticmethod
+    def _update_progress(state: DeploymentState) -> None:
+        """Recompute the scheduler-facing progress summary from agent_progress.
+
+        Only called when new events arrive, so the estimate is a snapshot
+        and polling an idle agent does not produce a write.
+        """
+        now = datetime.now(tz=UTC)
+        elapsed = (now - state.started_at).total_seconds() if state.started_at else 0.0
+        progress = compute_progress(
+            state.metadata.get("agent_progress", {}),
+            plan_phases=state.metadata.get("plan_phases", []),
+            max_turns=state.metadata.get("max_turns", 15),
+            estimated_seconds=state.metadata.get("estimated_duration_seconds"),
+            elapsed_seconds=elapsed,
+        )
+        remaining = progress["estimated_remaining_seconds"]
+        if remaining is not None:
+            progress["estimated_completion_at"] = (now + timedelta(seconds=remaining)).isoformat()
+        state.metadata["progress"] = progress
+
+    @staticmethod
+    def _detect_status_from_events(state: DeploymentState) -> bool:
+        """Apply the outcome the agent reported in its event stream, if any.
+
+        Returns True if an outcome event was recorded and state was updated.
+        """
+        outcome = (state.metadata or {}).get("agent_progress", {}).get("outcome")
+        if not outcome:
+            return False
+        if outcome["status"] == "completed":
+            state.status = DeploymentStatus.COMPLETED
+            state.phase = "completed"
+        else:
+            state.status = DeploymentStatus.FAILED
+            state.phase = "failed"
+            state.error = f"Agent reported failure: {outcome.get('error') or 'no reason given'}"
+        state.completed_at = datetime.now(tz=UTC)
+        return True
 
     def _detect_status_from_log(self, state: DeploymentState) -> bool:
         """Check agent.log for completion indicators and update state in-place.
 
+        Fallback for agents that do not emit an events.jsonl outcome.
+
         Returns True if the log contained a recognized indicator and state was
         updated, False if the log was absent, empty, or inconclusive.
         """
@@ -508,15 +2763,9 @@ class MyWorkload(WorkloadBase):
 
     @staticmethod
     def _read_last_line(path: Path) -> str | None:
-        """Read the last non-empty line of a file, or None if the file is empty."""
+        """Read the last non-empty line of a log (across rotated segments), or None."""
         try:
-            with open(path) as f:
-                last = None
-                for line in f:
-                    stripped = line.strip()
-                    if stripped:
-                        last = stripped
-                return last
+            return read_last_line(path)
         except OSError:
             return None
 
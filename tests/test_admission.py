@@ -0,0 +1,56 @@
+"""Tests for batch admission control."""
+
+import asyncio
+import time
+
+import pytest
+
+from haymaker_my_workload.admission import AdmissionController
+
+
+class TestAdmissionController:
+    async def test_bounds_in_flight(self):
+        admission = AdmissionController(max_in_flight=2)
+
+        async def hold():
+            async with admission:
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(*(hold() for _ in range(6)))
+        assert admission.peak_in_flight == 2
+        assert admission.in_flight == 0
+
+    async def test_spaces_admissions(self):
+        admission = AdmissionController(max_in_flight=10, min_interval=0.05)
+        admitted = []
+
+        async def enter():
+            async with admission:
+                admitted.append(time.monotonic())
+
+        await asyncio.gather(*(enter() for _ in range(3)))
+        gaps = [b - a for a, b in zip(admitted, admitted[1:], strict=False)]
+        assert all(gap >= 0.045 for gap in gaps)
+
+    def test_rejects_zero_limit(self):
+        with pytest.raises(ValueError, match="max_in_flight"):
+            AdmissionController(0)
+
+    async def test_explicit_acquire_release(self):
+        admission = AdmissionController(1)
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        admission.release()
+        await waiter
+        assert admission.in_flight == 1 and admission.peak_in_flight == 1
+        admission.release()
+
+    async def test_try_acquire_never_waits(self):
+        admission = AdmissionController(max_in_flight=2, min_interval=60)
+        assert await admission.try_acquire()
+        # A slot is free, but the pacing interval has not passed
+        assert not await admission.try_acquire()
+        assert admission.in_flight == 1
+        admission.release()
@@ -0,0 +1,188 @@
+"""Tests for shipping deployment artifacts to local and S3-compatible stores."""
+
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from haymaker_my_workload.artifact_store import (
+    LocalArtifactStore,
+    S3ArtifactStore,
+    artifact_store,
+    upload_agent_dir,
+    validate_artifact_options,
+)
+
+
+class _NoSuchKey(Exception):
+    pass
+
+
+class FakeS3:
+    """In-memory stand-in for the subset of the boto3 S3 client the store uses."""
+
+    exceptions = SimpleNamespace(NoSuchKey=_NoSuchKey)
+
+    def __init__(self, page_size=2):
+        self.objects = {}
+        self.uploads = {}
+        self.aborted = []
+        self.largest_body = 0
+        self.page_size = page_size
+
+    def _body(self, body):
+        self.largest_body = max(self.largest_body, len(body))
+        return bytes(body)
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = self._body(Body)
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId][PartNumber] = self._body(Body)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        self.objects[(Bucket, Key)] = b"".join(parts[n] for n in numbers)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+        self.aborted.append(Key)
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise _NoSuchKey(Key)
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        keys = sorted(k for b, k in self.objects if b == Bucket and k.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start : start + self.page_size]
+        response = {"Contents": [{"Key": k} for k in page]}
+        if start + self.page_size < len(keys):
+            response["IsTruncated"] = True
+            response["NextContinuationToken"] = str(start + self.page_size)
+        return response
+
+
+class _FailingStream(io.BytesIO):
+    def read(self, size=-1):
+        if self.tell() >= 20:
+            raise OSError("disk error")
+        return super().read(size)
+
+
+class TestLocalStore:
+    def test_round_trip(self, tmp_path):
+        store = LocalArtifactStore(tmp_path / "store")
+        assert store.put("dep-1/output/report.txt", io.BytesIO(b"done")) == 4
+        store.put("dep-1/agent.log", io.BytesIO(b"log"))
+        store.put("dep-2/agent.log", io.BytesIO(b"other"))
+
+        with store.open("dep-1/output/report.txt") as f:
+            assert f.read() == b"done"
+        assert list(store.list("dep-1/")) == ["dep-1/agent.log", "dep-1/output/report.txt"]
+        assert store.url.startswith("file://")
+
+    def test_failed_put_leaves_nothing(self, tmp_path):
+        store = LocalArtifactStore(tmp_path)
+        with pytest.raises(OSError):
+            store.put("dep/agent.log", _FailingStream(b"x" * 100))
+        assert list(store.list()) == []
+
+    def test_rejects_escaping_keys(self, tmp_path):
+        store = LocalArtifactStore(tmp_path / "store")
+        for key in ("../outside", "/etc/passwd", ""):
+            with pytest.raises(ValueError):
+                store.put(key, io.BytesIO(b""))
+
+    def test_missing_key(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            LocalArtifactStore(tmp_path).open("nope")
+
+
+class TestS3Store:
+    def test_small_object_single_put(self):
+        client = FakeS3()
+        store = S3ArtifactStore("bucket", "/runs/", client=client, part_size=10)
+        assert store.put("dep/agent.err", io.BytesIO(b"boom")) == 4
+        assert client.objects == {("bucket", "runs/dep/agent.err"): b"boom"}
+        assert store.open("dep/agent.err").read() == b"boom"
+        assert store.url == "s3://bucket/runs/"
+
+    def test_large_object_streams_in_parts(self):
+        client = FakeS3()
+        store = S3ArtifactStore("bucket", client=client, part_size=10)
+        data = bytes(range(256)) * 2
+        assert store.put("dep/output/data.bin", io.BytesIO(data)) == len(data)
+        assert client.objects[("bucket", "dep/output/data.bin")] == data
+        assert client.largest_body == 10
+        assert not client.uploads
+
+    def test_failed_multipart_upload_is_aborted(self):
+        client = FakeS3()
+        store = S3ArtifactStore("bucket", client=client, part_size=10)
+        with pytest.raises(OSError):
+            store.put("dep/agent.log", _FailingStream(b"x" * 100))
+        assert client.aborted == ["dep/agent.log"]
+        assert not client.uploads and not client.objects
+
+    def test_list_follows_continuation(self):
+        client = FakeS3(page_size=2)
+        store = S3ArtifactStore("bucket", "runs", client=client)
+        for i in range(5):
+            store.put(f"dep/f{i}", io.BytesIO(b"x"))
+        store.put("other/f", io.BytesIO(b"x"))
+        assert list(store.list("dep/")) == [f"dep/f{i}" for i in range(5)]
+
+    def test_missing_key(self):
+        store = S3ArtifactStore("bucket", client=FakeS3())
+        with pytest.raises(FileNotFoundError):
+            store.open("nope")
+
+
+class TestUpload:
+    def test_ships_logs_and_outputs_not_bundle(self, tmp_path):
+        agent_dir = tmp_path / "agent"
+        (agent_dir / "output" / "nested").mkdir(parents=True)
+        (agent_dir / "main.py").write_text("print('hi')")
+        (agent_dir / "agent.log").write_text("live\n")
+        (agent_dir / "agent.log.000001.gz").write_bytes(b"segment")
+        (agent_dir / "output" / "nested" / "result.json").write_text("{}")
+        store = LocalArtifactStore(tmp_path / "store")
+
+        stats = upload_agent_dir(agent_dir, store, "dep-1")
+
+        assert stats == {"files": 3, "bytes": 14}
+        assert list(store.list()) == [
+            "dep-1/agent.log",
+            "dep-1/agent.log.000001.gz",
+            "dep-1/output/nested/result.json",
+        ]
+
+    def test_store_from_config(self, tmp_path):
+        assert artifact_store({}) is None
+        local = artifact_store({"artifact_store": str(tmp_path)})
+        assert isinstance(local, LocalArtifactStore) and local.root == tmp_path
+        uri = artifact_store({"artifact_store": tmp_path.as_uri()})
+        assert isinstance(uri, LocalArtifactStore) and uri.root == tmp_path
+
+
+class TestValidation:
+    def test_options(self, tmp_path):
+        assert validate_artifact_options({}) == []
+        assert validate_artifact_options({"artifact_root": "/mnt/nvme"}) == []
+        assert validate_artifact_options({"artifact_store": str(tmp_path)}) == []
+        assert len(validate_artifact_options({"artifact_root": 5})) == 1
+        assert len(validate_artifact_options({"artifact_store": "ftp://host/x"})) == 1
+        assert len(validate_artifact_options({"artifact_store": "s3:///prefix"})) == 1
+        errors = validate_artifact_options(
+            {"artifact_store": str(tmp_path), "artifact_store_endpoint": "http://localhost:9000"}
+        )
+        assert errors == ["artifact_store_endpoint requires an s3:// artifact_store"]
@@ -0,0 +1,105 @@
+"""Tests for the content-addressed bundle store."""
+
+import os
+
+import pytest
+
+from haymaker_my_workload.bundle_store import BundleStore, file_digest
+
+
+def _bundle(path, main="print('hi')\n", config="{}\n"):
+    (path / "skills").mkdir(parents=True)
+    (path / "main.py").write_text(main)
+    (path / "main.py").chmod(0o755)
+    (path / "skills" / "search.md").write_text("# search\n")
+    (path / "config.json").write_text(config)
+    return path
+
+
+class TestDedupe:
+    def test_identical_files_share_an_inode(self, tmp_path):
+        store = BundleStore(tmp_path / "blobs")
+        a = _bundle(tmp_path / "a")
+        b = _bundle(tmp_path / "b", config='{"name": "b"}\n')
+
+        first = store.dedupe(a)
+        second = store.dedupe(b)
+
+        assert first["files"] == 3 and first["shared"] == 0
+        assert second["files"] == 3 and second["shared"] == 2
+        assert os.path.samefile(a / "main.py", b / "main.py")
+        assert os.path.samefile(a / "skills" / "search.md", b / "skills" / "search.md")
+        assert not os.path.samefile(a / "config.json", b / "config.json")
+        assert (b / "config.json").read_text() == '{"name": "b"}\n'
+
+    def test_blobs_are_read_only_and_keep_exec_bit(self, tmp_path):
+        store = BundleStore(tmp_path / "blobs")
+        a = _bundle(tmp_path / "a")
+        store.dedupe(a)
+
+        assert os.access(a / "main.py", os.X_OK)
+        assert not (a / "config.json").stat().st_mode & 0o222
+        blob = store.blob_path(file_digest(a / "main.py"), executable=True)
+        assert os.path.samefile(blob, a / "main.py")
+
+    def test_same_content_different_mode_not_shared(self, tmp_path):
+        store = BundleStore(tmp_path / "blobs")
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        (tmp_path / "a" / "run").write_text("x")
+        (tmp_path / "b" / "run").write_text("x")
+        (tmp_path / "b" / "run").chmod(0o755)
+
+        store.dedupe(tmp_path / "a")
+        stats = store.dedupe(tmp_path / "b")
+
+        assert stats["shared"] == 0
+        assert not os.access(tmp_path / "a" / "run", os.X_OK)
+
+    def test_empty_files_and_symlinks_skipped(self, tmp_path):
+        store = BundleStore(tmp_path / "blobs")
+        agent = tmp_path / "a"
+        agent.mkdir()
+        (agent / "__init__.py").touch()
+        (agent / "target.txt").write_text("data")
+        (agent / "link.txt").symlink_to("target.txt")
+
+        stats = store.dedupe(agent)
+
+        assert stats["files"] == 1
+        assert (agent / "link.txt").is_symlink()
+        assert (agent / "__init__.py").stat().st_nlink == 1
+
+    def test_replacing_a_shared_file_breaks_the_link(self, tmp_path):
+        store = BundleStore(tmp_path / "blobs")
+        a = _bundle(tmp_path / "a")
+        b = _bundle(tmp_path / "b")
+        store.dedupe(a)
+        store.dedupe(b)
+
+        if os.geteuid() != 0:  # root ignores file permissions
+            with pytest.raises(PermissionError):
+                (b / "config.json").write_text("changed")
+        (b / "config.json.new").write_text("changed")
+        os.replace(b / "config.json.new", b / "config.json")
+
+        assert (a / "config.json").read_text() == "{}\n"
+
+
+class TestPrune:
+    def test_removes_only_unreferenced_blobs(self, tmp_path):
+        store = BundleStore(tmp_path / "blobs")
+        a = _bundle(tmp_path / "a")
+        b = _bundle(tmp_path / "b", config='{"name": "b"}\n')
+        store.dedupe(a)
+        store.dedupe(b)
+
+        for path in sorted(b.rglob("*"), reverse=True):
+            path.rmdir() if path.is_dir() else path.unlink()
+        b.rmdir()
+        removed, freed = store.prune()
+
+        assert removed == 1
+        assert freed == len('{"name": "b"}\n')
+        assert (a / "config.json").read_text() == "{}\n"
+        assert store.prune() == (0, 0)
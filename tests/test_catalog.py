@@ -0,0 +1,124 @@
+"""Tests for the SQLite deployment catalog."""
+
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from types import SimpleNamespace
+
+import pytest
+
+from haymaker_my_workload.catalog import DeploymentCatalog, catalog_row
+
+
+class _Status(Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+_BASE = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _state(n, status=_Status.COMPLETED, sdk="claude", goal="goals/a.md", tokens=0, seconds=60):
+    started = _BASE + timedelta(minutes=n)
+    return SimpleNamespace(
+        deployment_id=f"dep-{n}",
+        workload_name="my-workload",
+        status=status,
+        phase=status.value,
+        started_at=started,
+        completed_at=None if status == _Status.RUNNING else started + timedelta(seconds=seconds),
+        stopped_at=None,
+        config={"goal_file": goal, "sdk": sdk},
+        metadata={"sdk": sdk, "goal_hash": goal[-4:], "llm_usage": {"input_tokens": tokens}},
+        error=None,
+    )
+
+
+@pytest.fixture()
+def catalog(tmp_path):
+    catalog = DeploymentCatalog(tmp_path / "catalog.db")
+    yield catalog
+    catalog.close()
+
+
+class TestCatalogRow:
+    def test_flattens_state(self):
+        row = catalog_row(_state(1, tokens=100, seconds=30))
+        assert row["status"] == "completed"
+        assert row["sdk"] == "claude"
+        assert row["input_tokens"] == 100
+        assert row["duration_seconds"] == 30
+        assert row["started_at"] == (_BASE + timedelta(minutes=1)).isoformat()
+
+
+class TestCatalog:
+    def test_uses_wal(self, catalog):
+        assert catalog._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_upsert_replaces_row(self, catalog):
+        state = _state(1, status=_Status.RUNNING)
+        catalog.upsert(state)
+        state.status = _Status.FAILED
+        catalog.upsert(state)
+        rows = catalog.list_deployments()
+        assert [(r["deployment_id"], r["status"]) for r in rows] == [("dep-1", "failed")]
+
+    def test_filter_order_limit(self, catalog):
+        catalog.upsert_many(
+            [
+                _state(1, sdk="claude"),
+                _state(2, sdk="mini", status=_Status.FAILED),
+                _state(3, sdk="mini"),
+                _state(4, sdk="mini", status=_Status.RUNNING),
+            ]
+        )
+        rows = catalog.list_deployments({"sdk": "mini"}, order="-started_at", limit=2)
+        assert [r["deployment_id"] for r in rows] == ["dep-4", "dep-3"]
+
+        rows = catalog.list_deployments({"status": [_Status.FAILED, _Status.RUNNING]}, "started_at")
+        assert [r["deployment_id"] for r in rows] == ["dep-2", "dep-4"]
+
+        rows = catalog.list_deployments({"started_after": _BASE + timedelta(minutes=3)})
+        assert {r["deployment_id"] for r in rows} == {"dep-3", "dep-4"}
+        assert rows[0]["metadata"]["sdk"] == "mini"
+        assert catalog.count({"sdk": "claude"}) == 1
+
+    def test_aggregate(self, catalog):
+        catalog.upsert_many(
+            [
+                _state(1, goal="goals/a.md", tokens=10, seconds=10),
+                _state(2, goal="goals/a.md", tokens=20, seconds=30),
+                _state(3, goal="goals/b.md", tokens=5),
+            ]
+        )
+        groups = catalog.aggregate("goal_file")
+        assert groups[0] == {
+            "key": "goals/a.md",
+            "deployments": 2,
+            "input_tokens": 30,
+            "output_tokens": 0,
+            "avg_duration_seconds": 20.0,
+        }
+
+    def test_rejects_unknown_columns(self, catalog):
+        with pytest.raises(ValueError, match="filter"):
+            catalog.list_deployments({"nope": 1})
+        with pytest.raises(ValueError, match="order"):
+            catalog.list_deployments(order="-nope")
+        with pytest.raises(ValueError, match="group"):
+            catalog.aggregate("error")
+
+    def test_delete(self, catalog):
+        catalog.upsert(_state(1))
+        catalog.delete("dep-1")
+        assert catalog.count() == 0
+
+    def test_updated_after_and_change_token(self, catalog):
+        catalog.upsert(_state(1))
+        token = catalog.change_token()
+        cursor = catalog.list_deployments()[0]["updated_at"]
+
+        catalog.upsert(_state(2))
+        rows = catalog.list_deployments({"updated_after": cursor}, order="updated_at")
+        assert [r["deployment_id"] for r in rows] == ["dep-2"]
+        assert catalog.change_token() != token
@@ -0,0 +1,44 @@
+"""Tests for agent checkpoint helpers."""
+
+from haymaker_my_workload.checkpoint import (
+    load_checkpoint,
+    read_checkpoint,
+    resume_summary,
+    save_checkpoint,
+    write_checkpoint,
+)
+
+
+class TestCheckpointFile:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "checkpoint.json"
+        write_checkpoint(path, {"phases_completed": ["plan"], "conversation": ["hi"]})
+        data = read_checkpoint(path)
+        assert data["conversation"] == ["hi"]
+        assert "saved_at" in data
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_missing_or_corrupt(self, tmp_path):
+        assert read_checkpoint(tmp_path / "nope.json") is None
+        (tmp_path / "bad.json").write_text("{not json")
+        assert read_checkpoint(tmp_path / "bad.json") is None
+
+    def test_summary_keeps_known_keys(self):
+        summary = resume_summary({"phases_completed": ["a"], "turns_used": 3, "conversation": []})
+        assert summary == {"phases_completed": ["a"], "turns_used": 3}
+
+
+class TestAgentSide:
+    def test_only_loads_when_resuming(self, tmp_path, monkeypatch):
+        path = tmp_path / "checkpoint.json"
+        monkeypatch.setenv("HAYMAKER_CHECKPOINT_FILE", str(path))
+        save_checkpoint({"turns_used": 4})
+        assert load_checkpoint() is None
+
+        monkeypatch.setenv("HAYMAKER_RESUME", "1")
+        assert load_checkpoint()["turns_used"] == 4
+
+    def test_noop_without_env(self, monkeypatch):
+        monkeypatch.delenv("HAYMAKER_CHECKPOINT_FILE", raising=False)
+        save_checkpoint({"turns_used": 1})
+        assert load_checkpoint() is None
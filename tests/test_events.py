@@ -0,0 +1,126 @@
+"""Tests for the structured agent event stream."""
+
+import json
+from unittest.mock import patch
+
+from haymaker_my_workload.events import apply_events, emit, log_events, read_events
+
+
+def _write_events(path, *events, partial=""):
+    with open(path, "a") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+        f.write(partial)
+
+
+class TestReadEvents:
+    def test_reads_complete_lines(self, tmp_path):
+        path = tmp_path / "events.jsonl"
+        _write_events(path, {"type": "turn", "turn": 1}, {"type": "tool_call", "tool": "ls"})
+        events, offset = read_events(path)
+        assert [e["type"] for e in events] == ["turn", "tool_call"]
+        assert offset == path.stat().st_size
+
+    def test_resumes_from_offset(self, tmp_path):
+        path = tmp_path / "events.jsonl"
+        _write_events(path, {"type": "turn", "turn": 1})
+        _, offset = read_events(path)
+        _write_events(path, {"type": "turn", "turn": 2})
+        events, _ = read_events(path, offset)
+        assert events == [{"type": "turn", "turn": 2}]
+
+    def test_leaves_partial_line_for_next_read(self, tmp_path):
+        path = tmp_path / "events.jsonl"
+        _write_events(path, {"type": "turn", "turn": 1}, partial='{"type": "tu')
+        events, offset = read_events(path)
+        assert len(events) == 1
+        with open(path, "a") as f:
+            f.write('rn", "turn": 2}\n')
+        events, _ = read_events(path, offset)
+        assert events == [{"type": "turn", "turn": 2}]
+
+    def test_skips_malformed_lines(self, tmp_path):
+        path = tmp_path / "events.jsonl"
+        path.write_text('not json\n{"no_type": 1}\n[1, 2]\n{"type": "turn"}\n')
+        events, _ = read_events(path)
+        assert events == [{"type": "turn"}]
+
+    def test_missing_file(self, tmp_path):
+        assert read_events(tmp_path / "missing.jsonl", 5) == ([], 5)
+
+
+class TestLogEvents:
+    _PHASES = ["Planning", "Implementation", "Testing"]
+
+    def test_phases_and_turns_from_lines(self, tmp_path):
+        path = tmp_path / "agent.log"
+        path.write_text(
+            "Execution plan: 3 phases\n"
+            "--- Turn 1/15 ---\n"
+            "Starting phase: implementation\n"
+            "returned 7 files\n"
+            "TURN 4 of 15\n"
+            "Testing the scanner\n"
+        )
+        events, offset = log_events(path, 0, self._PHASES)
+        assert events == [
+            {"type": "turn", "turn": 1},
+            {"type": "phase_end", "phase": "Planning"},
+            {"type": "phase_start", "phase": "Implementation"},
+            {"type": "turn", "turn": 4},
+        ]
+        assert offset == path.stat().st_size
+
+    def test_resumes_from_offset_and_waits_for_line_end(self, tmp_path):
+        path = tmp_path / "agent.log"
+        path.write_text("Turn 1\nTurn 2")
+        events, offset = log_events(path)
+        assert events == [{"type": "turn", "turn": 1}]
+        with open(path, "a") as f:
+            f.write("\n")
+        assert log_events(path, offset)[0] == [{"type": "turn", "turn": 2}]
+        assert log_events(tmp_path / "missing.log", 3) == ([], 3)
+
+
+class TestApplyEvents:
+    def test_tracks_phases_turns_and_tools(self):
+        progress = {}
+        apply_events(
+            progress,
+            [
+                {"type": "phase_start", "phase": "plan"},
+                {"type": "turn", "turn": 1},
+                {"type": "tool_call", "tool": "read"},
+                {"type": "phase_end", "phase": "plan"},
+                {"type": "phase_start", "phase": "build"},
+                {"type": "turn"},
+            ],
+        )
+        assert progress["current_phase"] == "build"
+        assert progress["phases_completed"] == ["plan"]
+        assert progress["turns_used"] == 2
+        assert progress["tool_calls"] == 1
+
+    def test_records_outcome(self):
+        progress = {}
+        apply_events(progress, [{"type": "outcome", "status": "failed", "error": "429"}])
+        assert progress["outcome"] == {"status": "failed", "error": "429"}
+
+    def test_ignores_unknown_outcome_status(self):
+        progress = {}
+        apply_events(progress, [{"type": "outcome", "status": "maybe"}])
+        assert "outcome" not in progress
+
+
+class TestEmit:
+    def test_writes_to_events_file(self, tmp_path):
+        path = tmp_path / "events.jsonl"
+        with patch.dict("os.environ", {"HAYMAKER_EVENTS_FILE": str(path)}, clear=True):
+            emit("phase_start", phase="plan")
+        events, _ = read_events(path)
+        assert events[0]["type"] == "phase_start"
+        assert events[0]["phase"] == "plan"
+
+    def test_noop_without_stream(self):
+        with patch.dict("os.environ", {}, clear=True):
+            emit("turn", turn=1)
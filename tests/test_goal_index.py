@@ -0,0 +1,124 @@
+"""Tests for the goal file index."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from haymaker_my_workload.goal_index import GoalIndex, goal_dirs, parse_goal
+
+_GOAL = """\
+# Collect Metrics
+
+## Goal
+Collect CPU samples.
+
+## Constraints
+- Standard library only
+
+## Success Criteria
+- 10 samples written
+"""
+
+
+@pytest.fixture()
+def reads(monkeypatch):
+    """Paths whose content the index read."""
+    seen = []
+    read_bytes = Path.read_bytes
+
+    def counting(self):
+        seen.append(self.name)
+        return read_bytes(self)
+
+    monkeypatch.setattr(Path, "read_bytes", counting)
+    return seen
+
+
+def _library(tmp_path, n=3):
+    goals = tmp_path / "goals"
+    (goals / "team").mkdir(parents=True)
+    for i in range(n):
+        (goals / f"goal-{i}.md").write_text(_GOAL.replace("Metrics", f"Metrics {i}"))
+    (goals / "team" / "shared.md").write_text(_GOAL)
+    (goals / "notes.json").write_text("{}")
+    return goals
+
+
+class TestParseGoal:
+    def test_sections(self):
+        goal = parse_goal(_GOAL)
+        assert goal["title"] == "Collect Metrics"
+        assert goal["sections"]["Goal"] == "Collect CPU samples."
+        assert goal["sections"]["Success Criteria"] == "- 10 samples written"
+        assert goal["missing_sections"] == []
+
+    def test_missing_and_empty_sections(self):
+        goal = parse_goal("# Loose goal\n\nDo things.\n\n## goal\nStuff\n\n## Constraints\n")
+        assert goal["missing_sections"] == ["Constraints", "Success Criteria"]
+
+
+class TestGoalIndex:
+    def test_refresh_reads_only_changed_files(self, tmp_path, reads):
+        goals = _library(tmp_path)
+        index = GoalIndex(tmp_path / "index.json")
+
+        entries = index.refresh([goals])
+        assert [Path(e["path"]).name for e in entries] == [
+            "goal-0.md",
+            "goal-1.md",
+            "goal-2.md",
+            "shared.md",
+        ]
+        assert entries[3]["hash"] == hashlib.sha256(_GOAL.encode()).hexdigest()
+        assert len(reads) == 4
+
+        reads.clear()
+        (goals / "goal-1.md").write_text(_GOAL + "\nMore detail.\n")
+        entries = index.refresh([goals])
+        assert reads == ["goal-1.md"]
+        assert entries[1]["sections"]["Success Criteria"].endswith("More detail.")
+
+    def test_cache_survives_restart(self, tmp_path, reads):
+        goals = _library(tmp_path)
+        index = GoalIndex(tmp_path / "index.json")
+        index.refresh([goals])
+        index.save()
+
+        reads.clear()
+        reloaded = GoalIndex(tmp_path / "index.json")
+        assert len(reloaded.refresh([goals])) == 4
+        assert reads == []
+
+    def test_removed_files_are_dropped(self, tmp_path):
+        goals = _library(tmp_path)
+        index = GoalIndex()
+        index.refresh([goals])
+        (goals / "goal-0.md").unlink()
+        assert len(index.refresh([goals])) == 3
+        assert str(goals.absolute() / "goal-0.md") not in index._entries
+
+    def test_get_single_goal(self, tmp_path, reads):
+        goals = _library(tmp_path)
+        index = GoalIndex()
+        first = index.get(goals / "goal-2.md")
+        assert first["title"] == "Collect Metrics 2"
+        assert index.get(goals / "goal-2.md") is first
+        assert reads == ["goal-2.md"]
+        with pytest.raises(FileNotFoundError):
+            index.get(goals / "missing.md")
+
+    def test_corrupt_cache_is_rebuilt(self, tmp_path):
+        goals = _library(tmp_path)
+        (tmp_path / "index.json").write_text("{not json")
+        index = GoalIndex(tmp_path / "index.json")
+        assert len(index.refresh([goals])) == 4
+        index.save()
+        assert GoalIndex(tmp_path / "index.json")._entries
+
+
+def test_goal_dirs_from_environment(monkeypatch):
+    monkeypatch.setenv("HAYMAKER_GOAL_DIRS", os.pathsep.join(["/srv/goals", "/opt/goals"]))
+    assert goal_dirs() == [Path("goals"), Path("/srv/goals"), Path("/opt/goals")]
+    assert goal_dirs([Path("mine")]) == [Path("mine")]
@@ -0,0 +1,158 @@
+"""Tests for parameterized goal templates."""
+
+import json
+import os
+
+import pytest
+
+from haymaker_my_workload.goal_templates import (
+    BundleTemplate,
+    iter_param_rows,
+    marker_goal,
+    render_goal,
+    template_fields,
+)
+
+_TEMPLATE = """\
+# Organize {target_dir}
+
+## Goal
+Sort the files in {target_dir} and summarize {dataset}.
+
+## Constraints
+- Write results as {"dataset": "..."} JSON
+"""
+
+
+class TestTemplateText:
+    def test_fields_ignore_other_braces(self):
+        assert template_fields(_TEMPLATE) == ["target_dir", "dataset"]
+
+    def test_render(self):
+        text = render_goal(_TEMPLATE, {"target_dir": "/data/a", "dataset": "sales", "extra": "x"})
+        assert text.startswith("# Organize /data/a\n")
+        assert '{"dataset": "..."}' in text
+
+    def test_render_missing(self):
+        with pytest.raises(ValueError, match="dataset"):
+            render_goal(_TEMPLATE, {"target_dir": "/data/a"})
+
+    def test_markers(self):
+        assert marker_goal("In {target_dir} only").split()[1] == "@@target_dir@@"
+
+
+class TestRows:
+    def test_csv(self, tmp_path):
+        path = tmp_path / "rows.csv"
+        path.write_text("target_dir,dataset\n/data/a,sales\n/data/b,\n")
+        assert list(iter_param_rows(path)) == [
+            {"target_dir": "/data/a", "dataset": "sales"},
+            {"target_dir": "/data/b", "dataset": ""},
+        ]
+
+    def test_jsonl(self, tmp_path):
+        path = tmp_path / "rows.jsonl"
+        path.write_text('{"target_dir": "/data/a", "limit": 5}\n\n{"target_dir": "/data/b"}\n')
+        assert list(iter_param_rows(path)) == [
+            {"target_dir": "/data/a", "limit": "5"},
+            {"target_dir": "/data/b"},
+        ]
+
+    def test_rows_are_streamed(self, tmp_path):
+        path = tmp_path / "rows.jsonl"
+        path.write_text('{"a": "1"}\n[1, 2]\n')
+        rows = iter_param_rows(path)
+        assert next(rows) == {"a": "1"}
+        with pytest.raises(ValueError, match="rows.jsonl:2"):
+            next(rows)
+
+
+class TestBundleTemplate:
+    def _bundle(self, tmp_path):
+        root = tmp_path / "template"
+        agent_dir = root / "agent"
+        (agent_dir / "skills").mkdir(parents=True)
+        (agent_dir / "prompt.md").write_text(marker_goal(_TEMPLATE))
+        (agent_dir / "main.py").write_text('GOAL = "Sort @@target_dir@@"\n')
+        (agent_dir / "skills" / "sort.md").write_text("Sort things\n")
+        (agent_dir / "icon.bin").write_bytes(b"\xff\xfe@@target_dir@@")
+        os.chmod(agent_dir / "main.py", 0o755)
+        return BundleTemplate(root, agent_dir)
+
+    def test_only_marked_files_are_templated(self, tmp_path):
+        bundle = self._bundle(tmp_path)
+        assert sorted(p.name for p in bundle.templated) == ["main.py", "prompt.md"]
+
+    def test_render_substitutes_and_copies(self, tmp_path):
+        bundle = self._bundle(tmp_path)
+        params = {"target_dir": 'C:\\data "a"', "dataset": "sales"}
+
+        agent_dir = bundle.render(tmp_path / "rows" / "dep-1", params)
+
+        assert agent_dir == tmp_path / "rows" / "dep-1" / "agent"
+        prompt = (agent_dir / "prompt.md").read_text()
+        assert prompt == render_goal(_TEMPLATE, params)
+        namespace = {}
+        exec((agent_dir / "main.py").read_text(), namespace)
+        assert namespace["GOAL"] == 'Sort C:\\data "a"'
+        assert os.access(agent_dir / "main.py", os.X_OK)
+        # Unchanged files are copies: one row rewriting its bundle leaves the others alone
+        copied = agent_dir / "skills" / "sort.md"
+        original = bundle.root / "agent" / "skills" / "sort.md"
+        assert copied.stat().st_ino != original.stat().st_ino
+        copied.write_text("rewritten by the agent\n")
+        assert original.read_text() != "rewritten by the agent\n"
+        assert (agent_dir / "icon.bin").read_bytes() == b"\xff\xfe@@target_dir@@"
+
+    def test_json_values_escaped(self, tmp_path):
+        root = tmp_path / "template"
+        root.mkdir()
+        (root / "agent_config.json").write_text('{"goal": "Sort @@target_dir@@"}')
+        bundle = BundleTemplate(root, root)
+        bundle.render(tmp_path / "out", {"target_dir": 'a "b"\nc'})
+        assert json.loads((tmp_path / "out" / "agent_config.json").read_text()) == {
+            "goal": 'Sort a "b"\nc'
+        }
+
+    def test_python_values_escaped_per_literal(self, tmp_path):
+        root = tmp_path / "template"
+        root.mkdir()
+        (root / "main.py").write_text(
+            "# Works on @@v@@\n"
+            "SINGLE = 'in @@v@@'\n"
+            "TRIPLE = '''@@v@@'''\n"
+            "FMT = f'{{@@v@@}} {len(SINGLE)}'\n"
+            "RAW = r'@@v@@'\n"
+            "DATA = b'@@v@@'\n"
+        )
+        bundle = BundleTemplate(root, root)
+        value = 'it\'s "q" {x} C:\\d\nnext'
+
+        with pytest.raises(ValueError, match="raw string literal"):
+            bundle.render(tmp_path / "bad", {"v": value})
+        assert not (tmp_path / "bad").exists()
+
+        plain = "a {b} c"
+        bundle.render(tmp_path / "ok", {"v": plain})
+        namespace = {}
+        exec((tmp_path / "ok" / "main.py").read_text(), namespace)
+        assert namespace["FMT"] == "{a {b} c} 10"
+        assert (namespace["RAW"], namespace["DATA"]) == (plain, plain.encode())
+
+        (root / "main.py").write_text(
+            "# Works on @@v@@\nSINGLE = 'in @@v@@'\nTRIPLE = '''@@v@@'''\nFMT = f'{{@@v@@}}'\n"
+        )
+        BundleTemplate(root, root).render(tmp_path / "quoted", {"v": value})
+        namespace = {}
+        exec((tmp_path / "quoted" / "main.py").read_text(), namespace)
+        assert namespace["SINGLE"] == "in " + value
+        assert namespace["TRIPLE"] == value
+        assert namespace["FMT"] == "{" + value + "}"
+
+    def test_marker_in_code_rejected(self, tmp_path):
+        (tmp_path / "main.py").write_text("LIMIT = @@limit@@\n")
+        with pytest.raises(ValueError, match="main.py: marker @@limit@@ is outside"):
+            BundleTemplate(tmp_path, tmp_path)
+
+    def test_fields(self, tmp_path):
+        assert self._bundle(tmp_path).fields == {"target_dir", "dataset"}
@@ -0,0 +1,140 @@
+"""Tests for the LLM record/replay cache and its agent shim."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from haymaker_my_workload.llm_cache import (
+    LLMCache,
+    LLMCacheMiss,
+    cache_env,
+    cached_call,
+    request_key,
+)
+
+# Minimal stand-in for an LLM client library, importable by the agent process
+_FAKE_CLIENT = """
+import os
+
+class Response:
+    def __init__(self, text, usage=None):
+        self.text = text
+        self.usage = usage
+
+    def model_dump(self, mode="python"):
+        return {"text": self.text}
+
+    @classmethod
+    def model_validate(cls, data):
+        return cls(data["text"])
+
+def completion(**kwargs):
+    with open(os.environ["CALLS_FILE"], "a") as f:
+        f.write("call\\n")
+    return Response("answer to " + kwargs["messages"][0]["content"])
+"""
+
+_AGENT = """
+import sys
+assert "litellm" not in sys.modules, "client imported before the agent asked for it"
+import litellm
+print(litellm.completion(model="m", messages=[{"role": "user", "content": "hi"}]).text)
+"""
+
+
+class TestRequestKey:
+    def test_ignores_whitespace_and_transport_params(self):
+        a = request_key("p", {"model": "m", "prompt": "hello  \r\nworld\n", "timeout": 5})
+        b = request_key("p", {"prompt": "hello\nworld", "model": "m"})
+        assert a == b
+
+    def test_distinguishes_model_and_params(self):
+        base = {"model": "m", "prompt": "x"}
+        assert request_key("p", base) != request_key("p", {**base, "model": "n"})
+        assert request_key("p", base) != request_key("p", {**base, "temperature": 0.5})
+
+
+class TestLLMCache:
+    def test_put_get_roundtrip(self, tmp_path):
+        cache = LLMCache(tmp_path)
+        cache.put("abcd", {"response": 1})
+        assert cache.get("abcd") == {"response": 1}
+        assert cache.get("ffff") is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = LLMCache(tmp_path, max_bytes=10_000)
+        payload = {"response": "x" * 3000}
+        for key in ("aa1", "bb2", "cc3"):
+            cache.put(key, payload)
+            os.utime(cache._path(key), (0, {"aa1": 1, "bb2": 2, "cc3": 3}[key]))
+        cache.get("aa1")  # refresh: aa1 is now most recent
+        cache.put("dd4", payload)
+
+        assert cache.get("bb2") is None
+        assert cache.get("aa1") is not None
+        assert cache.size() <= 10_000
+
+
+class TestCachedCall:
+    @staticmethod
+    def _call(cache, mode, calls):
+        def call():
+            calls.append(1)
+            return {"text": "live"}
+
+        return cached_call(cache, mode, "p", {"model": "m"}, call, dict, dict)
+
+    def test_read_through_calls_once(self, tmp_path):
+        cache, calls = LLMCache(tmp_path), []
+        assert self._call(cache, "read_through", calls) == ({"text": "live"}, False)
+        assert self._call(cache, "read_through", calls) == ({"text": "live"}, True)
+        assert len(calls) == 1
+
+    def test_record_always_calls(self, tmp_path):
+        cache, calls = LLMCache(tmp_path), []
+        self._call(cache, "record", calls)
+        self._call(cache, "record", calls)
+        assert len(calls) == 2
+
+    def test_replay_miss_raises(self, tmp_path):
+        with pytest.raises(LLMCacheMiss):
+            self._call(LLMCache(tmp_path), "replay", [])
+
+
+class TestShim:
+    def _run_agent(self, tmp_path, mode, extra_path=None):
+        (tmp_path / "litellm.py").write_text(_FAKE_CLIENT)
+        (tmp_path / "main.py").write_text(_AGENT)
+        env = {**os.environ, **cache_env(tmp_path / "cache", mode)}
+        env["PYTHONPATH"] = os.pathsep.join(
+            p for p in (env["PYTHONPATH"], extra_path, str(tmp_path)) if p
+        )
+        env["CALLS_FILE"] = str(tmp_path / "calls")
+        env["HAYMAKER_EVENTS_FILE"] = str(tmp_path / "events.jsonl")
+        result = subprocess.run(
+            [sys.executable, "main.py"], cwd=tmp_path, env=env, capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+        return result.stdout.strip()
+
+    def test_record_then_replay(self, tmp_path):
+        assert self._run_agent(tmp_path, "record") == "answer to hi"
+        assert self._run_agent(tmp_path, "replay") == "answer to hi"
+
+        assert (tmp_path / "calls").read_text().count("call") == 1
+        events = [json.loads(line) for line in (tmp_path / "events.jsonl").read_text().splitlines()]
+        assert [e["cache_hit"] for e in events] == [False, True]
+
+    def test_shadowed_sitecustomize_still_runs(self, tmp_path):
+        site_dir = tmp_path / "venv-site"
+        site_dir.mkdir()
+        (site_dir / "sitecustomize.py").write_text(
+            "import os, pathlib\npathlib.Path(os.environ['CALLS_FILE'] + '.site').touch()\n"
+        )
+
+        assert self._run_agent(tmp_path, "record", extra_path=str(site_dir)) == "answer to hi"
+        assert (tmp_path / "calls.site").exists()
+        assert (tmp_path / "calls").read_text().count("call") == 1
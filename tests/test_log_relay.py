@@ -0,0 +1,146 @@
+"""Tests for agent log rotation through the relay process."""
+
+import gzip
+import os
+import subprocess
+
+from haymaker_my_workload.log_relay import (
+    RotatingLog,
+    iter_lines,
+    log_segments,
+    log_size,
+    read_last_line,
+    relay_command,
+    tail_lines,
+    validate_log_options,
+)
+
+
+def _lines(n, start=0):
+    return b"".join(f"line {i:04d}\n".encode() for i in range(start, start + n))
+
+
+class TestRotatingLog:
+    def test_rotates_at_line_boundaries_and_compresses(self, tmp_path):
+        path = tmp_path / "agent.log"
+        log = RotatingLog(path, max_bytes=100, compression="gzip", append=False)
+        for i in range(0, 50, 5):
+            log.write(_lines(5, i))
+        log.close()
+
+        segments = log_segments(path)
+        assert segments[-1] == path
+        assert all(s.suffix == ".gz" for s in segments[:-1])
+        assert len(segments) > 3
+        for segment in segments[:-1]:
+            content = gzip.decompress(segment.read_bytes())
+            assert len(content) <= 100
+            assert content.endswith(b"\n")
+        assert "".join(iter_lines(path)).encode() == _lines(50)
+
+    def test_append_continues_numbering(self, tmp_path):
+        path = tmp_path / "agent.log"
+        log = RotatingLog(path, max_bytes=100, compression="gzip", append=False)
+        log.write(_lines(20))
+        log.close()
+        before = len(log_segments(path))
+
+        log = RotatingLog(path, max_bytes=100, compression="gzip", append=True)
+        log.write(_lines(20, 20))
+        log.close()
+
+        assert len(log_segments(path)) > before
+        assert "".join(iter_lines(path)).encode() == _lines(40)
+
+    def test_truncate_removes_old_segments(self, tmp_path):
+        path = tmp_path / "agent.log"
+        log = RotatingLog(path, max_bytes=100, compression="gzip", append=False)
+        log.write(_lines(20))
+        log.close()
+
+        RotatingLog(path, max_bytes=100, compression="gzip", append=False).close()
+
+        assert log_segments(path) == [path]
+        assert path.read_bytes() == b""
+
+    def test_overlong_line_kept_whole(self, tmp_path):
+        path = tmp_path / "agent.log"
+        log = RotatingLog(path, max_bytes=10, compression="gzip", append=False)
+        log.write(b"a" * 30 + b"\nshort\n")
+        log.close()
+        assert list(iter_lines(path)) == ["a" * 30 + "\n", "short\n"]
+
+
+class TestReaders:
+    def _rotated(self, tmp_path, n=50):
+        path = tmp_path / "agent.log"
+        log = RotatingLog(path, max_bytes=100, compression="gzip", append=False)
+        log.write(_lines(n))
+        log.close()
+        return path
+
+    def test_tail_reads_back_across_segments(self, tmp_path):
+        path = self._rotated(tmp_path)
+        tail = tail_lines(path, 20)
+        assert "".join(tail).encode() == _lines(20, 30)
+        assert len(tail_lines(path, 1000)) == 50
+        assert tail_lines(path, 0) == []
+
+    def test_last_line_skips_empty_live_file(self, tmp_path):
+        path = tmp_path / "agent.log"
+        log = RotatingLog(path, max_bytes=100, compression="gzip", append=False)
+        log.write(_lines(9))  # exactly 90 bytes, then rotation on the next write
+        log.write(b"goal achieved\n" * 8)
+        log.close()
+        path.write_text("")
+
+        assert read_last_line(path) == "goal achieved"
+
+    def test_uncompressed_segment_preferred_while_compressing(self, tmp_path):
+        path = tmp_path / "agent.log"
+        (tmp_path / "agent.log.000001").write_text("one\n")
+        (tmp_path / "agent.log.000001.gz").write_bytes(gzip.compress(b"one\n"))
+        (tmp_path / "agent.log.000001.gz.tmp").write_text("partial")
+        path.write_text("two\n")
+
+        assert log_segments(path) == [tmp_path / "agent.log.000001", path]
+        assert list(iter_lines(path)) == ["one\n", "two\n"]
+        assert log_size(path) == 8
+
+    def test_unrotated_log(self, tmp_path):
+        path = tmp_path / "agent.log"
+        path.write_text("a\nb\n")
+        assert tail_lines(path, 1) == ["b\n"]
+        assert read_last_line(tmp_path / "missing.log") is None
+
+
+class TestRelayProcess:
+    def test_relays_stdout_and_stderr(self, tmp_path):
+        out_read, out_write = os.pipe()
+        err_read, err_write = os.pipe()
+        rotation = {"max_bytes": 100, "compression": "gzip"}
+        streams = [
+            (out_read, tmp_path / "agent.log", False),
+            (err_read, tmp_path / "agent.err", False),
+        ]
+        relay = subprocess.Popen(relay_command(rotation, streams), pass_fds=(out_read, err_read))
+        os.close(out_read)
+        os.close(err_read)
+
+        os.write(out_write, _lines(30))
+        os.write(err_write, b"Traceback\nRuntimeError: boom\n")
+        os.close(out_write)
+        os.close(err_write)
+        assert relay.wait(timeout=10) == 0
+
+        assert "".join(iter_lines(tmp_path / "agent.log")).encode() == _lines(30)
+        assert read_last_line(tmp_path / "agent.err") == "RuntimeError: boom"
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class TestValidation:
+    def test_options(self):
+        assert validate_log_options({}) == []
+        assert validate_log_options({"log_max_bytes": 1 << 20, "log_compression": "gzip"}) == []
+        errors = validate_log_options({"log_max_bytes": 10, "log_compression": "lz4"})
+        assert len(errors) == 2
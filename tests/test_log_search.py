@@ -0,0 +1,101 @@
+"""Tests for the log time index and time-bounded log search."""
+
+import gzip
+import os
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from haymaker_my_workload import log_relay
+from haymaker_my_workload.log_relay import RotatingLog, log_segments, read_index, read_lines_at
+from haymaker_my_workload.log_search import search_log
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    """Controllable wall clock for the relay's index entries."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(log_relay, "time", SimpleNamespace(time=lambda: now.value))
+    monkeypatch.setattr(log_relay, "_MIN_MEMBER_BYTES", 64)
+    return now
+
+
+def _write_timeline(path, clock, seconds=100, max_bytes=400):
+    """One line per second from t=1000; every tenth line is an error."""
+    log = RotatingLog(path, max_bytes=max_bytes, compression="gzip", append=False)
+    for t in range(1000, 1000 + seconds):
+        clock.value = float(t)
+        kind = "ERROR" if t % 10 == 0 else "info"
+        log.write(f"t={t} {kind} step\n".encode())
+    log.close()
+    # The live segment ends at its mtime; keep it on the fake clock
+    os.utime(path, (clock.value, clock.value))
+
+
+class TestIndex:
+    def test_entries_follow_writes_into_segments(self, tmp_path, clock):
+        path = tmp_path / "agent.log"
+        _write_timeline(path, clock)
+
+        segments = log_segments(path)
+        assert len(segments) > 3
+        first = read_index(segments[0])
+        assert first[0][:2] == (1000.0, 0)
+        assert all(len(entry) == 4 for entry in first)
+        assert all(len(entry) == 2 for entry in read_index(path))
+
+    def test_entries_wait_for_a_line_start(self, tmp_path, clock):
+        path = tmp_path / "agent.log"
+        log = RotatingLog(path, max_bytes=1 << 20, compression="gzip", append=False)
+        log.write(b"partial")
+        clock.value += 5
+        log.write(b" line\nnext line\n")
+        log.close()
+        assert read_index(path) == [(1000.0, 0), (1005.0, 13)]
+
+    def test_compressed_segment_is_seekable_by_member(self, tmp_path, clock):
+        path = tmp_path / "agent.log"
+        _write_timeline(path, clock)
+        segment = log_segments(path)[0]
+        raw = gzip.decompress(segment.read_bytes())
+        index = read_index(segment)
+
+        assert len({entry[2] for entry in index}) > 1
+        entry = index[-1]
+        lines = list(read_lines_at(segment, entry))
+        assert lines[0] == (entry[1], raw[entry[1] :].split(b"\n")[0] + b"\n")
+        assert b"".join(line for _, line in lines) == raw[entry[1] :]
+
+
+class TestSearchLog:
+    def _matches(self, path, pattern, since=None, until=None):
+        regex = re.compile(pattern)
+        return [m for batch in search_log(path, regex, since, until) for m in batch]
+
+    def test_full_search_across_segments(self, tmp_path, clock):
+        path = tmp_path / "agent.log"
+        _write_timeline(path, clock)
+        matches = self._matches(path, "ERROR")
+        assert [m["line"] for m in matches] == [f"t={t} ERROR step" for t in range(1000, 1100, 10)]
+        assert matches[3]["time"].timestamp() == 1030.0
+
+    def test_time_window(self, tmp_path, clock):
+        path = tmp_path / "agent.log"
+        _write_timeline(path, clock)
+        matches = self._matches(path, r"t=\d+", since=1050.0, until=1060.0)
+        times = [int(m["line"].split()[0][2:]) for m in matches]
+        # Each line is only known to be written within its index block
+        assert set(range(1050, 1061)) <= set(times) <= set(range(1049, 1061))
+
+    def test_window_outside_log(self, tmp_path, clock):
+        path = tmp_path / "agent.log"
+        _write_timeline(path, clock)
+        assert self._matches(path, ".", since=5000.0) == []
+        assert self._matches(path, ".", until=10.0) == []
+
+    def test_unindexed_log_is_scanned(self, tmp_path):
+        path = tmp_path / "agent.log"
+        path.write_text("one\nERROR two\nthree\n")
+        matches = self._matches(path, "ERROR")
+        assert matches == [{"segment": "agent.log", "offset": 4, "time": None, "line": "ERROR two"}]
@@ -0,0 +1,84 @@
+"""Tests for matrix grid expansion and comparison reports."""
+
+import os
+
+from agent_haymaker.workloads.models import DeploymentState, DeploymentStatus
+
+from haymaker_my_workload.matrix import (
+    build_report,
+    expand_grid,
+    format_report,
+    launch_failure_result,
+    read_peak_rss_mb,
+    variant_result,
+)
+
+
+def _state(deployment_id, status, turns=None, tokens=0):
+    metadata = {}
+    if tokens is not None:
+        metadata["llm_usage"] = {"input_tokens": tokens, "output_tokens": 0, "calls": 1}
+    if turns is not None:
+        metadata["agent_progress"] = {"turns_used": turns}
+    return DeploymentState(
+        deployment_id=deployment_id,
+        workload_name="my-workload",
+        status=status,
+        phase="done",
+        metadata=metadata,
+    )
+
+
+class TestExpandGrid:
+    def test_cartesian_product(self):
+        variants = expand_grid(["claude", "mini"], [5, 10], [False, True])
+        assert len(variants) == 8
+        assert variants[0] == {"sdk": "claude", "max_turns": 5, "enable_memory": False}
+
+
+class TestReport:
+    def test_picks_fastest_and_cheapest_success(self):
+        v = {"sdk": "claude", "max_turns": 5, "enable_memory": False}
+        results = [
+            variant_result(v, _state("slow-cheap", DeploymentStatus.COMPLETED, 3, 100), 50, None),
+            variant_result(v, _state("fast-dear", DeploymentStatus.COMPLETED, 2, 900), 10, 120.0),
+            variant_result(v, _state("broken", DeploymentStatus.FAILED, 1, 1), 1, None),
+            launch_failure_result(v, "no credentials", 0.1),
+        ]
+        report = build_report("goals/x.md", results)
+
+        assert report["fastest"] == "fast-dear"
+        assert report["cheapest"] == "slow-cheap"
+        assert report["succeeded"] == 2
+        assert report["failed"] == 2
+        assert report["variants"][0]["deployment_id"] == "fast-dear"
+        assert "goals/x.md" in format_report(report)
+
+    def test_unmetered_variant_is_never_cheapest(self):
+        v = {"sdk": "claude", "max_turns": 5, "enable_memory": False}
+        results = [
+            variant_result(v, _state("cli-agent", DeploymentStatus.COMPLETED, 3, None), 5, None),
+            variant_result(v, _state("metered", DeploymentStatus.COMPLETED, 3, 500), 9, None),
+        ]
+        report = build_report("g.md", results)
+
+        assert results[0]["input_tokens"] is None
+        assert results[0]["llm_calls"] is None
+        assert report["cheapest"] == "metered"
+        assert report["fastest"] == "cli-agent"
+        assert "-" in format_report(report).splitlines()[3]
+
+    def test_no_successes(self):
+        report = build_report("g.md", [launch_failure_result({"sdk": "mini"}, "boom", 0)])
+        assert report["fastest"] is None
+        assert report["cheapest"] is None
+
+
+class TestPeakRss:
+    def test_reads_own_process(self):
+        if not os.path.exists("/proc/self/status"):
+            return
+        assert read_peak_rss_mb(os.getpid()) > 0
+
+    def test_missing_process(self):
+        assert read_peak_rss_mb(2**22 + 12345) is None
@@ -0,0 +1,57 @@
+"""Tests for LLM usage metering."""
+
+from haymaker_my_workload.metering import latency_percentiles, merge_usage, record_llm_calls
+
+
+def _call(**fields):
+    return {"type": "llm_call", **fields}
+
+
+class TestRecordLlmCalls:
+    def test_counts_tokens_and_cache_hits(self):
+        usage = {}
+        recorded = record_llm_calls(
+            usage,
+            [
+                _call(model="m", input_tokens=100, output_tokens=10, latency_ms=500),
+                _call(model="m", input_tokens=50, cache_hit=True, cache_read_tokens=40),
+                {"type": "turn", "turn": 1},
+            ],
+        )
+        assert recorded
+        assert usage["calls"] == 2
+        assert usage["input_tokens"] == 150
+        assert usage["output_tokens"] == 10
+        assert usage["cache_hits"] == 1
+        assert usage["cache_read_tokens"] == 40
+        assert usage["models"] == {"m": 2}
+        assert usage["latency_max_ms"] == 500
+
+    def test_ignores_other_events(self):
+        usage = {}
+        assert not record_llm_calls(usage, [{"type": "turn"}])
+        assert "calls" not in usage
+
+    def test_percentiles_within_bucket_precision(self):
+        usage = {}
+        record_llm_calls(usage, [_call(latency_ms=ms) for ms in range(1, 1001)])
+        p50 = usage["latency_ms"]["p50"]
+        p99 = usage["latency_ms"]["p99"]
+        assert 500 <= p50 <= 500 * 1.25
+        assert 990 <= p99 <= 990 * 1.25
+
+
+class TestMergeUsage:
+    def test_merges_counters_and_histograms(self):
+        a, b = {}, {}
+        record_llm_calls(a, [_call(input_tokens=10, latency_ms=100)])
+        record_llm_calls(b, [_call(input_tokens=5, latency_ms=2000) for _ in range(3)])
+        merged = merge_usage([a, b])
+        assert merged["calls"] == 4
+        assert merged["input_tokens"] == 25
+        assert merged["latency_max_ms"] == 2000
+        assert merged["latency_ms"]["p50"] >= 2000
+
+    def test_empty(self):
+        assert merge_usage([])["calls"] == 0
+        assert latency_percentiles({}) == {}
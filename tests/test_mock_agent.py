@@ -0,0 +1,95 @@
+"""Tests for the offline synthetic agent runtime (sdk=mock)."""
+
+import json
+import os
+import subprocess
+import sys
+
+from haymaker_my_workload.mock_agent import validate_mock_options, write_mock_bundle
+
+
+def _run(agent_dir, tmp_path, **extra_env):
+    events_path = tmp_path / "events.jsonl"
+    events_path.unlink(missing_ok=True)
+    fd = os.open(events_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+    try:
+        result = subprocess.run(
+            [sys.executable, "main.py"],
+            cwd=agent_dir,
+            env={**os.environ, "HAYMAKER_EVENTS_FD": str(fd), **extra_env},
+            pass_fds=(fd,),
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    finally:
+        os.close(fd)
+    events = [json.loads(line) for line in events_path.read_text().splitlines()]
+    return result, events
+
+
+class TestValidateMockOptions:
+    def test_defaults_valid(self):
+        assert validate_mock_options({}) == []
+
+    def test_rejects_bad_values(self):
+        errors = validate_mock_options(
+            {"mock_turns": 0, "mock_turn_seconds": "fast", "mock_exit_code": 300}
+        )
+        assert any("mock_turns" in e for e in errors)
+        assert any("mock_turn_seconds" in e for e in errors)
+        assert any("mock_exit_code" in e for e in errors)
+
+    def test_accepts_int_for_float_option(self):
+        assert validate_mock_options({"mock_turn_seconds": 2}) == []
+
+    def test_seed_must_be_an_integer(self):
+        assert validate_mock_options({"mock_seed": 7}) == []
+        for seed in ("7", 1.5, True):
+            assert validate_mock_options({"mock_seed": seed}) == ["mock_seed must be an integer"]
+
+
+class TestMockAgent:
+    def test_runs_configured_turns_and_succeeds(self, tmp_path):
+        agent_dir = write_mock_bundle(
+            tmp_path / "agent",
+            {"mock_turns": 4, "mock_turn_seconds": 0, "mock_log_lines_per_turn": 2},
+        )
+        result, events = _run(agent_dir, tmp_path)
+
+        assert result.returncode == 0
+        assert result.stdout.count("[MOCK] turn") == 8
+        assert [e["turn"] for e in events if e["type"] == "turn"] == [1, 2, 3, 4]
+        assert sum(e["type"] == "llm_call" for e in events) == 4
+        assert events[-1] == {**events[-1], "type": "outcome", "status": "completed"}
+        starts = [e["phase"] for e in events if e["type"] == "phase_start"]
+        ends = [e["phase"] for e in events if e["type"] == "phase_end"]
+        assert starts == ends
+
+    def test_configured_exit_code(self, tmp_path):
+        agent_dir = write_mock_bundle(
+            tmp_path / "agent", {"mock_turns": 1, "mock_turn_seconds": 0, "mock_exit_code": 3}
+        )
+        result, events = _run(agent_dir, tmp_path)
+
+        assert result.returncode == 3
+        assert events[-1]["status"] == "failed"
+
+    def test_checkpoints_and_resumes(self, tmp_path):
+        agent_dir = write_mock_bundle(tmp_path / "agent", {"mock_turns": 6, "mock_turn_seconds": 0})
+        checkpoint = tmp_path / "checkpoint.json"
+        _run(agent_dir, tmp_path, HAYMAKER_CHECKPOINT_FILE=str(checkpoint))
+        saved = json.loads(checkpoint.read_text())
+        assert saved["turns_used"] == 6
+        assert saved["phases_completed"] == ["plan", "execute", "verify"]
+
+        # Pretend the run was interrupted after the first phase
+        checkpoint.write_text(json.dumps({"turns_used": 2, "phases_completed": ["plan"]}))
+        result, events = _run(
+            agent_dir, tmp_path, HAYMAKER_CHECKPOINT_FILE=str(checkpoint), HAYMAKER_RESUME="1"
+        )
+
+        assert result.returncode == 0
+        assert "Resuming at turn 3" in result.stdout
+        assert [e["turn"] for e in events if e["type"] == "turn"] == [3, 4, 5, 6]
+        assert [e["phase"] for e in events if e["type"] == "phase_start"] == ["execute", "verify"]
@@ -0,0 +1,123 @@
+"""Tests for goal pipeline manifests and reports."""
+
+import json
+
+import pytest
+
+from haymaker_my_workload.pipeline import (
+    build_report,
+    critical_path,
+    format_report,
+    inputs_env,
+    load_manifest,
+    skipped_result,
+    validate_inputs,
+    validate_manifest,
+)
+
+
+def _manifest(*goals):
+    return {"name": "p", "goals": list(goals)}
+
+
+def _result(step, needs, started, finished):
+    return {
+        "step": step,
+        "needs": needs,
+        "deployment_id": f"dep-{step}",
+        "status": "completed",
+        "success": True,
+        "ready_at": started,
+        "started_at": started,
+        "finished_at": finished,
+        "wall_seconds": finished - started,
+    }
+
+
+class TestManifest:
+    def test_valid(self):
+        manifest = _manifest(
+            {"id": "a", "goal_file": "a.md"},
+            {"id": "b", "goal_file": "b.md", "needs": ["a"], "config": {"max_turns": 5}},
+        )
+        assert validate_manifest(manifest) == []
+
+    def test_shape_errors(self):
+        errors = validate_manifest(
+            _manifest(
+                {"id": "a", "goal_file": "a.md", "after": ["b"]},
+                {"id": "a", "goal_file": "a2.md"},
+                {"id": "not-an-id", "goal_file": "c.md"},
+                {"id": "d", "needs": ["zzz"]},
+            )
+        )
+        assert errors == [
+            "goal a: unknown keys: after",
+            "goal a: duplicate id",
+            "goal 3: id must be an identifier (got 'not-an-id')",
+            "goal d: goal_file is required",
+            "goal d: needs unknown goal 'zzz'",
+        ]
+        assert validate_manifest([]) == ["pipeline manifest must be a JSON object"]
+        assert validate_manifest({**_manifest({"id": "a", "goal_file": "a.md"}), "name": "../x"})
+        assert validate_manifest({"goals": []}) == ["pipeline goals must be a non-empty list"]
+
+    def test_cycle(self):
+        errors = validate_manifest(
+            _manifest(
+                {"id": "a", "goal_file": "a.md", "needs": ["c"]},
+                {"id": "b", "goal_file": "b.md", "needs": ["a"]},
+                {"id": "c", "goal_file": "c.md", "needs": ["b"]},
+            )
+        )
+        assert len(errors) == 1 and "cycle" in errors[0]
+
+    def test_load(self, tmp_path):
+        path = tmp_path / "nightly.json"
+        path.write_text(json.dumps({"goals": [{"id": "a", "goal_file": "a.md"}]}))
+        assert load_manifest(path)["name"] == "nightly"
+        path.write_text("{")
+        with pytest.raises(ValueError, match="not valid JSON"):
+            load_manifest(path)
+
+
+class TestInputs:
+    def test_validation_and_env(self):
+        assert validate_inputs({}) == []
+        assert validate_inputs({"inputs": {"a": "/out/a"}}) == []
+        assert validate_inputs({"inputs": ["/out/a"]}) == [
+            "inputs must map names to directory paths"
+        ]
+        assert inputs_env({}) == {}
+        assert json.loads(inputs_env({"inputs": {"a": "/out/a"}})["HAYMAKER_INPUTS"]) == {
+            "a": "/out/a"
+        }
+
+
+class TestReport:
+    def test_critical_path_follows_latest_upstream(self):
+        results = {
+            "fetch": _result("fetch", [], 0.0, 10.0),
+            "fast": _result("fast", ["fetch"], 10.0, 15.0),
+            "slow": _result("slow", ["fetch"], 10.0, 40.0),
+            "merge": _result("merge", ["fast", "slow"], 40.0, 50.0),
+            "side": _result("side", [], 0.0, 20.0),
+        }
+        assert critical_path(results) == ["fetch", "slow", "merge"]
+
+        report = build_report("p", results, 50.5)
+        assert report["critical_path_seconds"] == 50.0
+        assert report["succeeded"] == 5
+        table = format_report(report)
+        assert "fetch -> slow -> merge (50.0 s of 50.5 s)" in table
+        assert "* slow" in table and "  fast" in table
+
+    def test_skipped_goals(self):
+        failed = {**_result("a", [], 0.0, 3.0), "status": "failed", "success": False}
+        step = {"step": "b", "goal_file": "b.md", "needs": ["a"]}
+        results = {"a": failed, "b": skipped_result(step, ["a"], 3.0)}
+        report = build_report("p", results, 3.0)
+        assert (report["succeeded"], report["failed"], report["skipped"]) == (0, 1, 1)
+        assert report["critical_path"] == ["a"]
+        assert report["steps"][-1]["error"] == "upstream goals did not complete: a"
+        assert "skipped" in format_report(report)
@@ -0,0 +1,60 @@
+"""Tests for agent progress estimation."""
+
+import pytest
+
+from haymaker_my_workload.progress import compute_progress, parse_duration
+
+
+class TestParseDuration:
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("1 min", 60),
+            ("15 minutes", 900),
+            ("1 hour 12 minutes", 4320),
+            ("2h 30m", 9000),
+            ("45 seconds", 45),
+            ("1.5 hours", 5400),
+        ],
+    )
+    def test_parses_plan_durations(self, text, expected):
+        assert parse_duration(text) == expected
+
+    @pytest.mark.parametrize("text", [None, "", "soon", "a while"])
+    def test_unparseable_returns_none(self, text):
+        assert parse_duration(text) is None
+
+
+class TestComputeProgress:
+    def test_plan_estimate_before_any_progress(self):
+        progress = compute_progress(
+            {}, ["plan", "build"], max_turns=10, estimated_seconds=600, elapsed_seconds=100
+        )
+        assert progress["fraction_complete"] == 0
+        assert progress["estimated_remaining_seconds"] == 500
+
+    def test_projects_from_observed_pace(self):
+        progress = compute_progress(
+            {"current_phase": "build", "phases_completed": ["plan"], "turns_used": 2},
+            ["plan", "build"],
+            max_turns=10,
+            estimated_seconds=3600,
+            elapsed_seconds=120,
+        )
+        assert progress["phase_index"] == 2
+        assert progress["fraction_complete"] == 0.5
+        assert progress["estimated_remaining_seconds"] == 120
+
+    def test_turn_budget_exhausted(self):
+        progress = compute_progress(
+            {"turns_used": 15}, [], max_turns=15, estimated_seconds=None, elapsed_seconds=300
+        )
+        assert progress["fraction_complete"] == 1
+        assert progress["estimated_remaining_seconds"] == 0
+
+    def test_unknown_estimate(self):
+        progress = compute_progress(
+            {}, [], max_turns=15, estimated_seconds=None, elapsed_seconds=10
+        )
+        assert progress["estimated_remaining_seconds"] is None
+        assert progress["phase_index"] is None
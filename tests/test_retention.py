@@ -0,0 +1,107 @@
+"""Tests for the agent directory retention policy."""
+
+import os
+import tarfile
+
+from haymaker_my_workload.retention import (
+    archive_agent_dir,
+    dir_usage,
+    finished_at,
+    select_for_removal,
+    validate_retention_options,
+)
+
+_NOW = 1_000_000.0
+
+
+def _candidate(dep_id, goal="g1", age=0.0, size=0):
+    return {"deployment_id": dep_id, "goal_hash": goal, "finished_at": _NOW - age, "bytes": size}
+
+
+def _ids(plan):
+    return [c["deployment_id"] for c in plan]
+
+
+class TestSelectForRemoval:
+    def test_keep_per_goal(self):
+        candidates = [
+            _candidate("a1", "a", age=30),
+            _candidate("a2", "a", age=20),
+            _candidate("a3", "a", age=10),
+            _candidate("b1", "b", age=40),
+        ]
+        plan = select_for_removal(candidates, keep_per_goal=2, now=_NOW)
+        assert _ids(plan) == ["a1"]
+        assert plan[0]["reason"] == "keep_per_goal"
+
+    def test_max_age(self):
+        candidates = [_candidate("old", age=7200), _candidate("new", age=60)]
+        plan = select_for_removal(candidates, max_age_seconds=3600, now=_NOW)
+        assert _ids(plan) == ["old"]
+        assert plan[0]["reason"] == "max_age"
+
+    def test_byte_budget_removes_least_recently_finished(self):
+        candidates = [
+            _candidate("oldest", age=30, size=100),
+            _candidate("middle", age=20, size=100),
+            _candidate("newest", age=10, size=100),
+        ]
+        plan = select_for_removal(candidates, max_bytes=250, now=_NOW)
+        assert _ids(plan) == ["oldest"]
+        assert plan[0]["reason"] == "max_bytes"
+
+    def test_budget_counts_only_what_other_policies_keep(self):
+        candidates = [
+            _candidate("expired", age=7200, size=500),
+            _candidate("a", age=20, size=100),
+            _candidate("b", age=10, size=100),
+        ]
+        plan = select_for_removal(candidates, max_age_seconds=3600, max_bytes=200, now=_NOW)
+        assert _ids(plan) == ["expired"]
+
+    def test_plan_is_oldest_first(self):
+        candidates = [_candidate(f"d{i}", age=i) for i in range(5)]
+        plan = select_for_removal(candidates, keep_per_goal=0, now=_NOW)
+        assert _ids(plan) == ["d4", "d3", "d2", "d1", "d0"]
+
+
+class TestHelpers:
+    def test_finished_at_prefers_completion_time(self):
+        row = {"completed_at": "2026-01-01T00:00:00+00:00", "stopped_at": None, "updated_at": 5.0}
+        assert finished_at(row) == 1767225600.0
+        assert finished_at({"completed_at": None, "stopped_at": None, "updated_at": 5.0}) == 5.0
+
+    def test_dir_usage_skips_hardlinked_files(self, tmp_path):
+        agent = tmp_path / "agent"
+        agent.mkdir()
+        (agent / "own.log").write_bytes(b"x" * 100)
+        (agent / "shared.py").write_bytes(b"y" * 50)
+        os.link(agent / "shared.py", tmp_path / "blob")
+        assert dir_usage(agent) == 100
+
+    def test_archive_keeps_logs_and_outputs_only(self, tmp_path):
+        agent = tmp_path / "agent"
+        (agent / "output").mkdir(parents=True)
+        (agent / "main.py").write_text("code")
+        (agent / "agent.log").write_text("log line\n")
+        (agent / "output" / "report.md").write_text("# report")
+
+        archive = archive_agent_dir(agent, tmp_path / "archive" / "dep.tar.gz")
+
+        with tarfile.open(archive) as tar:
+            assert sorted(tar.getnames()) == ["agent.log", "output", "output/report.md"]
+
+    def test_archive_nothing_to_keep(self, tmp_path):
+        (tmp_path / "main.py").write_text("code")
+        assert archive_agent_dir(tmp_path, tmp_path / "a.tar.gz") is None
+        assert not (tmp_path / "a.tar.gz").exists()
+
+    def test_validation(self):
+        assert validate_retention_options(keep_per_goal=3) == []
+        assert validate_retention_options(max_bytes=-1, keep_per_goal=True) == [
+            "keep_per_goal must be a non-negative integer",
+            "max_bytes must be a non-negative integer",
+        ]
+        assert validate_retention_options() == [
+            "a retention policy needs keep_per_goal, max_age_seconds or max_bytes"
+        ]
@@ -0,0 +1,72 @@
+"""Tests for the transient-failure retry policy."""
+
+import random
+
+import pytest
+
+from haymaker_my_workload.retry import (
+    backoff_delay,
+    classify_failure,
+    read_stderr_tail,
+    retry_policy,
+    validate_retry_options,
+)
+
+
+class TestClassifyFailure:
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("anthropic.RateLimitError: Error code: 429 - {'type': 'error'}", "rate_limit"),
+            ("Agent reported failure: rate limited", "rate_limit"),
+            ("httpx.ReadTimeout: The read operation timed out", "timeout"),
+            ("openai.APIConnectionError: Connection error.", "connection"),
+            ("ConnectionResetError: [Errno 104] Connection reset by peer", "connection"),
+            ("anthropic.InternalServerError: Error code: 500", "server_error"),
+            ("HTTP 503 Service Unavailable", "server_error"),
+            ("ValueError: bad goal", "unknown"),
+        ],
+    )
+    def test_from_error_text(self, text, expected):
+        assert classify_failure(1, text) == expected
+
+    def test_traceback_line_numbers_are_not_statuses(self):
+        text = 'File "agent.py", line 503, in run\n  File "x.py", line 429\nKeyError: "x"'
+        assert classify_failure(1, text) == "unknown"
+
+    def test_sigkill(self):
+        assert classify_failure(-9, "") == "killed"
+
+    def test_uses_last_lines(self):
+        text = "warning: rate limit close\n" + "noise\n" * 30 + "ValueError: real cause"
+        assert classify_failure(1, text) == "unknown"
+
+
+class TestPolicy:
+    def test_disabled_by_default(self):
+        assert retry_policy({}) is None
+
+    def test_comma_separated_classes(self):
+        policy = retry_policy({"retry_max_attempts": 3, "retry_on": "rate_limit, timeout"})
+        assert policy["retry_on"] == ["rate_limit", "timeout"]
+        assert policy["max_attempts"] == 3
+
+    def test_backoff_is_capped_full_jitter(self):
+        rng = random.Random(1)
+        delays = [backoff_delay(attempt, 10, 60, rng) for attempt in range(1, 8) for _ in range(50)]
+        assert all(0 <= d <= 60 for d in delays)
+        assert max(backoff_delay(1, 10, 60, rng) for _ in range(100)) <= 10
+
+    def test_validation(self):
+        assert validate_retry_options({"retry_max_attempts": 3, "retry_on": ["timeout"]}) == []
+        errors = validate_retry_options(
+            {"retry_max_attempts": 0, "retry_backoff_seconds": -1, "retry_on": ["oops"]}
+        )
+        assert len(errors) == 3
+
+
+def test_read_stderr_tail(tmp_path):
+    path = tmp_path / "agent.err"
+    path.write_text("x" * 100 + "tail")
+    assert read_stderr_tail(path, max_bytes=4) == "tail"
+    assert read_stderr_tail(tmp_path / "missing") == ""
@@ -1,7 +1,18 @@
 """Tests for the goal-agent workload."""
 
 import asyncio
+import contextlib
+import copy
+import fcntl
+import hashlib
+import json
+import os
+import signal
 import subprocess
+import tarfile
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -13,7 +24,23 @@ from agent_haymaker.workloads.models import (
     DeploymentStatus,
 )
 
-from haymaker_my_workload import MyWorkload
+from haymaker_my_workload import MyWorkload, StateConflictError
+from haymaker_my_workload import workload as workload_module
+
+
+@pytest.fixture(autouse=True)
+def _isolated_state_files(tmp_path, monkeypatch):
+    """Keep the catalog, locks, blobs, archives and goal index out of the working tree.
+
+    Default-goal temp files go to tmp_path too, so deploys never cleaned up
+    do not pile up in the system temp directory.
+    """
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr("haymaker_my_workload.workload._CATALOG_PATH", tmp_path / "catalog.db")
+    monkeypatch.setattr("haymaker_my_workload.workload._LOCKS_DIR", tmp_path / "locks")
+    monkeypatch.setattr("haymaker_my_workload.workload._BLOBS_DIR", tmp_path / "blobs")
+    monkeypatch.setattr("haymaker_my_workload.workload._ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr("haymaker_my_workload.workload._GOAL_INDEX_PATH", tmp_path / "goals.json")
 
 
 def _mock_platform():
@@ -39,6 +66,27 @@ def _mock_platform():
     return platform
 
 
+def _fake_builder(workload, built, main_py="print('Goal achieved')\n"):
+    """Stand-in for MyWorkload._build_agent that packages a bundle without amplihack.
+
+    Appends each goal text it builds to built. main_py is the agent's
+    source, or a function of the goal text returning it.
+    """
+
+    def build(name, goal_path, sdk, enable_memory, output_dir):
+        text = goal_path.read_text()
+        built.append(text)
+        agent_dir = output_dir / name
+        agent_dir.mkdir(parents=True)
+        (agent_dir / "prompt.md").write_text(text)
+        (agent_dir / "main.py").write_text(main_py(text) if callable(main_py) else main_py)
+        (agent_dir / "agent_config.json").write_text(json.dumps({"name": name}))
+        workload._plan_summaries[name] = {"phases": ["p1"], "estimated_duration": "1 minute"}
+        return agent_dir
+
+    return build
+
+
 def _mock_generator(agent_dir: Path):
     """Mock the amplihack generator pipeline to return a fake agent dir."""
     import uuid
@@ -188,24 +236,92 @@ class TestStop:
 
 
 class TestStart:
-    async def test_start_raises_not_implemented(self):
-        """start() is not supported -- raises NotImplementedError."""
+    async def test_start_not_found(self):
+        workload = MyWorkload(platform=_mock_platform())
+        with pytest.raises(DeploymentNotFoundError):
+            await workload.start("test-dep-42")
+
+    async def test_start_completed_returns_false(self):
+        workload = MyWorkload(platform=_mock_platform())
+        state = DeploymentState(
+            deployment_id="test-done",
+            workload_name="my-workload",
+            status=DeploymentStatus.COMPLETED,
+            phase="completed",
+        )
+        await workload.save_state(state)
+        assert await workload.start("test-done") is False
+
+    async def test_start_without_bundle_returns_false(self, tmp_path):
         workload = MyWorkload(platform=_mock_platform())
         state = DeploymentState(
             deployment_id="test-stopped",
             workload_name="my-workload",
             status=DeploymentStatus.STOPPED,
             phase="stopped",
+            metadata={"agent_dir": str(tmp_path / "gone")},
         )
         await workload.save_state(state)
-        with pytest.raises(NotImplementedError, match="Cannot resume deployment"):
-            await workload.start("test-stopped")
+        assert await workload.start("test-stopped") is False
 
-    async def test_start_error_includes_deployment_id(self):
-        """The NotImplementedError message includes the deployment ID."""
+    async def test_resume_from_checkpoint(self, tmp_path, monkeypatch):
+        """A stopped agent resumes in its existing bundle after the last completed phase."""
+        monkeypatch.chdir(tmp_path)
         workload = MyWorkload(platform=_mock_platform())
-        with pytest.raises(NotImplementedError, match="test-dep-42"):
-            await workload.start("test-dep-42")
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={"sdk": "mock", "mock_turns": 6, "mock_turn_seconds": 0.2},
+        )
+        dep_id = await workload.deploy(config)
+        agent_dir = Path(workload._platform._storage[dep_id].metadata["agent_dir"])
+        checkpoint = agent_dir / "checkpoint.json"
+        for _ in range(100):
+            if checkpoint.exists():
+                break
+            await asyncio.sleep(0.05)
+        assert await workload.stop(dep_id)
+
+        with patch.object(workload, "_generate_mock_agent") as regenerate:
+            assert await workload.start(dep_id) is True
+        regenerate.assert_not_called()
+
+        state = await workload.get_status(dep_id)
+        assert state.status == DeploymentStatus.RUNNING
+        assert state.metadata["resumes"] == 1
+        assert state.metadata["resumed_from"]["phases_completed"][0] == "plan"
+
+        for _ in range(100):
+            state = await workload.get_status(dep_id)
+            if state.status != DeploymentStatus.RUNNING:
+                break
+            await asyncio.sleep(0.1)
+        assert state.status == DeploymentStatus.COMPLETED
+        assert "Resuming at turn" in (agent_dir / "agent.log").read_text()
+
+    async def test_resume_after_failure_clears_old_outcome(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "main.py").write_text("import time; time.sleep(5)\n")
+        state = DeploymentState(
+            deployment_id="test-failed",
+            workload_name="my-workload",
+            status=DeploymentStatus.FAILED,
+            phase="failed",
+            error="Agent timed out after 5s",
+            metadata={
+                "agent_dir": str(tmp_path),
+                "agent_progress": {"outcome": {"status": "failed", "error": "boom"}},
+                "timed_out": True,
+            },
+        )
+        await workload.save_state(state)
+
+        assert await workload.start("test-failed") is True
+        state = await workload.get_status("test-failed")
+        assert state.status == DeploymentStatus.RUNNING
+        assert state.error is None
+        assert "outcome" not in state.metadata["agent_progress"]
+        assert "timed_out" not in state.metadata
+        workload._terminate_process("test-failed")
 
 
 class TestCleanup:
@@ -214,6 +330,30 @@ class TestCleanup:
         with pytest.raises(DeploymentNotFoundError):
             await workload.cleanup("nonexistent")
 
+    async def test_cleanup_of_finished_deployment_releases_memory(self, tmp_path):
+        """In-memory tracking is dropped even when the agent already finished."""
+        workload = MyWorkload(platform=_mock_platform())
+        state = DeploymentState(
+            deployment_id="test-done",
+            workload_name="my-workload",
+            status=DeploymentStatus.COMPLETED,
+            phase="completed",
+        )
+        await workload.save_state(state)
+        workload._append_log("test-done", "finished")
+        workload._agent_log_files["test-done"] = tmp_path / "agent.log"
+        goal = tmp_path / "goal.md"
+        goal.write_text("# Goal")
+        workload._temp_goal_files["test-done"] = goal
+
+        report = await workload.cleanup("test-done")
+
+        assert "Already in" in report.details[0]
+        assert "test-done" not in workload._logs
+        assert "test-done" not in workload._agent_log_files
+        assert "test-done" not in workload._temp_goal_files
+        assert not goal.exists()
+
 
 class TestValidateConfig:
     @pytest.fixture()
@@ -1012,6 +1152,1938 @@ class TestDeployPersistsPid:
         assert state.metadata.get("agent_pid") == 54321
 
 
+class TestTimeoutWatchdog:
+    """Test wall-clock enforcement via timeout_seconds."""
+
+    async def test_validate_rejects_non_positive_timeout(self):
+        workload = MyWorkload(platform=_mock_platform())
+        for bad in (0, -5, "60", True):
+            config = DeploymentConfig(
+                workload_name="my-workload",
+                workload_config={"timeout_seconds": bad},
+            )
+            errors = await workload.validate_config(config)
+            assert any("timeout_seconds" in e for e in errors), f"{bad!r} should be rejected"
+
+    async def test_watchdog_stops_overdue_agent(self, tmp_path):
+        """An agent still running at its deadline is terminated and marked FAILED."""
+        workload = MyWorkload(platform=_mock_platform())
+        agent_dir = tmp_path / "agent"
+        agent_dir.mkdir()
+        (agent_dir / "main.py").write_text("import time; print('working'); time.sleep(30)\n")
+
+        with patch.object(workload, "_generate_agent", AsyncMock(return_value=agent_dir)):
+            dep_id = await workload.deploy(
+                DeploymentConfig(
+                    workload_name="my-workload",
+                    workload_config={"timeout_seconds": 0.5},
+                )
+            )
+        assert dep_id in workload._watchdogs
+
+        await asyncio.sleep(1.5)
+
+        state = await workload.load_state(dep_id)
+        assert state.status == DeploymentStatus.FAILED
+        assert "timed out" in state.error
+        assert state.metadata["timed_out"] is True
+        assert "elapsed_seconds" in state.metadata["partial_progress"]
+        assert dep_id not in workload._processes
+        assert dep_id not in workload._watchdogs
+
+    async def test_overdue_deployment_failed_on_status_after_restart(self, tmp_path):
+        """Without an in-memory watchdog, get_status enforces the stored deadline."""
+        workload = MyWorkload(platform=_mock_platform())
+        state = DeploymentState(
+            deployment_id="test-overdue",
+            workload_name="my-workload",
+            status=DeploymentStatus.RUNNING,
+            phase="executing",
+            started_at=datetime.now(tz=UTC) - timedelta(seconds=120),
+            metadata={
+                "agent_dir": str(tmp_path),
+                "agent_pid": 999999,
+                "timeout_seconds": 60,
+                "deadline": (datetime.now(tz=UTC) - timedelta(seconds=60)).isoformat(),
+            },
+        )
+        await workload.save_state(state)
+
+        with (
+            patch("haymaker_my_workload.workload.os.kill"),
+            patch("haymaker_my_workload.workload.os.killpg") as mock_killpg,
+        ):
+            result = await workload.get_status("test-overdue")
+
+        mock_killpg.assert_called_once()
+        assert result.status == DeploymentStatus.FAILED
+        assert result.metadata["partial_progress"]["last_phase"] == "executing"
+
+    async def test_stop_cancels_watchdog(self):
+        workload = MyWorkload(platform=_mock_platform())
+        task = asyncio.create_task(asyncio.sleep(60))
+        workload._watchdogs["dep-wd"] = task
+
+        workload._cleanup_process("dep-wd")
+        await asyncio.sleep(0)
+
+        assert task.cancelled()
+        assert "dep-wd" not in workload._watchdogs
+
+
+class TestStallDetection:
+    """Test heartbeat/log-mtime based hang detection in get_status()."""
+
+    @staticmethod
+    async def _running_state(workload, agent_dir, **config):
+        state = DeploymentState(
+            deployment_id="test-stall",
+            workload_name="my-workload",
+            status=DeploymentStatus.RUNNING,
+            phase="executing",
+            config=config,
+            metadata={"agent_dir": str(agent_dir), "agent_pid": 999999},
+        )
+        await workload.save_state(state)
+
+    @staticmethod
+    def _age(path, seconds):
+        old = time.time() - seconds
+        os.utime(path, (old, old))
+
+    def test_heartbeat_path_passed_in_env(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        agent_dir = tmp_path / "agent"
+        agent_dir.mkdir()
+        (agent_dir / "main.py").write_text("print('hello')\n")
+
+        mock_proc = MagicMock(spec=subprocess.Popen)
+        mock_proc.pid = 7
+        with patch(
+            "haymaker_my_workload.workload.subprocess.Popen", return_value=mock_proc
+        ) as mock_popen:
+            workload._execute_agent_detached("dep-hb", agent_dir, max_turns=5)
+
+        env = mock_popen.call_args.kwargs["env"]
+        assert env["HAYMAKER_HEARTBEAT_FILE"] == str(agent_dir / "heartbeat")
+        assert (agent_dir / "heartbeat").exists()
+
+    async def test_flags_stalled_agent(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "heartbeat").touch()
+        (tmp_path / "agent.log").write_text("working\n")
+        self._age(tmp_path / "heartbeat", 600)
+        self._age(tmp_path / "agent.log", 600)
+        await self._running_state(workload, tmp_path, stall_timeout_seconds=60)
+
+        with patch("haymaker_my_workload.workload.os.kill"):
+            result = await workload.get_status("test-stall")
+
+        assert result.status == DeploymentStatus.RUNNING
+        assert result.metadata["stalled"] is True
+        assert "last_activity_at" in result.metadata
+
+    async def test_recent_heartbeat_not_stalled(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "agent.log").write_text("working\n")
+        self._age(tmp_path / "agent.log", 600)
+        (tmp_path / "heartbeat").touch()  # fresh heartbeat, stale log
+        await self._running_state(workload, tmp_path, stall_timeout_seconds=60)
+
+        with patch("haymaker_my_workload.workload.os.kill"):
+            result = await workload.get_status("test-stall")
+
+        assert "stalled" not in result.metadata
+
+    async def test_stop_action_fails_stalled_agent(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "heartbeat").touch()
+        self._age(tmp_path / "heartbeat", 600)
+        await self._running_state(workload, tmp_path, stall_timeout_seconds=60, stall_action="stop")
+
+        with (
+            patch("haymaker_my_workload.workload.os.kill"),
+            patch("haymaker_my_workload.workload.os.killpg") as mock_killpg,
+        ):
+            result = await workload.get_status("test-stall")
+
+        mock_killpg.assert_called_once()
+        assert result.status == DeploymentStatus.FAILED
+        assert "stalled" in result.error
+
+    def _stalled_bundle(self, tmp_path):
+        (tmp_path / "main.py").write_text("print('hello')\n")
+        (tmp_path / "agent.log").write_text("first run\n")
+        (tmp_path / "heartbeat").touch()
+        self._age(tmp_path / "heartbeat", 600)
+        self._age(tmp_path / "agent.log", 600)
+
+    async def test_restart_action_relaunches_agent(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        self._stalled_bundle(tmp_path)
+        await self._running_state(
+            workload, tmp_path, stall_timeout_seconds=60, stall_action="restart"
+        )
+        state = await workload.load_state("test-stall")
+        state.metadata["deadline"] = (datetime.now(tz=UTC) + timedelta(seconds=300)).isoformat()
+        await workload.save_state(state)
+
+        events = []
+        alive = [True, True, False]  # The old group takes two polls to exit
+
+        def killpg(pid, sig):
+            events.append(("killpg", sig))
+            if sig == 0 and not alive.pop(0):
+                raise ProcessLookupError
+
+        mock_proc = MagicMock(spec=subprocess.Popen)
+        mock_proc.pid = 4242
+        mock_proc.poll.return_value = None
+
+        def popen(*args, **kwargs):
+            events.append(("launch", None))
+            return mock_proc
+
+        with (
+            patch("haymaker_my_workload.workload.os.kill"),
+            patch("haymaker_my_workload.workload.os.killpg", side_effect=killpg),
+            patch("haymaker_my_workload.workload.subprocess.Popen", side_effect=popen),
+        ):
+            polled = await workload.get_status("test-stall")
+            # The poll returns at once; the relaunch waits for the old group
+            assert polled.status == DeploymentStatus.PENDING
+            assert polled.phase == "restarting"
+            assert ("launch", None) not in events
+            await workload._stall_restarts["test-stall"]
+        result = await workload.load_state("test-stall")
+
+        assert events[-1] == ("launch", None)
+        assert events[:-1].count(("killpg", 0)) == 3
+        assert result.status == DeploymentStatus.RUNNING
+        assert result.metadata["agent_pid"] == 4242
+        assert result.metadata["stall_restarts"] == 1
+        watchdog = workload._watchdogs["test-stall"]
+        assert not watchdog.done()
+        workload._cleanup_process("test-stall")
+        assert watchdog.cancelled() or watchdog.cancelling()
+        assert "first run" in (tmp_path / "agent.log").read_text()
+
+    async def test_restart_waits_out_old_agent_or_fails(self, tmp_path, monkeypatch):
+        workload = MyWorkload(platform=_mock_platform())
+        self._stalled_bundle(tmp_path)
+        await self._running_state(
+            workload, tmp_path, stall_timeout_seconds=60, stall_action="restart"
+        )
+        monkeypatch.setattr(workload_module, "_STOP_GRACE_SECONDS", 0.05)
+        monkeypatch.setattr(workload_module, "_KILL_GRACE_SECONDS", 0.05)
+
+        with (
+            patch("haymaker_my_workload.workload.os.kill"),
+            patch("haymaker_my_workload.workload.os.killpg") as mock_killpg,
+            patch("haymaker_my_workload.workload.subprocess.Popen") as mock_popen,
+        ):
+            await workload.get_status("test-stall")
+            await workload._stall_restarts["test-stall"]
+        result = await workload.load_state("test-stall")
+
+        mock_popen.assert_not_called()
+        assert (999999, signal.SIGKILL) in [c.args for c in mock_killpg.call_args_list]
+        assert result.status == DeploymentStatus.FAILED
+        assert "did not exit" in result.error
+
+    async def test_stop_during_restart_cancels_relaunch(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        self._stalled_bundle(tmp_path)
+        await self._running_state(
+            workload, tmp_path, stall_timeout_seconds=60, stall_action="restart"
+        )
+
+        with (
+            patch("haymaker_my_workload.workload.os.kill"),
+            patch("haymaker_my_workload.workload.os.killpg"),
+            patch("haymaker_my_workload.workload.subprocess.Popen") as mock_popen,
+        ):
+            await workload.get_status("test-stall")
+            restart = workload._stall_restarts["test-stall"]
+            assert await workload.stop("test-stall")
+            with contextlib.suppress(asyncio.CancelledError):
+                await restart
+
+        mock_popen.assert_not_called()
+        assert (await workload.load_state("test-stall")).status == DeploymentStatus.STOPPED
+
+    async def test_restart_launch_error_fails_deployment(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        self._stalled_bundle(tmp_path)
+        await self._running_state(
+            workload, tmp_path, stall_timeout_seconds=60, stall_action="restart"
+        )
+
+        with (
+            patch("haymaker_my_workload.workload.os.kill"),
+            patch("haymaker_my_workload.workload.os.killpg", side_effect=ProcessLookupError),
+            patch(
+                "haymaker_my_workload.workload.subprocess.Popen",
+                side_effect=OSError("too many open files"),
+            ),
+        ):
+            await workload.get_status("test-stall")
+            await workload._stall_restarts["test-stall"]
+        result = await workload.load_state("test-stall")
+
+        assert result.status == DeploymentStatus.FAILED
+        assert "too many open files" in result.error
+
+    async def test_invalid_stall_action_rejected(self):
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={"stall_action": "explode"},
+        )
+        errors = await workload.validate_config(config)
+        assert any("stall_action" in e for e in errors)
+
+
+class TestEventStream:
+    """Test that get_status consumes events.jsonl from the agent."""
+
+    @staticmethod
+    async def _running_state(workload, agent_dir, deployment_id, **metadata):
+        state = DeploymentState(
+            deployment_id=deployment_id,
+            workload_name="my-workload",
+            status=DeploymentStatus.RUNNING,
+            phase="executing",
+            metadata={"agent_dir": str(agent_dir), **metadata},
+        )
+        await workload.save_state(state)
+
+    def test_events_fd_passed_to_agent(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        agent_dir = tmp_path / "agent"
+        agent_dir.mkdir()
+        (agent_dir / "main.py").write_text("print('hello')\n")
+
+        mock_proc = MagicMock(spec=subprocess.Popen)
+        mock_proc.pid = 8
+        with patch(
+            "haymaker_my_workload.workload.subprocess.Popen", return_value=mock_proc
+        ) as mock_popen:
+            workload._execute_agent_detached("dep-ev", agent_dir, max_turns=5)
+
+        kwargs = mock_popen.call_args.kwargs
+        assert kwargs["env"]["HAYMAKER_EVENTS_FD"] == str(kwargs["pass_fds"][0])
+        assert kwargs["env"]["HAYMAKER_EVENTS_FILE"] == str(agent_dir / "events.jsonl")
+        assert (agent_dir / "events.jsonl").exists()
+
+    async def test_running_agent_phase_from_events(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "events.jsonl").write_text(
+            '{"type": "phase_start", "phase": "analyze"}\n{"type": "turn", "turn": 2}\n'
+        )
+        await self._running_state(workload, tmp_path, "test-ev-phase", agent_pid=999999)
+
+        with patch("haymaker_my_workload.workload.os.kill"):
+            result = await workload.get_status("test-ev-phase")
+
+        assert result.status == DeploymentStatus.RUNNING
+        assert result.phase == "analyze"
+        assert result.metadata["agent_progress"]["turns_used"] == 2
+        assert result.metadata["events_offset"] == (tmp_path / "events.jsonl").stat().st_size
+
+    async def test_outcome_event_preferred_over_log(self, tmp_path):
+        """A reported failure wins over a misleading 'goal achieved' log line."""
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "agent.log").write_text("Goal achieved!\n")
+        (tmp_path / "events.jsonl").write_text(
+            '{"type": "outcome", "status": "failed", "error": "rate limited"}\n'
+        )
+        await self._running_state(workload, tmp_path, "test-ev-outcome", agent_pid=999999)
+
+        with patch("haymaker_my_workload.workload.os.kill", side_effect=ProcessLookupError):
+            result = await workload.get_status("test-ev-outcome")
+
+        assert result.status == DeploymentStatus.FAILED
+        assert "rate limited" in result.error
+
+    async def test_completed_outcome_without_pid(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "events.jsonl").write_text('{"type": "outcome", "status": "completed"}\n')
+        await self._running_state(workload, tmp_path, "test-ev-legacy")
+
+        result = await workload.get_status("test-ev-legacy")
+        assert result.status == DeploymentStatus.COMPLETED
+
+
+class TestLiveProgress:
+    """Test phase/turn progress tracking while the agent runs."""
+
+    async def test_progress_tracks_plan_phase_and_turns(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "events.jsonl").write_text(
+            '{"type": "phase_start", "phase": "plan"}\n'
+            '{"type": "phase_end", "phase": "plan"}\n'
+            '{"type": "phase_start", "phase": "build"}\n'
+            '{"type": "turn", "turn": 3}\n'
+        )
+        state = DeploymentState(
+            deployment_id="test-progress",
+            workload_name="my-workload",
+            status=DeploymentStatus.RUNNING,
+            phase="executing",
+            started_at=datetime.now(tz=UTC) - timedelta(seconds=60),
+            metadata={
+                "agent_dir": str(tmp_path),
+                "agent_pid": 999999,
+                "max_turns": 10,
+                "plan_phases": ["plan", "build", "test", "deploy"],
+                "estimated_duration_seconds": 3600,
+            },
+        )
+        await workload.save_state(state)
+
+        with patch("haymaker_my_workload.workload.os.kill"):
+            result = await workload.get_status("test-progress")
+
+        progress = result.metadata["progress"]
+        assert result.phase == "build"
+        assert progress["phase_index"] == 2
+        assert progress["phases_total"] == 4
+        assert progress["turns_used"] == 3
+        assert progress["max_turns"] == 10
+        assert progress["estimated_remaining_seconds"] > 0
+        assert "estimated_completion_at" in progress
+
+    async def test_progress_read_from_log_without_events(self, tmp_path):
+        """Agents that write no events still report phase and turns from agent.log."""
+        platform = _mock_platform()
+        workload = MyWorkload(platform=platform)
+        (tmp_path / "events.jsonl").write_text("")
+        log = tmp_path / "agent.log"
+        log.write_text("Analyzing goal\n[Phase 1] plan\nTurn 1/10\n")
+        state = DeploymentState(
+            deployment_id="test-log-progress",
+            workload_name="my-workload",
+            status=DeploymentStatus.RUNNING,
+            phase="executing",
+            metadata={
+                "agent_dir": str(tmp_path),
+                "agent_pid": 999999,
+                "max_turns": 10,
+                "plan_phases": ["plan", "build"],
+            },
+        )
+        await workload.save_state(state)
+
+        with patch("haymaker_my_workload.workload.os.kill"):
+            result = await workload.get_status("test-log-progress")
+            assert result.phase == "plan"
+            assert result.metadata["progress"]["turns_used"] == 1
+
+            with open(log, "a") as f:
+                f.write("tool output without progress\n")
+            writes = platform.save_deployment_state.await_count
+            await workload.get_status("test-log-progress")
+            assert platform.save_deployment_state.await_count == writes
+
+            with open(log, "a") as f:
+                f.write("Entering phase: build\nTurn 5/10\n")
+            result = await workload.get_status("test-log-progress")
+
+        assert result.phase == "build"
+        assert result.metadata["agent_progress"]["phases_completed"] == ["plan"]
+        assert result.metadata["progress"]["turns_used"] == 5
+        assert result.metadata["log_offset"] == log.stat().st_size
+
+    async def test_idle_poll_does_not_persist(self, tmp_path):
+        """Polling a running agent with no new events does not write state."""
+        platform = _mock_platform()
+        workload = MyWorkload(platform=platform)
+        (tmp_path / "events.jsonl").write_text('{"type": "turn", "turn": 1}\n')
+        state = DeploymentState(
+            deployment_id="test-idle",
+            workload_name="my-workload",
+            status=DeploymentStatus.RUNNING,
+            phase="executing",
+            metadata={"agent_dir": str(tmp_path), "agent_pid": 999999},
+        )
+        await workload.save_state(state)
+
+        with patch("haymaker_my_workload.workload.os.kill"):
+            await workload.get_status("test-idle")
+            writes = platform.save_deployment_state.await_count
+            await workload.get_status("test-idle")
+
+        assert platform.save_deployment_state.await_count == writes
+
+    async def test_deploy_records_plan_summary(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        agent_dir = tmp_path / "agent"
+        agent_dir.mkdir()
+        (agent_dir / "main.py").write_text("import sys; sys.exit(0)\n")
+
+        async def fake_generate(deployment_id, **_):
+            workload._plan_summaries[deployment_id] = {
+                "phases": ["plan", "build"],
+                "estimated_duration": "1 hour 12 minutes",
+            }
+            return agent_dir
+
+        with patch.object(workload, "_generate_agent", side_effect=fake_generate):
+            dep_id = await workload.deploy(DeploymentConfig(workload_name="my-workload"))
+
+        state = await workload.load_state(dep_id)
+        assert state.metadata["plan_phases"] == ["plan", "build"]
+        assert state.metadata["estimated_duration_seconds"] == 4320
+        assert dep_id not in workload._plan_summaries
+
+
+class TestLlmUsageMetering:
+    """Test per-deployment LLM usage accounting and the summary API."""
+
+    @staticmethod
+    async def _deployment(workload, agent_dir, deployment_id, sdk, goal_file, calls):
+        agent_dir.mkdir()
+        (agent_dir / "events.jsonl").write_text(
+            "".join(
+                f'{{"type": "llm_call", "input_tokens": {tokens}, "output_tokens": 10, '
+                f'"latency_ms": 200}}\n'
+                for tokens in calls
+            )
+        )
+        state = DeploymentState(
+            deployment_id=deployment_id,
+            workload_name="my-workload",
+            status=DeploymentStatus.RUNNING,
+            phase="executing",
+            config={"goal_file": goal_file, "sdk": sdk},
+            metadata={"agent_dir": str(agent_dir), "agent_pid": 999999, "sdk": sdk},
+        )
+        await workload.save_state(state)
+
+    async def test_usage_recorded_in_metadata(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        await self._deployment(
+            workload, tmp_path / "a", "test-usage", "claude", "goals/a.md", [100, 50]
+        )
+
+        with patch("haymaker_my_workload.workload.os.kill"):
+            result = await workload.get_status("test-usage")
+
+        usage = result.metadata["llm_usage"]
+        assert usage["calls"] == 2
+        assert usage["input_tokens"] == 150
+        assert usage["output_tokens"] == 20
+        assert "p50" in usage["latency_ms"]
+
+    async def test_summary_groups_by_goal_and_sdk(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        await self._deployment(workload, tmp_path / "a", "dep-a", "claude", "goals/a.md", [100])
+        await self._deployment(workload, tmp_path / "b", "dep-b", "claude", "goals/a.md", [200])
+        await self._deployment(workload, tmp_path / "c", "dep-c", "mini", "goals/a.md", [5])
+        # An agent that reports no LLM calls is unmetered, not free
+        await self._deployment(workload, tmp_path / "d", "dep-d", "claude", "goals/a.md", [])
+
+        with patch("haymaker_my_workload.workload.os.kill"):
+            summary = await workload.get_usage_summary(["dep-a", "dep-b", "dep-c", "dep-d"])
+
+        groups = {(g["goal"], g["sdk"]): g for g in summary["groups"]}
+        assert groups[("goals/a.md", "claude")]["deployments"] == 2
+        assert groups[("goals/a.md", "claude")]["input_tokens"] == 300
+        assert groups[("goals/a.md", "mini")]["input_tokens"] == 5
+        assert summary["total"]["calls"] == 3
+        assert summary["unmetered"] == 1
+
+
+class TestLlmCacheConfig:
+    """Test llm_cache config validation and agent environment injection."""
+
+    async def test_invalid_mode_rejected(self):
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={"llm_cache": "sometimes"},
+        )
+        errors = await workload.validate_config(config)
+        assert any("llm_cache" in e for e in errors)
+
+    def test_off_by_default(self):
+        assert MyWorkload._agent_env({}) == {}
+
+    def test_replay_env_enables_shim(self):
+        env = MyWorkload._agent_env({"llm_cache": "replay", "llm_cache_max_bytes": 1000})
+        assert env["HAYMAKER_LLM_CACHE_MODE"] == "replay"
+        assert Path(env["HAYMAKER_LLM_CACHE_DIR"]).is_absolute()
+        assert env["HAYMAKER_LLM_CACHE_MAX_BYTES"] == "1000"
+        assert "_llm_shim" in env["PYTHONPATH"]
+
+    async def test_cli_driven_sdk_rejected(self):
+        workload = MyWorkload(platform=_mock_platform())
+        for sdk_config, ok in (({}, False), ({"sdk": "copilot"}, False), ({"sdk": "mini"}, True)):
+            config = DeploymentConfig(
+                workload_name="my-workload",
+                workload_config={"llm_cache": "replay", **sdk_config},
+            )
+            errors = await workload.validate_config(config)
+            assert any("llm_cache" in e for e in errors) is not ok
+
+    def test_cache_follows_artifact_root(self, tmp_path):
+        env = MyWorkload._agent_env({"llm_cache": "record", "artifact_root": str(tmp_path)})
+        assert env["HAYMAKER_LLM_CACHE_DIR"] == str(tmp_path / "llm-cache")
+
+
+class TestMockSdk:
+    """Test the offline sdk=mock runtime end to end (no amplihack, no LLM)."""
+
+    async def test_mock_deploy_runs_to_completion(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={"sdk": "mock", "mock_turns": 3, "mock_turn_seconds": 0.01},
+        )
+
+        with patch.object(workload, "_generate_agent") as mock_gen:
+            dep_id = await workload.deploy(config)
+        mock_gen.assert_not_called()
+
+        for _ in range(50):
+            state = await workload.get_status(dep_id)
+            if state.status != DeploymentStatus.RUNNING:
+                break
+            await asyncio.sleep(0.1)
+
+        assert state.status == DeploymentStatus.COMPLETED
+        assert state.metadata["plan_phases"] == ["plan", "execute", "verify"]
+        assert state.metadata["agent_progress"]["turns_used"] == 3
+        assert state.metadata["llm_usage"]["calls"] == 3
+
+    async def test_mock_bundles_share_files(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={
+                "sdk": "mock",
+                "mock_turns": 1,
+                "mock_turn_seconds": 0.01,
+                "bundle_dedup": True,
+            },
+        )
+
+        first = await workload.deploy(config)
+        second = await workload.deploy(config)
+        dirs = [Path((await workload.get_status(d)).metadata["agent_dir"]) for d in (first, second)]
+
+        assert os.path.samefile(dirs[0] / "main.py", dirs[1] / "main.py")
+        assert os.path.samefile(dirs[0] / "mock_config.json", dirs[1] / "mock_config.json")
+        for dep_id in (first, second):
+            await workload.cleanup(dep_id)
+
+    async def test_bundle_dedup_is_opt_in(self, tmp_path, monkeypatch):
+        """Agents may rewrite their own bundle files unless dedup is turned on."""
+        monkeypatch.chdir(tmp_path)
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={"sdk": "mock", "mock_turns": 1},
+        )
+
+        dep_id = await workload.deploy(config)
+        agent_dir = Path((await workload.get_status(dep_id)).metadata["agent_dir"])
+
+        assert (agent_dir / "main.py").stat().st_nlink == 1
+        assert not (tmp_path / "blobs").exists()
+        await workload.cleanup(dep_id)
+
+    async def test_log_rotation_through_relay(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={
+                "sdk": "mock",
+                "mock_turns": 2,
+                "mock_turn_seconds": 0.01,
+                "mock_log_lines_per_turn": 2000,
+                "log_max_bytes": 64 * 1024,
+            },
+        )
+
+        dep_id = await workload.deploy(config)
+        for _ in range(100):
+            state = await workload.get_status(dep_id)
+            if state.status != DeploymentStatus.RUNNING:
+                break
+            await asyncio.sleep(0.1)
+        relay = workload._log_relays.get(dep_id)
+        if relay:
+            relay.wait(timeout=10)
+
+        assert state.status == DeploymentStatus.COMPLETED
+        agent_dir = Path(state.metadata["agent_dir"])
+        assert list(agent_dir.glob("agent.log.*.gz"))
+        assert (agent_dir / "agent.log").stat().st_size <= 64 * 1024
+        lines = [line async for line in workload.get_logs(dep_id, lines=4000)]
+        assert sum("turn 1/2" in line for line in lines) > 1500
+        await workload.cleanup(dep_id)
+
+    def test_relaunch_joins_previous_relay(self, tmp_path, monkeypatch):
+        workload = MyWorkload(platform=_mock_platform())
+        monkeypatch.setattr(workload_module, "_RELAY_DRAIN_SECONDS", 0.05)
+        # The old agent left a child holding the relay's pipes, so it never drains
+        stuck = subprocess.Popen(["sleep", "60"])
+        workload._log_relays["dep-relay"] = stuck
+        workload._cleanup_process("dep-relay")
+        assert workload._log_relays["dep-relay"] is stuck
+
+        rotation = {"max_bytes": 64 * 1024, "compression": "gzip"}
+        out_fd, err_fd = workload._start_log_relay(
+            "dep-relay", tmp_path / "agent.log", tmp_path / "agent.err", rotation, True
+        )
+        os.close(out_fd)
+        os.close(err_fd)
+
+        assert stuck.returncode is not None
+        relay = workload._log_relays["dep-relay"]
+        assert relay is not stuck
+        relay.wait(timeout=10)
+        workload._cleanup_process("dep-relay")
+        assert "dep-relay" not in workload._log_relays
+
+    async def test_search_logs_across_rotated_segments(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={
+                "sdk": "mock",
+                "mock_turns": 2,
+                "mock_turn_seconds": 0.01,
+                "mock_log_lines_per_turn": 2000,
+                "log_max_bytes": 64 * 1024,
+            },
+        )
+
+        dep_id = await workload.deploy(config)
+        for _ in range(100):
+            state = await workload.get_status(dep_id)
+            if state.status != DeploymentStatus.RUNNING:
+                break
+            await asyncio.sleep(0.1)
+        relay = workload._log_relays.get(dep_id)
+        if relay:
+            relay.wait(timeout=10)
+
+        foreign = copy.deepcopy(await workload.load_state(dep_id))
+        foreign.deployment_id, foreign.workload_name = "other-1", "other"
+        workload.catalog.upsert(foreign)
+
+        matches = [m async for m in workload.search_logs(r"turn 2/2", limit=5)]
+        assert len(matches) == 5
+        assert {m["deployment_id"] for m in matches} == {dep_id}
+        assert all(m["log"] == "agent.log" and m["time"] is not None for m in matches)
+
+        later = datetime.now(UTC) + timedelta(hours=1)
+        assert [m async for m in workload.search_logs("turn", since=later)] == []
+        earlier = datetime.now(UTC) - timedelta(days=1)
+        assert [m async for m in workload.search_logs("turn", until=earlier)] == []
+        await workload.cleanup(dep_id)
+
+    async def test_mock_options_validated(self):
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={"sdk": "mock", "mock_turns": -1},
+        )
+        errors = await workload.validate_config(config)
+        assert any("mock_turns" in e for e in errors)
+
+
+class TestMatrix:
+    """Test matrix runs and generation-stage reuse."""
+
+    async def test_matrix_runs_every_variant(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        goal_file = tmp_path / "goal.md"
+        goal_file.write_text("# Goal\n## Goal\nDo it\n")
+        workload = MyWorkload(platform=_mock_platform())
+
+        report = await workload.run_matrix(
+            str(goal_file),
+            sdks=["mock"],
+            max_turns=[1, 2],
+            enable_memory=[False, True],
+            max_concurrent=2,
+            poll_interval=0.05,
+            extra_config={"mock_turns": 1, "mock_turn_seconds": 0},
+        )
+
+        assert len(report["variants"]) == 4
+        assert report["succeeded"] == 4
+        assert report["fastest"] is not None
+        assert workload._generation_cache is None
+
+    async def test_matrix_waits_for_retries(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        goal_file = tmp_path / "goal.md"
+        goal_file.write_text("# Goal\n## Goal\nDo it\n")
+        workload = MyWorkload(platform=_mock_platform())
+        monkeypatch.setattr(workload_module, "backoff_delay", lambda *args: 0.2)
+
+        report = await workload.run_matrix(
+            str(goal_file),
+            sdks=["mock"],
+            poll_interval=0.05,
+            extra_config={
+                "mock_turns": 1,
+                "mock_turn_seconds": 0,
+                "mock_exit_code": 1,
+                "retry_max_attempts": 3,
+                "retry_on": ["unknown"],
+            },
+        )
+
+        (variant,) = report["variants"]
+        assert variant["status"] == "failed"
+        state = await workload.load_state(variant["deployment_id"])
+        assert [a["attempt"] for a in state.metadata["attempts"]] == [1, 2, 3]
+        assert not workload._retry_timers
+
+    async def test_matrix_rejects_invalid_grid(self, tmp_path):
+        goal_file = tmp_path / "goal.md"
+        goal_file.write_text("# Goal")
+        workload = MyWorkload(platform=_mock_platform())
+        with pytest.raises(ValueError, match="Invalid matrix"):
+            await workload.run_matrix(str(goal_file), sdks=["gpt5"])
+
+    async def test_generation_stages_reused_within_batch(self, tmp_path):
+        goal_file = tmp_path / "goal.md"
+        goal_file.write_text("# Goal")
+        mocks = _mock_generator(tmp_path / "agent")
+        analyzer = mocks["PromptAnalyzer"]()
+        synthesizer = mocks["SkillSynthesizer"]()
+        workload = MyWorkload(platform=_mock_platform())
+        workload._generation_cache = {}
+
+        with patch.multiple("amplihack.goal_agent_generator", **mocks):
+            for dep_id, sdk in (("dep-1", "claude"), ("dep-2", "claude"), ("dep-3", "mini")):
+                await workload._generate_agent(
+                    deployment_id=dep_id, goal_path=goal_file, sdk=sdk, enable_memory=False
+                )
+
+        assert analyzer.analyze.call_count == 1
+        assert synthesizer.synthesize_with_sdk_tools.call_count == 2
+
+
+class TestDeploymentCatalog:
+    """Test the SQLite catalog kept in step with state saves."""
+
+    async def test_transitions_are_indexed(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        agent_dir = tmp_path / "agent"
+        agent_dir.mkdir()
+        (agent_dir / "main.py").write_text("import time; time.sleep(30)\n")
+        with patch.object(workload, "_generate_agent", AsyncMock(return_value=agent_dir)):
+            dep_id = await workload.deploy(
+                DeploymentConfig(workload_name="my-workload", workload_config={"sdk": "mini"})
+            )
+
+        rows = workload.catalog.list_deployments({"status": "running"})
+        assert [r["deployment_id"] for r in rows] == [dep_id]
+        assert rows[0]["sdk"] == "mini"
+        assert len(rows[0]["goal_hash"]) == 64
+
+        await workload.stop(dep_id)
+        assert (
+            workload.catalog.list_deployments({"status": "stopped"})[0]["deployment_id"] == dep_id
+        )
+
+    async def test_rebuild_from_platform(self):
+        platform = _mock_platform()
+        for i in range(3):
+            platform._storage[f"dep-{i}"] = DeploymentState(
+                deployment_id=f"dep-{i}",
+                workload_name="my-workload",
+                status=DeploymentStatus.COMPLETED,
+                phase="completed",
+            )
+        workload = MyWorkload(platform=platform)
+
+        assert await workload.rebuild_catalog() == 3
+        assert workload.catalog.count({"status": "completed"}) == 3
+
+
+class TestGoalLibrary:
+    """Test the goal index behind list_goals, validation and deploy."""
+
+    async def test_list_goals(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "goals").mkdir()
+        (tmp_path / "goals" / "collect.md").write_text("# Collect\n## Goal\nCollect data\n")
+        extra = tmp_path / "more"
+        extra.mkdir()
+        (extra / "report.md").write_text("# Report\n## Goal\nSummarize\n")
+        monkeypatch.setenv("HAYMAKER_GOAL_DIRS", str(extra))
+        workload = MyWorkload(platform=_mock_platform())
+
+        goals = await workload.list_goals()
+
+        assert [g["name"] for g in goals] == ["collect", "report"]
+        assert goals[0]["missing_sections"] == ["Constraints", "Success Criteria"]
+        assert goals[1]["title"] == "Report"
+        assert "stat" not in goals[0]
+        assert await workload.list_goals([extra]) == goals[1:]
+
+    async def test_deploy_takes_goal_metadata_from_index(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        goal_file = tmp_path / "goal.md"
+        goal_file.write_text("# Sort files\n## Goal\nSort them\n")
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={"sdk": "mock", "mock_turns": 1, "goal_file": str(goal_file)},
+        )
+
+        dep_id = await workload.deploy(config)
+        state = await workload.load_state(dep_id)
+        assert state.metadata["goal_summary"] == "Sort files"
+        assert state.metadata["goal_hash"] == hashlib.sha256(goal_file.read_bytes()).hexdigest()
+        assert str(goal_file) in workload.goal_index._entries
+        await workload.cleanup(dep_id)
+
+    async def test_unreadable_goal_rejected(self, tmp_path):
+        goal_dir = tmp_path / "dir.md"
+        goal_dir.mkdir()
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload", workload_config={"goal_file": str(goal_dir)}
+        )
+        errors = await workload.validate_config(config)
+        assert any("cannot be read" in e for e in errors)
+
+
+class TestPregeneration:
+    """Test speculative bundle generation driven by the goal watcher."""
+
+    @staticmethod
+    async def _until(predicate, timeout=5.0):
+        for _ in range(int(timeout / 0.02)):
+            if predicate():
+                return
+            await asyncio.sleep(0.02)
+        raise AssertionError("condition not reached")
+
+    async def test_deploy_claims_pregenerated_bundle(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        goals = tmp_path / "goals"
+        goals.mkdir()
+        goal_file = goals / "sort.md"
+        goal_file.write_text("# Sort\n## Goal\nSort files\n")
+        workload = MyWorkload(platform=_mock_platform())
+        calls = []
+        monkeypatch.setattr(workload, "_build_agent", _fake_builder(workload, calls))
+        prebuilt = tmp_path / ".haymaker" / "prebuilt"
+
+        workload.start_pregeneration({"sdk": "mini"}, interval_seconds=0.05)
+        try:
+            await self._until(lambda: prebuilt.exists() and any(prebuilt.glob("mini-plain-*")))
+            generate = AsyncMock()
+            with patch.object(workload, "_generate_agent", generate):
+                dep_id = await workload.deploy(
+                    DeploymentConfig(
+                        workload_name="my-workload",
+                        workload_config={"sdk": "mini", "goal_file": str(goal_file)},
+                    )
+                )
+            generate.assert_not_awaited()
+            state = await workload.load_state(dep_id)
+            # Renamed from its build name, like a bundle generated for this deploy
+            agent_dir = Path(state.metadata["agent_dir"])
+            assert agent_dir == tmp_path / ".haymaker" / "agents" / dep_id / dep_id
+            assert json.loads((agent_dir / "agent_config.json").read_text()) == {"name": dep_id}
+            assert state.metadata["plan_phases"] == ["p1"]
+
+            # The watcher refills the claimed bundle, and rebuilds after an edit
+            await self._until(lambda: len(calls) == 2)
+            goal_file.write_text("# Sort\n## Goal\nSort files by size\n")
+            await self._until(lambda: len(calls) == 3)
+            await self._until(lambda: not workload._pregen_builds)
+            (ready,) = prebuilt.glob("mini-plain-*")
+            assert ready.name.endswith(workload.goal_index.get(goal_file)["hash"][:32])
+        finally:
+            workload.stop_pregeneration()
+        await workload.cleanup(dep_id)
+
+    async def test_other_configurations_generate(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "goals").mkdir()
+        goal_file = tmp_path / "goals" / "sort.md"
+        goal_file.write_text("# Sort\n## Goal\nSort files\n")
+        workload = MyWorkload(platform=_mock_platform())
+        monkeypatch.setattr(workload, "_build_agent", _fake_builder(workload, []))
+        workload.start_pregeneration({"sdk": "mini"}, interval_seconds=0.05)
+        try:
+            await self._until(lambda: any((tmp_path / ".haymaker" / "prebuilt").glob("mini-*")))
+            agent_dir = tmp_path / "generated"
+            agent_dir.mkdir()
+            (agent_dir / "main.py").write_text("print('Goal achieved')\n")
+            generate = AsyncMock(return_value=agent_dir)
+            with patch.object(workload, "_generate_agent", generate):
+                dep_id = await workload.deploy(
+                    DeploymentConfig(
+                        workload_name="my-workload",
+                        workload_config={"sdk": "claude", "goal_file": str(goal_file)},
+                    )
+                )
+            generate.assert_awaited_once()
+        finally:
+            workload.stop_pregeneration()
+        await workload.cleanup(dep_id)
+
+    async def test_failed_generation_backs_off(self, tmp_path, monkeypatch, caplog):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "goals").mkdir()
+        (tmp_path / "goals" / "bad.md").write_text("# Bad\n")
+        workload = MyWorkload(platform=_mock_platform())
+        broken = MagicMock(side_effect=RuntimeError("generator down"))
+        monkeypatch.setattr(workload, "_build_agent", broken)
+
+        workload.start_pregeneration({"sdk": "mini"}, interval_seconds=0.02)
+        try:
+            await self._until(lambda: workload._pregen_failures)
+            await asyncio.sleep(0.2)
+        finally:
+            workload.stop_pregeneration()
+        assert broken.call_count == 1
+        assert "generator down" in caplog.text
+        assert not list(tmp_path.glob(".haymaker/prebuilt/*"))
+
+    def test_rejects_mock_sdk(self):
+        workload = MyWorkload(platform=_mock_platform())
+        with pytest.raises(ValueError, match="generating SDK"):
+            workload.start_pregeneration({"sdk": "mock"})
+
+
+class TestArtifacts:
+    """Test the artifact root and shipping finished deployments to a store."""
+
+    @staticmethod
+    async def _finish(workload, dep_id):
+        for _ in range(100):
+            state = await workload.get_status(dep_id)
+            if state.status != DeploymentStatus.RUNNING:
+                break
+            await asyncio.sleep(0.1)
+        return state
+
+    async def test_artifact_root_and_shipping(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={
+                "sdk": "mock",
+                "mock_turns": 2,
+                "mock_turn_seconds": 0.01,
+                "artifact_root": str(tmp_path / "hot"),
+                "artifact_store": str(tmp_path / "durable"),
+                "bundle_dedup": True,
+            },
+        )
+
+        dep_id = await workload.deploy(config)
+        state = await self._finish(workload, dep_id)
+        assert state.status == DeploymentStatus.COMPLETED
+        assert state.metadata["agent_dir"] == str(tmp_path / "hot" / "agents" / dep_id)
+        assert list((tmp_path / "hot" / "blobs").iterdir())
+        await asyncio.gather(*workload._shipments.values())
+
+        state = await workload.load_state(dep_id)
+        shipped = state.metadata["artifacts"]
+        assert shipped["prefix"] == dep_id and shipped["files"] >= 2
+        assert (tmp_path / "durable" / dep_id / "agent.log").read_bytes() == (
+            Path(state.metadata["agent_dir"]) / "agent.log"
+        ).read_bytes()
+        assert (tmp_path / "durable" / dep_id / "events.jsonl").exists()
+        assert not (tmp_path / "durable" / dep_id / "main.py").exists()
+
+        await workload.get_status(dep_id)
+        assert not workload._shipments
+
+    async def test_gc_uses_artifact_root_from_any_directory(self, tmp_path, monkeypatch):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        monkeypatch.chdir(tmp_path / "a")
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={
+                "sdk": "mock",
+                "mock_turns": 1,
+                "mock_turn_seconds": 0.01,
+                "artifact_root": "../hot",
+            },
+        )
+        dep_id = await workload.deploy(config)
+        await self._finish(workload, dep_id)
+
+        monkeypatch.chdir(tmp_path / "b")
+        report = await workload.collect_garbage(max_age_seconds=0, archive=True)
+
+        archive = tmp_path / "hot" / "archive" / f"{dep_id}.tar.gz"
+        assert report["archived"] == [str(archive)]
+        assert archive.exists()
+        assert not any((tmp_path / "hot" / "blobs").rglob("*.*"))
+        assert not (tmp_path / "b" / ".haymaker").exists()
+
+    async def test_failed_upload_is_retried_later(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "not-a-dir").write_text("")
+        workload = MyWorkload(platform=_mock_platform())
+        await workload.save_state(
+            DeploymentState(
+                deployment_id="test-ship",
+                workload_name="my-workload",
+                status=DeploymentStatus.COMPLETED,
+                phase="completed",
+                config={"artifact_store": str(tmp_path / "not-a-dir")},
+                metadata={"agent_dir": str(tmp_path)},
+            )
+        )
+        (tmp_path / "agent.log").write_text("done\n")
+
+        await workload.get_status("test-ship")
+        await asyncio.gather(*workload._shipments.values())
+        assert "test-ship" in workload._shipment_failures
+        await workload.get_status("test-ship")
+        assert not workload._shipments
+        with pytest.raises(OSError):
+            await workload.ship_artifacts("test-ship")
+
+    async def test_ship_on_demand_requires_a_store(self):
+        workload = MyWorkload(platform=_mock_platform())
+        await workload.save_state(
+            DeploymentState(
+                deployment_id="test-plain",
+                workload_name="my-workload",
+                status=DeploymentStatus.COMPLETED,
+                metadata={"agent_dir": "/tmp"},
+            )
+        )
+        with pytest.raises(ValueError, match="artifact_store"):
+            await workload.ship_artifacts("test-plain")
+        with pytest.raises(DeploymentNotFoundError):
+            await workload.ship_artifacts("nope")
+
+
+class TestGarbageCollection:
+    """Test retention of finished deployments' agent directories."""
+
+    @staticmethod
+    def _finished(platform, tmp_path, dep_id, goal, minutes_ago, status=DeploymentStatus.COMPLETED):
+        agent_dir = tmp_path / "agents" / dep_id
+        (agent_dir / "output").mkdir(parents=True)
+        (agent_dir / "main.py").write_text("print('hi')\n")
+        (agent_dir / "agent.log").write_text("x" * 1000)
+        (agent_dir / "output" / "report.md").write_text("# done")
+        finished = datetime.now(tz=UTC) - timedelta(minutes=minutes_ago)
+        platform._storage[dep_id] = DeploymentState(
+            deployment_id=dep_id,
+            workload_name="my-workload",
+            status=status,
+            phase="completed",
+            started_at=finished - timedelta(minutes=1),
+            completed_at=finished if status != DeploymentStatus.STOPPED else None,
+            stopped_at=finished if status == DeploymentStatus.STOPPED else None,
+            metadata={"agent_dir": str(agent_dir), "goal_hash": goal},
+        )
+        return agent_dir
+
+    async def test_keep_per_goal_removes_older_directories(self, tmp_path):
+        platform = _mock_platform()
+        dirs = {
+            dep_id: self._finished(platform, tmp_path, dep_id, goal, age)
+            for dep_id, goal, age in [
+                ("a1", "a", 30),
+                ("a2", "a", 20),
+                ("a3", "a", 10),
+                ("b1", "b", 40),
+            ]
+        }
+        workload = MyWorkload(platform=platform)
+        await workload.rebuild_catalog()
+
+        report = await workload.collect_garbage(keep_per_goal=2)
+
+        assert report["removed"] == ["a1"]
+        assert report["pending"] == 0
+        assert not dirs["a1"].exists()
+        assert all(dirs[d].exists() for d in ("a2", "a3", "b1"))
+        state = await workload.get_status("a1")
+        assert "agent_dir_removed_at" in state.metadata
+        assert (await workload.collect_garbage(keep_per_goal=2))["removed"] == []
+
+    async def test_unshipped_artifacts_shipped_before_removal(self, tmp_path):
+        platform = _mock_platform()
+        kept = self._finished(platform, tmp_path, "kept", "g", 30)
+        shipped = self._finished(platform, tmp_path, "shipped", "g", 20)
+        platform._storage["kept"].config = {"artifact_store": str(kept / "agent.log")}
+        platform._storage["shipped"].config = {"artifact_store": str(tmp_path / "store")}
+        workload = MyWorkload(platform=platform)
+        await workload.rebuild_catalog()
+
+        report = await workload.collect_garbage(max_age_seconds=60)
+
+        assert report["removed"] == ["shipped"]
+        assert kept.exists() and not shipped.exists()
+        assert (tmp_path / "store" / "shipped" / "output" / "report.md").read_text() == "# done"
+        state = await workload.load_state("shipped")
+        assert state.metadata["artifacts"]["files"] == 2
+
+    async def test_byte_budget_and_archive(self, tmp_path):
+        platform = _mock_platform()
+        for dep_id, age in [("old", 30), ("mid", 20), ("new", 10)]:
+            self._finished(platform, tmp_path, dep_id, "g", age, status=DeploymentStatus.STOPPED)
+        workload = MyWorkload(platform=platform)
+        await workload.rebuild_catalog()
+
+        report = await workload.collect_garbage(max_bytes=2500, archive=True)
+        workload.stop_gc()
+
+        assert report["removed"] == ["old"]
+        assert report["bytes_freed"] > 1000
+        archive = tmp_path / "archive" / "old.tar.gz"
+        assert report["archived"] == [str(archive)]
+        with tarfile.open(archive) as tar:
+            assert "output/report.md" in tar.getnames()
+        assert (await workload.get_status("old")).metadata["archive"] == str(archive)
+
+    async def test_other_workloads_are_left_alone(self, tmp_path):
+        platform = _mock_platform()
+        ours = self._finished(platform, tmp_path, "ours", "g", 30)
+        theirs = self._finished(platform, tmp_path, "theirs", "g", 60)
+        platform._storage["theirs"].workload_name = "other-workload"
+        workload = MyWorkload(platform=platform)
+        await workload.rebuild_catalog()
+        workload.catalog.upsert(platform._storage["theirs"])
+
+        report = await workload.collect_garbage(max_age_seconds=0)
+
+        assert report["removed"] == ["ours"]
+        assert not ours.exists() and theirs.exists()
+        assert (await workload._remove_agent_dir("theirs", archive=False)) == (False, None)
+
+    async def test_running_deployments_are_never_collected(self, tmp_path):
+        platform = _mock_platform()
+        agent_dir = self._finished(platform, tmp_path, "live", "g", 600)
+        platform._storage["live"].status = DeploymentStatus.RUNNING
+        workload = MyWorkload(platform=platform)
+        await workload.rebuild_catalog()
+
+        report = await workload.collect_garbage(max_age_seconds=0)
+
+        assert report["removed"] == []
+        assert agent_dir.exists()
+
+    async def test_concurrent_change_keeps_directory(self, tmp_path):
+        platform = _copying_platform()
+        agent_dir = self._finished(platform, tmp_path, "dep", "g", 60)
+        platform._storage["dep"].metadata["state_version"] = 1
+        workload = MyWorkload(platform=platform)
+        await workload.rebuild_catalog()
+        load = workload.load_state
+
+        async def load_then_resume(deployment_id):
+            state = await load(deployment_id)
+            # Another process resumes the deployment between our read and write
+            stored = copy.deepcopy(platform._storage[deployment_id])
+            stored.status = DeploymentStatus.RUNNING
+            stored.metadata["state_version"] = 2
+            platform._storage[deployment_id] = stored
+            return state
+
+        with patch.object(workload, "load_state", side_effect=load_then_resume):
+            report = await workload.collect_garbage(max_age_seconds=0)
+
+        assert report["removed"] == []
+        assert agent_dir.exists()
+
+    async def test_background_gc_works_in_batches(self, tmp_path):
+        platform = _mock_platform()
+        dirs = [self._finished(platform, tmp_path, f"d{i}", "g", 60 + i) for i in range(5)]
+        workload = MyWorkload(platform=platform)
+        await workload.rebuild_catalog()
+
+        workload.start_gc(interval_seconds=0.01, max_age_seconds=0, limit=2)
+        try:
+            for _ in range(200):
+                if not any(d.exists() for d in dirs):
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            workload.stop_gc()
+
+        assert not any(d.exists() for d in dirs)
+
+    async def test_invalid_policy_rejected(self):
+        workload = MyWorkload(platform=_mock_platform())
+        with pytest.raises(ValueError, match="retention policy needs"):
+            await workload.collect_garbage()
+        with pytest.raises(ValueError, match="keep_per_goal"):
+            workload.start_gc(keep_per_goal=-1)
+
+
+class TestStatePersistence:
+    """Test that state writes are skipped when unchanged and coalesced per refresh."""
+
+    @staticmethod
+    def _writes(workload):
+        return workload._platform.save_deployment_state.await_count
+
+    async def test_deploy_writes_once(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        agent_dir = tmp_path / "agent"
+        agent_dir.mkdir()
+        (agent_dir / "main.py").write_text("import time; time.sleep(5)\n")
+        with patch.object(workload, "_generate_agent", AsyncMock(return_value=agent_dir)):
+            dep_id = await workload.deploy(DeploymentConfig(workload_name="my-workload"))
+
+        assert self._writes(workload) == 1
+        assert workload._platform._storage[dep_id].metadata["agent_pid"]
+        workload._terminate_process(dep_id)
+
+    async def test_launch_failure_persisted_as_failed(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        agent_dir = tmp_path / "agent"
+        agent_dir.mkdir()  # no main.py
+        with patch.object(workload, "_generate_agent", AsyncMock(return_value=agent_dir)):
+            with pytest.raises(FileNotFoundError):
+                await workload.deploy(DeploymentConfig(workload_name="my-workload"))
+
+        (state,) = workload._platform._storage.values()
+        assert state.status == DeploymentStatus.FAILED
+        assert "Agent entry point not found" in state.error
+
+    async def test_idle_polls_do_not_write(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "agent.log").write_text("working\n")
+        state = DeploymentState(
+            deployment_id="test-idle",
+            workload_name="my-workload",
+            status=DeploymentStatus.RUNNING,
+            phase="executing",
+            metadata={"agent_dir": str(tmp_path), "agent_pid": os.getpid()},
+        )
+        await workload.save_state(state)
+
+        for _ in range(3):
+            await workload.get_status("test-idle")
+        assert self._writes(workload) == 1
+
+    async def test_refresh_coalesces_to_one_write(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "events.jsonl").write_text(
+            '{"type": "phase_start", "phase": "verify"}\n'
+            '{"type": "outcome", "status": "completed"}\n'
+        )
+        state = DeploymentState(
+            deployment_id="test-coalesce",
+            workload_name="my-workload",
+            status=DeploymentStatus.RUNNING,
+            phase="executing",
+            metadata={"agent_dir": str(tmp_path), "agent_pid": 999999},
+        )
+        await workload.save_state(state)
+
+        with patch("haymaker_my_workload.workload.os.kill", side_effect=ProcessLookupError):
+            result = await workload.get_status("test-coalesce")
+
+        assert result.status == DeploymentStatus.COMPLETED
+        assert self._writes(workload) == 2  # initial save + one for the refresh
+
+
+def _copying_platform():
+    """In-memory platform that stores copies, like separate CLI processes sharing storage."""
+    platform = _mock_platform()
+    storage = platform._storage
+
+    async def save(state: DeploymentState):
+        storage[state.deployment_id] = copy.deepcopy(state)
+
+    async def load(deployment_id: str):
+        state = storage.get(deployment_id)
+        return copy.deepcopy(state) if state else None
+
+    platform.save_deployment_state = AsyncMock(side_effect=save)
+    platform.load_deployment_state = AsyncMock(side_effect=load)
+    return platform
+
+
+class TestOptimisticVersioning:
+    """Test compare-and-swap state saves between workload instances."""
+
+    @staticmethod
+    async def _seed(platform, **metadata):
+        seeder = MyWorkload(platform=platform)
+        await seeder.save_state(
+            DeploymentState(
+                deployment_id="test-cas",
+                workload_name="my-workload",
+                status=DeploymentStatus.RUNNING,
+                phase="executing",
+                metadata=metadata,
+            )
+        )
+
+    async def test_saves_bump_version(self):
+        platform = _copying_platform()
+        await self._seed(platform)
+        workload = MyWorkload(platform=platform)
+
+        state = await workload.load_state("test-cas")
+        state.phase = "verify"
+        await workload.save_state(state)
+
+        assert platform._storage["test-cas"].metadata["state_version"] == 2
+
+    async def test_stale_write_rejected(self):
+        platform = _copying_platform()
+        await self._seed(platform)
+        first, second = MyWorkload(platform=platform), MyWorkload(platform=platform)
+
+        a = await first.load_state("test-cas")
+        b = await second.load_state("test-cas")
+        a.status = DeploymentStatus.STOPPED
+        await first.save_state(a)
+        b.status = DeploymentStatus.FAILED
+        with pytest.raises(StateConflictError):
+            await second.save_state(b)
+        assert platform._storage["test-cas"].status == DeploymentStatus.STOPPED
+
+    async def test_status_refresh_retries_from_fresh_state(self, tmp_path):
+        """A poller that saw a dead PID must not overwrite a concurrent STOPPED."""
+        platform = _copying_platform()
+        await self._seed(platform, agent_dir=str(tmp_path), agent_pid=999999)
+        poller, stopper = MyWorkload(platform=platform), MyWorkload(platform=platform)
+        loads = 0
+
+        async def load_then_race(deployment_id):
+            nonlocal loads
+            state = await MyWorkload.load_state(poller, deployment_id)
+            loads += 1
+            if loads == 1:
+                other = await stopper.load_state(deployment_id)
+                other.status = DeploymentStatus.STOPPED
+                other.phase = "stopped"
+                await stopper.save_state(other)
+            return state
+
+        with (
+            patch.object(poller, "load_state", side_effect=load_then_race),
+            patch("haymaker_my_workload.workload.os.kill", side_effect=ProcessLookupError),
+        ):
+            result = await poller.get_status("test-cas")
+
+        assert loads == 2
+        assert result.status == DeploymentStatus.STOPPED
+        assert platform._storage["test-cas"].status == DeploymentStatus.STOPPED
+
+    async def test_lock_survives_lock_file_removal(self, tmp_path):
+        """A waiter on a lock file its holder deletes locks the new file instead."""
+        first, second = MyWorkload(platform=_mock_platform()), MyWorkload(platform=_mock_platform())
+        path = tmp_path / "locks" / "test-cas.lock"
+        entered = asyncio.Event()
+
+        async def wait_for_lock():
+            async with second._state_lock("test-cas"):
+                entered.set()
+                # Anyone opening the path now must contend with this holder
+                fd = os.open(path, os.O_RDWR)
+                try:
+                    with pytest.raises(BlockingIOError):
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                finally:
+                    os.close(fd)
+
+        async with first._state_lock("test-cas"):
+            waiter = asyncio.create_task(wait_for_lock())
+            await asyncio.sleep(0.05)
+            assert not entered.is_set()
+            path.unlink()
+        await asyncio.wait_for(waiter, 2)
+        assert entered.is_set()
+
+        await first._drop_state_lock("test-cas")
+        assert not path.exists()
+        assert workload_module._STATE_ROOT.is_absolute()
+
+
+class TestWatch:
+    """Test the push-style watch() iterator."""
+
+    @staticmethod
+    async def _collect(iterator, timeout=30):
+        async def drain():
+            return [change async for change in iterator]
+
+        return await asyncio.wait_for(drain(), timeout)
+
+    async def test_reports_transitions_until_finished(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={"sdk": "mock", "mock_turns": 3, "mock_turn_seconds": 0.05},
+        )
+        ids = [await workload.deploy(config) for _ in range(2)]
+
+        changes = await self._collect(workload.watch(ids, poll_interval=0.05))
+
+        final = {c["deployment_id"]: c for c in changes if c["status"] != DeploymentStatus.RUNNING}
+        assert set(final) == set(ids)
+        assert all(c["status"] == DeploymentStatus.COMPLETED for c in final.values())
+        assert all(c["previous_status"] == DeploymentStatus.RUNNING for c in final.values())
+
+    async def test_sees_saves_from_other_processes(self):
+        platform = _copying_platform()
+        watcher, other = MyWorkload(platform=platform), MyWorkload(platform=platform)
+        await other.save_state(
+            DeploymentState(
+                deployment_id="test-watch",
+                workload_name="my-workload",
+                status=DeploymentStatus.RUNNING,
+                phase="executing",
+            )
+        )
+
+        async def stop_later():
+            await asyncio.sleep(0.1)
+            state = await other.load_state("test-watch")
+            state.status = DeploymentStatus.STOPPED
+            state.phase = "stopped"
+            await other.save_state(state)
+
+        stopper = asyncio.create_task(stop_later())
+        changes = await self._collect(watcher.watch(["test-watch"], poll_interval=0.02))
+        await stopper
+
+        assert changes == [
+            {
+                "deployment_id": "test-watch",
+                "status": DeploymentStatus.STOPPED,
+                "phase": "stopped",
+                "previous_status": DeploymentStatus.RUNNING,
+                "previous_phase": "executing",
+            }
+        ]
+
+    async def test_unknown_deployment(self):
+        workload = MyWorkload(platform=_mock_platform())
+        with pytest.raises(DeploymentNotFoundError):
+            await self._collect(workload.watch(["nope"]))
+
+
+class TestRetry:
+    """Test automatic retries of transiently failing agents."""
+
+    _FLAKY = (
+        "import pathlib, sys\n"
+        "marker = pathlib.Path('attempted')\n"
+        "if not marker.exists():\n"
+        "    marker.touch()\n"
+        "    sys.stderr.write('anthropic.RateLimitError: Error code: 429\\n')\n"
+        "    sys.exit(1)\n"
+        "print('Goal achieved')\n"
+    )
+
+    @staticmethod
+    async def _run(workload, agent_dir, **workload_config):
+        generate = AsyncMock(return_value=agent_dir)
+        with patch.object(workload, "_generate_agent", generate):
+            dep_id = await workload.deploy(
+                DeploymentConfig(workload_name="my-workload", workload_config=workload_config)
+            )
+        for _ in range(100):
+            state = await workload.get_status(dep_id)
+            if state.status in (DeploymentStatus.COMPLETED, DeploymentStatus.FAILED):
+                break
+            await asyncio.sleep(0.05)
+        assert generate.await_count == 1
+        return state
+
+    async def test_transient_failure_is_retried_in_same_bundle(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "main.py").write_text(self._FLAKY)
+
+        state = await self._run(workload, tmp_path, retry_max_attempts=3, retry_backoff_seconds=0)
+
+        assert state.status == DeploymentStatus.COMPLETED
+        (attempt,) = state.metadata["attempts"]
+        assert attempt["failure_class"] == "rate_limit"
+        assert attempt["exit_code"] == 1
+        assert "retry_at" not in state.metadata
+
+    async def test_permanent_failure_is_not_retried(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "main.py").write_text("raise ValueError('bad goal')\n")
+
+        state = await self._run(workload, tmp_path, retry_max_attempts=3, retry_backoff_seconds=0)
+
+        assert state.status == DeploymentStatus.FAILED
+        assert [a["failure_class"] for a in state.metadata["attempts"]] == ["unknown"]
+
+    async def test_gives_up_after_max_attempts(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        (tmp_path / "main.py").write_text(
+            "import sys; sys.stderr.write('Error code: 429\\n'); sys.exit(1)\n"
+        )
+
+        state = await self._run(workload, tmp_path, retry_max_attempts=2, retry_backoff_seconds=0)
+
+        assert state.status == DeploymentStatus.FAILED
+        assert [a["attempt"] for a in state.metadata["attempts"]] == [1, 2]
+        assert "retry_in_seconds" in state.metadata["attempts"][0]
+        assert "retry_in_seconds" not in state.metadata["attempts"][1]
+
+    async def test_retried_attempt_keeps_the_deadline(self, tmp_path):
+        """The watchdog stops a retried attempt that hangs past timeout_seconds."""
+        # Copies, so a save lost to a stale batch shows in the stored state
+        platform = _copying_platform()
+        workload = MyWorkload(platform=platform)
+        (tmp_path / "main.py").write_text(
+            self._FLAKY.replace("print('Goal achieved')", "import time; time.sleep(30)")
+        )
+        generate = AsyncMock(return_value=tmp_path)
+        with patch.object(workload, "_generate_agent", generate):
+            dep_id = await workload.deploy(
+                DeploymentConfig(
+                    workload_name="my-workload",
+                    workload_config={
+                        "retry_max_attempts": 2,
+                        "retry_backoff_seconds": 0,
+                        "timeout_seconds": 1.5,
+                    },
+                )
+            )
+        for _ in range(40):
+            state = await workload.get_status(dep_id)
+            if state.status == DeploymentStatus.RUNNING and state.metadata.get("attempts"):
+                break
+            await asyncio.sleep(0.05)
+        assert state.metadata["attempts"]
+        assert dep_id in workload._watchdogs
+
+        # No more polling: only the watchdog can end the hung second attempt
+        await asyncio.sleep(2.0)
+        stored = platform._storage[dep_id]
+        assert stored.status == DeploymentStatus.FAILED
+        assert stored.metadata["timed_out"] is True
+        assert "timed out" in stored.error
+
+    async def test_poll_leaves_paced_retry_to_timer(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        state = DeploymentState(
+            deployment_id="test-due",
+            workload_name="my-workload",
+            status=DeploymentStatus.PENDING,
+            phase="retry_scheduled",
+            metadata={
+                "agent_dir": str(tmp_path),
+                "retry_at": (datetime.now(tz=UTC) - timedelta(seconds=1)).isoformat(),
+            },
+        )
+        await workload.save_state(state)
+        # Another relaunch was just admitted, so this one has to wait its turn
+        await workload._retry_admission.acquire()
+        workload._retry_admission.release()
+
+        with patch.object(workload, "_execute_agent_detached") as launch:
+            started = time.monotonic()
+            result = await workload.get_status("test-due")
+            assert time.monotonic() - started < 0.2
+            assert result.status == DeploymentStatus.PENDING
+            launch.assert_not_called()
+            await workload._retry_timers["test-due"]
+        launch.assert_called_once()
+        assert (await workload.load_state("test-due")).status == DeploymentStatus.RUNNING
+
+    async def test_stop_cancels_pending_retry(self):
+        workload = MyWorkload(platform=_mock_platform())
+        state = DeploymentState(
+            deployment_id="test-pending",
+            workload_name="my-workload",
+            status=DeploymentStatus.RUNNING,
+            phase="executing",
+            config={"retry_max_attempts": 3, "retry_backoff_seconds": 600},
+            metadata={
+                "agent_progress": {"outcome": {"status": "failed", "error": "Error code: 429"}}
+            },
+        )
+        await workload.save_state(state)
+
+        result = await workload.get_status("test-pending")
+        assert result.status == DeploymentStatus.PENDING
+        assert "test-pending" in workload._retry_timers
+
+        assert await workload.stop("test-pending")
+        assert "test-pending" not in workload._retry_timers
+
+    async def test_invalid_retry_config(self):
+        workload = MyWorkload(platform=_mock_platform())
+        config = DeploymentConfig(
+            workload_name="my-workload", workload_config={"retry_on": ["flaky"]}
+        )
+        errors = await workload.validate_config(config)
+        assert any("retry_on" in e for e in errors)
+
+
+class TestGoalTemplates:
+    """Test fanning a goal template out over parameter rows."""
+
+    _TEMPLATE = "# Summarize {dataset}\n## Goal\nSummarize {dataset} into {target_dir}\n"
+
+    _MAIN_PY = (
+        "from pathlib import Path\n"
+        'Path("result.txt").write_text("@@dataset@@ -> @@target_dir@@")\n'
+        "print('Goal achieved')\n"
+    )
+
+    def _setup(self, tmp_path, monkeypatch, rows):
+        monkeypatch.chdir(tmp_path)
+        template = tmp_path / "summarize.md"
+        template.write_text(self._TEMPLATE)
+        rows_file = tmp_path / "rows.jsonl"
+        rows_file.write_text(rows)
+        workload = MyWorkload(platform=_mock_platform())
+        goals = []
+        monkeypatch.setattr(workload, "_build_agent", _fake_builder(workload, goals, self._MAIN_PY))
+        config = DeploymentConfig(
+            workload_name="my-workload",
+            workload_config={"sdk": "mini", "goal_file": str(template)},
+        )
+        return workload, config, rows_file, goals
+
+    async def test_one_agent_per_row(self, tmp_path, monkeypatch):
+        rows = (
+            '{"dataset": "sales", "target_dir": "out/a"}\n'
+            '{"dataset": "ops"}\n'
+            '{"dataset": "hr", "target_dir": "out/c"}\n'
+        )
+        workload, config, rows_file, goals = self._setup(tmp_path, monkeypatch, rows)
+
+        results = [
+            r
+            async for r in workload.deploy_template(
+                config, rows_file, max_concurrent=2, poll_interval=0.05
+            )
+        ]
+
+        assert goals == [self._TEMPLATE.replace("{", "@@").replace("}", "@@")]
+        results.sort(key=lambda r: r["row"])
+        assert [r["success"] for r in results] == [True, False, True]
+        assert "target_dir" in results[1]["error"]
+        state = await workload.load_state(results[2]["deployment_id"])
+        agent_dir = Path(state.metadata["agent_dir"])
+        assert (agent_dir / "result.txt").read_text() == "hr -> out/c"
+        assert state.metadata["goal_params"] == {"dataset": "hr", "target_dir": "out/c"}
+        assert state.metadata["goal_summary"] == "Summarize hr"
+        rendered = (agent_dir / "prompt.md").read_text()
+        assert state.metadata["goal_hash"] == hashlib.sha256(rendered.encode()).hexdigest()
+        assert state.metadata["plan_phases"] == ["p1"]
+        assert not any((tmp_path / ".haymaker" / "templates").iterdir())
+        for result in (results[0], results[2]):
+            await workload.cleanup(result["deployment_id"])
+
+    async def test_rows_read_as_slots_free(self, tmp_path, monkeypatch):
+        rows = "".join(f'{{"dataset": "d{i}", "target_dir": "out"}}\n' for i in range(50))
+        workload, config, rows_file, _ = self._setup(tmp_path, monkeypatch, rows)
+        read = []
+        iter_rows = workload_module.iter_param_rows
+
+        def counting(path):
+            for row in iter_rows(path):
+                read.append(row)
+                yield row
+
+        monkeypatch.setattr(workload_module, "iter_param_rows", counting)
+        batch = workload.deploy_template(config, rows_file, max_concurrent=2, poll_interval=0.05)
+        first = await anext(batch)
+        await batch.aclose()
+
+        assert first["success"]
+        assert len(read) <= 3
+        for state in await workload.list_deployments():
+            await workload.stop(state.deployment_id)
+            await workload.cleanup(state.deployment_id)
+
+    async def test_rejects_bad_input(self, tmp_path, monkeypatch):
+        workload, config, rows_file, _ = self._setup(tmp_path, monkeypatch, "")
+        with pytest.raises(ValueError, match="rows_file must be"):
+            await anext(workload.deploy_template(config, tmp_path / "rows.txt"))
+        plain = tmp_path / "plain.md"
+        plain.write_text("# Plain\n## Goal\nNo placeholders\n")
+        config.workload_config["goal_file"] = str(plain)
+        with pytest.raises(ValueError, match="placeholders"):
+            await anext(workload.deploy_template(config, rows_file))
+
+    async def test_rejects_bundle_without_markers(self, tmp_path, monkeypatch):
+        rows = '{"dataset": "sales", "target_dir": "out/a"}\n'
+        workload, config, rows_file, _ = self._setup(tmp_path, monkeypatch, rows)
+        build = workload._build_agent
+
+        def paraphrasing(name, goal_path, sdk, enable_memory, output_dir):
+            agent_dir = build(name, goal_path, sdk, enable_memory, output_dir)
+            # A generator that rewrote the goal and dropped one placeholder
+            (agent_dir / "prompt.md").write_text("Summarize a dataset into @@target_dir@@\n")
+            (agent_dir / "main.py").write_text("print('Goal achieved')\n")
+            return agent_dir
+
+        monkeypatch.setattr(workload, "_build_agent", paraphrasing)
+        with pytest.raises(ValueError, match="lost the markers .*: dataset"):
+            await anext(workload.deploy_template(config, rows_file))
+        assert not any((tmp_path / ".haymaker" / "templates").iterdir())
+        assert await workload.list_deployments() == []
+
+
+class TestPipelines:
+    """Test running goals as a dependency graph."""
+
+    @staticmethod
+    def _main_py(text):
+        """Agent source that combines its inputs' results; FAIL and FLAKY goals fail."""
+        return (
+            "import json, os, sys, time\n"
+            "from pathlib import Path\n"
+            f"goal = {text!r}\n"
+            "time.sleep(0.3)\n"
+            "if 'FAIL' in goal:\n"
+            "    sys.exit(1)\n"
+            "if 'FLAKY' in goal and not Path('attempted').exists():\n"
+            "    Path('attempted').touch()\n"
+            "    sys.stderr.write('Error code: 429\\n')\n"
+            "    sys.exit(1)\n"
+            "inputs = json.loads(os.environ.get('HAYMAKER_INPUTS', '{}'))\n"
+            "seen = sorted(Path(p, 'result.txt').read_text() for p in inputs.values())\n"
+            "Path('output').mkdir()\n"
+            "title = goal.split(chr(10))[0].strip('# ')\n"
+            "Path('output/result.txt').write_text(title + '(' + ','.join(seen) + ')')\n"
+            "print('Goal achieved')\n"
+        )
+
+    def _goal(self, tmp_path, name, body="Do it"):
+        path = tmp_path / f"{name}.md"
+        path.write_text(f"# {name}\n## Goal\n{body}\n")
+        return str(path)
+
+    async def test_diamond_runs_branches_in_parallel(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        workload = MyWorkload(platform=_mock_platform())
+        goals = []
+        monkeypatch.setattr(workload, "_build_agent", _fake_builder(workload, goals, self._main_py))
+        manifest = {
+            "name": "diamond",
+            "config": {"sdk": "mini"},
+            "goals": [
+                {"id": "a", "goal_file": self._goal(tmp_path, "a")},
+                {"id": "b", "goal_file": self._goal(tmp_path, "b"), "needs": ["a"]},
+                {"id": "c", "goal_file": self._goal(tmp_path, "c"), "needs": ["a"]},
+                {
+                    "id": "d",
+                    "goal_file": self._goal(tmp_path, "d", "Merge {b} and {c}"),
+                    "needs": ["b", "c"],
+                },
+            ],
+        }
+
+        report = await workload.run_pipeline(manifest, max_concurrent=2, poll_interval=0.05)
+
+        assert report["succeeded"] == 4
+        steps = {r["step"]: r for r in report["steps"]}
+        assert steps["b"]["started_at"] >= steps["a"]["finished_at"]
+        assert steps["b"]["started_at"] < steps["c"]["finished_at"]
+        assert steps["c"]["started_at"] < steps["b"]["finished_at"]
+        assert report["critical_path"][0] == "a" and report["critical_path"][-1] == "d"
+        assert report["critical_path_seconds"] == steps["d"]["finished_at"]
+
+        d_dir = Path(steps["d"]["agent_dir"])
+        assert (d_dir / "output" / "result.txt").read_text() == "d(b(a()),c(a()))"
+        b_output = str(Path(steps["b"]["agent_dir"]) / "output")
+        (goal_d,) = [text for text in goals if text.startswith("# d\n")]
+        assert f"Merge {b_output} and " in goal_d
+        d_state = await workload.load_state(steps["d"]["deployment_id"])
+        assert d_state.config["goal_file"] == manifest["goals"][3]["goal_file"]
+        assert d_state.metadata["goal_hash"] == hashlib.sha256(goal_d.encode()).hexdigest()
+        assert not (tmp_path / ".haymaker" / "pipelines").exists() or not any(
+            (tmp_path / ".haymaker" / "pipelines").iterdir()
+        )
+        for r in steps.values():
+            await workload.cleanup(r["deployment_id"])
+
+    async def test_failure_skips_downstream(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        workload = MyWorkload(platform=_mock_platform())
+        monkeypatch.setattr(workload, "_build_agent", _fake_builder(workload, [], self._main_py))
+        manifest = {
+            "name": "broken",
+            "config": {"sdk": "mini"},
+            "goals": [
+                {"id": "a", "goal_file": self._goal(tmp_path, "a", "FAIL")},
+                {"id": "b", "goal_file": self._goal(tmp_path, "b"), "needs": ["a"]},
+                {"id": "other", "goal_file": self._goal(tmp_path, "other")},
+            ],
+        }
+
+        report = await workload.run_pipeline(manifest, poll_interval=0.05)
+
+        steps = {r["step"]: r for r in report["steps"]}
+        assert steps["a"]["status"] == "failed"
+        assert steps["b"]["status"] == "skipped"
+        assert steps["other"]["success"]
+        assert (report["succeeded"], report["failed"], report["skipped"]) == (1, 1, 1)
+        for step_id in ("a", "other"):
+            await workload.cleanup(steps[step_id]["deployment_id"])
+
+    async def test_retried_goal_still_feeds_downstream(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        workload = MyWorkload(platform=_mock_platform())
+        monkeypatch.setattr(workload, "_build_agent", _fake_builder(workload, [], self._main_py))
+        monkeypatch.setattr(workload_module, "backoff_delay", lambda *args: 0.2)
+        manifest = {
+            "name": "flaky",
+            "config": {"sdk": "mini", "retry_max_attempts": 2},
+            "goals": [
+                {"id": "a", "goal_file": self._goal(tmp_path, "a", "FLAKY")},
+                {"id": "b", "goal_file": self._goal(tmp_path, "b"), "needs": ["a"]},
+            ],
+        }
+
+        report = await workload.run_pipeline(manifest, poll_interval=0.05)
+
+        assert report["succeeded"] == 2
+        assert report["critical_path"] == ["a", "b"]
+        steps = {r["step"]: r for r in report["steps"]}
+        state = await workload.load_state(steps["a"]["deployment_id"])
+        assert len(state.metadata["attempts"]) == 1
+        for r in steps.values():
+            await workload.cleanup(r["deployment_id"])
+
+    async def test_rejects_invalid_pipeline(self, tmp_path):
+        workload = MyWorkload(platform=_mock_platform())
+        manifest = {
+            "name": "bad",
+            "goals": [
+                {"id": "a", "goal_file": self._goal(tmp_path, "a", "Use {b}")},
+                {"id": "b", "goal_file": self._goal(tmp_path, "b"), "config": {"sdk": "gpt5"}},
+            ],
+        }
+        with pytest.raises(ValueError, match="goal b: sdk must be one of"):
+            await workload.run_pipeline(manifest)
+        manifest["goals"][1]["config"] = {}
+        with pytest.raises(ValueError, match="goal a: placeholders are not upstream goals: b"):
+            await workload.run_pipeline(manifest)
+
+
 @pytest.mark.integration
 class TestGeneratorIntegration:
     """Integration tests that exercise the real amplihack generator pipeline.